@@ -5,13 +5,14 @@ import urllib3
 import hashlib
 import hmac
 from dotenv import load_dotenv
+from modules.network.telegram_outbox import get_outbox
+from modules.network.proxy_resolver import get_proxy_resolver
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 load_dotenv()
 
 # --- CONFIG ---
-PROXY_URL = "http://127.0.0.1:10809"
-PROXIES = {"http": PROXY_URL, "https": PROXY_URL}
+PROXY = get_proxy_resolver()
 
 MEXC_BASE = "https://api.mexc.com"
 MEXC_KEY = os.getenv("MEXC_API_KEY")
@@ -25,7 +26,7 @@ def log(msg):
 def get_server_time():
     try:
         url = f"{MEXC_BASE}/api/v3/time"
-        resp = requests.get(url, proxies=PROXIES, verify=False, timeout=5)
+        resp = requests.get(url, proxies=PROXY.requests_proxies(), verify=False, timeout=5)
         if resp.status_code == 200:
             return resp.json()['serverTime']
     except: pass
@@ -40,17 +41,16 @@ def send_telegram(message):
         log("❌ Telegram Config Missing")
         return
 
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    payload = {"chat_id": TG_CHAT_ID, "text": message}
-    
-    try:
-        resp = requests.post(url, json=payload, proxies=PROXIES, verify=False, timeout=10)
-        if resp.status_code == 200:
-            log("✅ Telegram Sent Successfully!")
-        else:
-            log(f"❌ Telegram Fail: {resp.text}")
-    except Exception as e:
-        log(f"❌ Telegram Error: {e}")
+    outbox = get_outbox()
+    outbox.send(message, level="INFO", parse_mode=None)
+    outbox.flush(timeout=15)
+    stats = outbox.stats()
+    if stats["sent"]:
+        log("✅ Telegram Sent Successfully!")
+    elif stats["spilled"]:
+        log("❌ Telegram Unreachable — report saved to outbox for retry")
+    else:
+        log(f"❌ Telegram Fail: {stats}")
 
 def main():
     print("-" * 50)
@@ -71,10 +71,11 @@ def main():
 
     report_msg = "🌊 OCEAN HUNTER REPORT\n\n"
     report_msg += "✅ System Online (V6.9)\n"
-    report_msg += "✅ Proxy Active (10809)\n"
+    proxies = PROXY.requests_proxies()
+    report_msg += f"✅ Proxy Active ({proxies['https'] if proxies else 'direct'})\n"
 
     try:
-        resp = requests.get(final_url, headers=headers, proxies=PROXIES, verify=False, timeout=10)
+        resp = requests.get(final_url, headers=headers, proxies=PROXY.requests_proxies(), verify=False, timeout=10)
         if resp.status_code == 200:
             data = resp.json()
             log("✅ MEXC Connected!")
@@ -1,11 +1,12 @@
 import os
 import time
-import requests
 import urllib3
 from dotenv import load_dotenv
 from modules.m_data import DataEngine
-from modules.m_analysis import analyze_market
+from modules.analysis.batch import analyze_batch
 from modules.m_trader import PaperTrader
+from modules.network.telegram_outbox import get_outbox
+from modules.network import get_client, get_price_cache
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 load_dotenv()
@@ -13,16 +14,11 @@ load_dotenv()
 # --- CONFIG ---
 TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TG_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-PROXY_URL = "http://127.0.0.1:10809"
-PROXIES = {"http": PROXY_URL, "https": PROXY_URL}
 
 def send_telegram(msg):
     if not TG_TOKEN or not TG_CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    payload = {"chat_id": TG_CHAT_ID, "text": msg}
-    try:
-        requests.post(url, json=payload, proxies=PROXIES, verify=False, timeout=5)
-    except: pass
+    # Queued; the outbox worker delivers in the background
+    get_outbox().send(msg, level="INFO", parse_mode=None)
 
 def main():
     print("-" * 50)
@@ -41,14 +37,18 @@ def main():
     
     trade_logs = []
 
+    # 1. Fetch Data (all symbols in one concurrent round trip)
+    all_candles = engine.fetch_candles_many(targets, interval="60m", limit=50)
+
+    # 2. Analyze (every symbol in one vectorized pass)
+    analysis = analyze_batch(all_candles, targets, interval="60m")
+
     for symbol in targets:
-        # 1. Fetch Data
-        candles = engine.fetch_candles(symbol, interval="60m", limit=50)
+        candles = all_candles.get(symbol)
         
         if candles:
-            # 2. Analyze
-            result = analyze_market(symbol, candles)
-            current_prices[symbol] = result['price']
+            result = analysis.row(symbol)
+            current_prices[symbol] = float(candles[-1]['close'])
             
             # 3. Execute Trade (Simulation)
             trade_action = trader.execute(symbol, result['signal'], result['price'])
@@ -68,8 +68,11 @@ def main():
         else:
             report_msg += f"❌ {symbol}: Connection Failed\n"
             
-    # 4. Portfolio Summary
-    total_val = trader.get_portfolio_value(current_prices)
+    # 4. Portfolio Summary (fresh closes first; held assets without one priced by one all-symbols ticker request)
+    unpriced = [s for s in trader.state["positions"] if s not in current_prices]
+    if unpriced:
+        get_client().refresh_prices(unpriced)
+    total_val = trader.get_portfolio_value(current_prices, price_cache=get_price_cache())
     roi = ((total_val - 1000) / 1000) * 100
     
     report_msg += "─" * 25 + "\n"
@@ -81,6 +84,7 @@ def main():
             
     print(f"\n[4] 📨 Sending Report (Val: ${total_val:.2f})...")
     send_telegram(report_msg)
+    get_outbox().flush(timeout=15)
     print("✅ Done.")
 
 if __name__ == "__main__":
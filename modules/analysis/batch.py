@@ -0,0 +1,238 @@
+"""
+Batch Analysis — every symbol in one vectorized pass
+For OCEAN HUNTER V10.8.2
+Indicators and the Smart Sniper entry score computed over aligned
+(symbols x candles) matrices: scanning more symbols widens the arrays
+instead of adding another Python loop. Results come back as a per-symbol
+table whose rows carry the same keys as analyze_market(). The closed-candle
+state is memoized, so a rescan within the same candle only folds in the
+open one.
+"""
+
+import time
+import numpy as np
+from . import indicators as ind
+from .memo import get_analysis_memo, timestamps
+
+MIN_CANDLES = 20            # analyze_market(): fewer candles → WAIT
+EMA_TREND = 50              # ARCHITECTURE EMA50 trend filter
+VOLUME_SPIKE_MULT = 1.5     # config.VOLUME_SPIKE_MULT
+RSI_OVERSOLD, RSI_OVERBOUGHT = 30, 70
+
+COLUMNS = ("price", "rsi", "rsi_sma", "bb_mid", "bb_upper", "bb_lower", "macd", "macd_signal",
+           "ema50", "atr", "volume", "volume_sma", "volume_spike", "score")
+
+
+def sniper_score(close, rsi_sma, bb_lower, macd_line, macd_signal) -> np.ndarray:
+    """
+    Smart Sniper entry score, elementwise (any shape):
+    RSI < 30 → 40, < 40 → 20; close <= lower band → 30, within 0.5% → 10;
+    MACD above signal → 10. Indicators still warming up (NaN) score 0.
+    """
+    score = np.where(rsi_sma < 30, 40, np.where(rsi_sma < 40, 20, 0))
+    score = score + np.where(close <= bb_lower, 30, np.where(close <= bb_lower * 1.005, 10, 0))
+    return score + np.where(macd_line > macd_signal, 10, 0)
+
+
+def _signal(rsi: float) -> str:
+    if rsi < RSI_OVERSOLD:
+        return "BUY 🟢 (Oversold)"
+    if rsi > RSI_OVERBOUGHT:
+        return "SELL 🔴 (Overbought)"
+    return "NEUTRAL ⚪"
+
+
+class ResultTable:
+    """Columnar per-symbol results: table.columns["rsi"][i] belongs to table.symbols[i]"""
+
+    def __init__(self, symbols: list, columns: dict, skipped: dict = None):
+        self.symbols = list(symbols)
+        self.columns = columns
+        self.skipped = dict(skipped or {})      # symbol → reason (no / too few candles)
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def row(self, symbol: str) -> dict:
+        """analyze_market()-shaped dict (plus every indicator column)"""
+        i = self._index.get(symbol)
+        if i is None:
+            return {"symbol": symbol, "signal": "WAIT", "rsi": 0, "price": 0,
+                    "reason": self.skipped.get(symbol, "No Data")}
+        values = {name: self.columns[name][i].item() for name in self.columns}
+        rsi = round(values["rsi"], 2) if values["rsi"] == values["rsi"] else 50
+        values.update(symbol=symbol, rsi=rsi, signal=_signal(rsi))
+        return values
+
+    def rows(self) -> list:
+        return [self.row(s) for s in self.symbols]
+
+    def top(self, column: str = "score", n: int = 5) -> list:
+        """Symbols ranked by a column, highest first"""
+        order = np.argsort(-self.columns[column], kind="stable")[:n]
+        return [self.symbols[i] for i in order]
+
+    @classmethod
+    def concat(cls, tables: list) -> "ResultTable":
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls([], {name: np.empty(0) for name in COLUMNS})
+        symbols = [s for t in tables for s in t.symbols]
+        skipped = {}
+        for t in tables:
+            skipped.update(t.skipped)
+        columns = {name: np.concatenate([t.columns[name] for t in tables]) for name in COLUMNS}
+        return cls(symbols, columns, skipped)
+
+
+def closed_state(close, high, low, volume) -> dict:
+    """
+    Every indicator's state after the closed candles (all but the last column),
+    one row per symbol: what finish() needs to fold in the open candle.
+    Needs at least MIN_CANDLES columns.
+    """
+    c, v = close[:, :-1], volume[:, :-1]
+    if close.shape[-1] < MIN_CANDLES:
+        raise ValueError(f"analysis needs at least {MIN_CANDLES} candles, got {close.shape[-1]}")
+    avg_gain, avg_loss = ind.rsi_averages(c)
+    deltas = np.diff(c[:, -ind.RSI_PERIOD:], axis=-1)       # the last period-1 moves
+    fast, slow = ind.ema(c, ind.MACD_FAST), ind.ema(c, ind.MACD_SLOW)
+    return {
+        "prev_close": c[:, -1],
+        "avg_gain": avg_gain[:, -1],
+        "avg_loss": avg_loss[:, -1],
+        "gains": np.maximum(deltas, 0.0),
+        "losses": np.maximum(-deltas, 0.0),
+        "closes": c[:, -(ind.BB_PERIOD - 1):],
+        "volumes": v[:, -(ind.VOLUME_SMA_PERIOD - 1):],
+        "ema_fast": fast[:, -1],
+        "ema_slow": slow[:, -1],
+        "macd_signal": ind.ema(fast - slow, ind.MACD_SIGNAL)[:, -1],
+        "ema50": ind.ema(c, EMA_TREND)[:, -1],
+        "atr": ind.atr(high[:, :-1], low[:, :-1], c)[:, -1],
+    }
+
+
+def _step(prev, x, period: int):
+    """One EMA step, alpha = 2 / (period + 1)"""
+    return prev + 2.0 / (period + 1) * (x - prev)
+
+
+def finish(state: dict, close, high, low, volume) -> dict:
+    """Fold the open candle (1-D per symbol) into closed_state() → result columns"""
+    p = ind.RSI_PERIOD
+    delta = close - state["prev_close"]
+    gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+    rsi = ind.rsi_from_averages((state["avg_gain"] * (p - 1) + gain) / p,
+                                (state["avg_loss"] * (p - 1) + loss) / p)
+    rsi_sma = ind.rsi_from_averages(np.column_stack((state["gains"], gain)).mean(axis=-1),
+                                    np.column_stack((state["losses"], loss)).mean(axis=-1))
+    window = np.column_stack((state["closes"], close))
+    mid, std = window.mean(axis=-1), window.std(axis=-1, ddof=1)
+    bb_lower = mid - ind.BB_STD * std
+    line = _step(state["ema_fast"], close, ind.MACD_FAST) - _step(state["ema_slow"], close, ind.MACD_SLOW)
+    signal = _step(state["macd_signal"], line, ind.MACD_SIGNAL)
+    prev = state["prev_close"]
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+    vol_sma = np.column_stack((state["volumes"], volume)).mean(axis=-1)
+    return {
+        "price": close,
+        "rsi": rsi,
+        "rsi_sma": rsi_sma,
+        "bb_mid": mid,
+        "bb_upper": mid + ind.BB_STD * std,
+        "bb_lower": bb_lower,
+        "macd": line,
+        "macd_signal": signal,
+        "ema50": _step(state["ema50"], close, EMA_TREND),
+        "atr": (state["atr"] * (ind.ATR_PERIOD - 1) + tr) / ind.ATR_PERIOD,
+        "volume": volume,
+        "volume_sma": vol_sma,
+        "volume_spike": volume > VOLUME_SPIKE_MULT * vol_sma,
+        "score": sniper_score(close, rsi_sma, bb_lower, line, signal),
+    }
+
+
+def analyze_matrix(symbols: list, close, high, low, volume) -> ResultTable:
+    """
+    One pass over (symbols x candles) matrices (equal lengths, oldest first,
+    at least MIN_CANDLES). Only the newest value of each indicator is kept per symbol.
+    """
+    close, high, low, volume = (np.atleast_2d(np.asarray(m, dtype=np.float64))
+                                for m in (close, high, low, volume))
+    state = closed_state(close, high, low, volume)
+    return ResultTable(symbols, finish(state, close[:, -1], high[:, -1], low[:, -1], volume[:, -1]))
+
+
+def stack(candles_by_symbol: dict, symbols: list = None) -> dict:
+    """
+    Group symbols by candle count and stack each group into matrices:
+    {length: (symbols, {"close", "high", "low", "volume": 2-D})}.
+    A normal scan has one group (every fetch returns the same window).
+    Accepts CandleSeries or lists of dict candles.
+    """
+    groups = {}
+    for symbol in symbols or list(candles_by_symbol):
+        candles = candles_by_symbol.get(symbol)
+        if candles is None or len(candles) < MIN_CANDLES:
+            continue
+        groups.setdefault(len(candles), []).append(symbol)
+
+    stacked = {}
+    for length, members in groups.items():
+        matrices = {}
+        for name in ("close", "high", "low", "volume"):
+            rows = []
+            for symbol in members:
+                candles = candles_by_symbol[symbol]
+                column = getattr(candles, name, None)
+                rows.append(column if isinstance(column, np.ndarray) else [float(c[name]) for c in candles])
+            matrices[name] = np.array(rows, dtype=np.float64)
+        stacked[length] = (members, matrices)
+    return stacked
+
+
+def analyze_batch(candles_by_symbol: dict, symbols: list = None, interval=None, memo=None) -> ResultTable:
+    """
+    analyze_market() for a whole watch list: {symbol: candles} → ResultTable (caller's order).
+    The closed-candle state of each group is memoized per candle close
+    (memo.AnalysisMemo); repeat scans within a candle only fold in the open one.
+    """
+    memo = memo or get_analysis_memo()
+    symbols = symbols or list(candles_by_symbol)
+    tables = []
+    for members, m in stack(candles_by_symbol, symbols).values():
+        stamps = [timestamps(candles_by_symbol[symbol]) for symbol in members]
+        key = None
+        if None not in stamps:
+            # The whole group shares one entry: candles of a watch list close together,
+            # and a vectorized recompute of the group costs about as much as one lookup per symbol
+            closed = np.column_stack([m[name][:, -2] for name in ("close", "high", "low", "volume")])
+            last_closed = max(closed_ts for _, closed_ts, _ in stamps)
+            step = interval or stamps[0][2] - stamps[0][1]
+            key = memo.key(tuple(members), step, last_closed,
+                           ("batch", m["close"].shape[-1], tuple(stamps), closed.tobytes()))
+        state = memo.lookup("batch", key) if key is not None else None
+        if state is None:
+            started = time.perf_counter()
+            state = closed_state(m["close"], m["high"], m["low"], m["volume"])
+            state = {name: values.copy() for name, values in state.items()}
+            if key is not None:
+                memo.store("batch", key, state, time.perf_counter() - started)
+        started = time.perf_counter()
+        columns = finish(state, *(m[name][:, -1] for name in ("close", "high", "low", "volume")))
+        memo.record_finish("batch", time.perf_counter() - started)
+        tables.append(ResultTable(members, columns))
+    table = ResultTable.concat(tables)
+    skipped = {}
+    for symbol in symbols:
+        if symbol not in table:
+            candles = candles_by_symbol.get(symbol)
+            skipped[symbol] = "No Data" if not candles else f"Only {len(candles)} candles"
+    ordered = [s for s in symbols if s in table]
+    order = [table._index[s] for s in ordered]
+    return ResultTable(ordered, {name: col[order] for name, col in table.columns.items()}, skipped)
@@ -0,0 +1,312 @@
+"""
+Incremental Indicators — O(1) streaming state
+For OCEAN HUNTER V10.8.2
+Same definitions and warm-up as indicators.py, but fed one candle at a time:
+update() commits a closed candle, peek() answers "what if the still-open
+candle closed here" without touching the state. Per candle the cost is
+constant (a ring buffer instead of a growing window) and state round-trips
+through to_dict() / from_dict() so a restart or a backtest checkpoint
+resumes without re-reading history.
+Values are NaN until the indicator is warmed up.
+"""
+
+import math
+from .indicators import (RSI_PERIOD, BB_PERIOD, BB_STD, MACD_FAST, MACD_SLOW,
+                         MACD_SIGNAL, ATR_PERIOD, VOLUME_SMA_PERIOD)
+
+NAN = float("nan")
+_TYPES = {}
+
+
+class Incremental:
+    """Base: slot-based state that serialises to plain dicts (nested indicators included)"""
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _TYPES[cls.__name__] = cls
+
+    @classmethod
+    def _fields(cls):
+        for klass in reversed(cls.__mro__):
+            yield from getattr(klass, "__slots__", ())
+
+    def to_dict(self) -> dict:
+        state = {"type": type(self).__name__}
+        for name in self._fields():
+            value = getattr(self, name)
+            if isinstance(value, Incremental):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = list(value)
+            state[name] = value
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "Incremental":
+        klass = _TYPES[state["type"]]
+        obj = klass.__new__(klass)
+        for name in klass._fields():
+            value = state[name]
+            if isinstance(value, dict) and "type" in value:
+                value = Incremental.from_dict(value)
+            elif isinstance(value, list):
+                value = list(value)
+            setattr(obj, name, value)
+        return obj
+
+
+class EMA(Incremental):
+    """alpha = 2 / (period + 1), seeded with the first value (pandas ewm adjust=False)"""
+
+    __slots__ = ("period", "alpha", "value")
+
+    def __init__(self, period: int, alpha: float = None):
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+        self.value = NAN
+
+    @property
+    def ready(self) -> bool:
+        return self.value == self.value
+
+    def peek(self, x: float) -> float:
+        if self.value != self.value:
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def update(self, x: float) -> float:
+        self.value = self.peek(x)
+        return self.value
+
+
+class Rolling(Incremental):
+    """
+    Mean / variance of the last `period` values: ring buffer + sliding Welford.
+    The sums are re-derived from the buffer once per wrap (amortised O(1))
+    so rounding drift never accumulates.
+    """
+
+    __slots__ = ("period", "buffer", "pos", "count", "mean", "m2")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = [0.0] * period
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def _next(self, x: float) -> tuple:
+        """(mean, m2) after adding x (and dropping the oldest value once full)"""
+        if self.count < self.period:
+            n = self.count + 1
+            delta = x - self.mean
+            mean = self.mean + delta / n
+            return mean, self.m2 + delta * (x - mean)
+        old = self.buffer[self.pos]
+        mean = self.mean + (x - old) / self.period
+        return mean, self.m2 + (x - old) * (x - mean + old - self.mean)
+
+    def peek(self, x: float) -> float:
+        """Mean with x included (NaN until the window is full)"""
+        if self.count + 1 < self.period:
+            return NAN
+        return self._next(x)[0]
+
+    def peek_std(self, x: float, ddof: int = 1) -> float:
+        if self.count + 1 < self.period:
+            return NAN
+        return math.sqrt(max(self._next(x)[1], 0.0) / (self.period - ddof))
+
+    def update(self, x: float) -> float:
+        self.mean, self.m2 = self._next(x)
+        self.buffer[self.pos] = x
+        self.count = min(self.count + 1, self.period)
+        self.pos += 1
+        if self.pos == self.period:
+            self.pos = 0
+            self.mean = math.fsum(self.buffer) / self.period
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.buffer)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.mean if self.ready else NAN
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.ready:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.period - ddof))
+
+
+class SMA(Rolling):
+    """Simple moving average (also the volume SMA)"""
+
+    __slots__ = ()
+
+
+class RSI(Incremental):
+    """
+    wilder: mean of the first `period` gains/losses, then Wilder smoothing.
+    sma:    mean of the last `period` gains/losses (Smart Sniper's rolling RSI).
+    """
+
+    __slots__ = ("period", "method", "prev", "deltas", "avg_gain", "avg_loss", "gains", "losses")
+
+    def __init__(self, period: int = RSI_PERIOD, method: str = "wilder"):
+        if method not in ("wilder", "sma"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.prev = NAN
+        self.deltas = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.gains = Rolling(period)
+        self.losses = Rolling(period)
+
+    @property
+    def ready(self) -> bool:
+        return self.deltas >= self.period
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def _averages(self, close: float) -> tuple:
+        """(deltas, avg_gain, avg_loss) with `close` applied"""
+        delta = close - self.prev
+        gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta)
+        n = self.deltas + 1
+        if self.method == "sma":
+            return n, self.gains._next(gain)[0], self.losses._next(loss)[0]
+        if n <= self.period:
+            # Warm-up: running mean of the first `period` moves
+            return n, self.avg_gain + (gain - self.avg_gain) / n, self.avg_loss + (loss - self.avg_loss) / n
+        p = self.period
+        return n, (self.avg_gain * (p - 1) + gain) / p, (self.avg_loss * (p - 1) + loss) / p
+
+    def peek(self, close: float) -> float:
+        if self.prev != self.prev:
+            return NAN
+        n, gain, loss = self._averages(close)
+        return self._rsi(gain, loss) if n >= self.period else NAN
+
+    def update(self, close: float) -> float:
+        if self.method == "sma" and self.prev == self.prev:
+            delta = close - self.prev
+            self.gains.update(delta if delta > 0 else 0.0)
+            self.losses.update(-delta if delta < 0 else 0.0)
+            self.deltas += 1
+            self.avg_gain, self.avg_loss = self.gains.mean, self.losses.mean
+        elif self.prev == self.prev:
+            self.deltas, self.avg_gain, self.avg_loss = self._averages(close)
+        self.prev = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.avg_gain, self.avg_loss) if self.ready else NAN
+
+
+class MACD(Incremental):
+    """(macd, signal, histogram) from three EMAs"""
+
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def peek(self, close: float) -> tuple:
+        line = self.fast.peek(close) - self.slow.peek(close)
+        signal = self.signal.peek(line)
+        return line, signal, line - signal
+
+    def update(self, close: float) -> tuple:
+        line = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(line)
+        return line, signal, line - signal
+
+    @property
+    def value(self) -> tuple:
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+
+class Bollinger(Incremental):
+    """(middle, upper, lower), sample std like indicators.bollinger"""
+
+    __slots__ = ("window", "num_std", "ddof")
+
+    def __init__(self, period: int = BB_PERIOD, num_std: float = BB_STD, ddof: int = 1):
+        self.window = Rolling(period)
+        self.num_std = num_std
+        self.ddof = ddof
+
+    def _bands(self, mid: float, std: float) -> tuple:
+        return mid, mid + self.num_std * std, mid - self.num_std * std
+
+    def peek(self, close: float) -> tuple:
+        return self._bands(self.window.peek(close), self.window.peek_std(close, self.ddof))
+
+    def update(self, close: float) -> tuple:
+        self.window.update(close)
+        return self.value
+
+    @property
+    def value(self) -> tuple:
+        return self._bands(self.window.value, self.window.std(self.ddof))
+
+
+class ATR(Incremental):
+    """Wilder ATR; ATR[period-1] is the mean true range of the first `period` candles"""
+
+    __slots__ = ("period", "prev_close", "count", "avg")
+
+    def __init__(self, period: int = ATR_PERIOD):
+        self.period = period
+        self.prev_close = NAN
+        self.count = 0
+        self.avg = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def _next(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self.prev_close == self.prev_close:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        n = self.count + 1
+        if n <= self.period:
+            # Warm-up: running mean of the true ranges so far
+            return self.avg + (tr - self.avg) / n
+        return (self.avg * (self.period - 1) + tr) / self.period
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        value = self._next(high, low, close)
+        return value if self.count + 1 >= self.period else NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.avg = self._next(high, low, close)
+        self.count += 1
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.avg if self.ready else NAN
+
+
+def volume_sma(period: int = VOLUME_SMA_PERIOD) -> SMA:
+    return SMA(period)
@@ -0,0 +1,187 @@
+"""
+Indicators — vectorized NumPy technical indicators
+For OCEAN HUNTER V10.8.2
+RSI, EMA, SMA, Bollinger Bands, MACD, ATR and volume SMA over whole arrays,
+with no per-element Python loops. Every function works along the last axis,
+so a 1-D series and a 2-D (symbols x candles) matrix go through the same code.
+
+Warm-up semantics (outputs always have the input's shape):
+  sma / bollinger / volume_sma   NaN for the first period-1 candles
+  rsi (wilder / sma)             NaN for the first `period` candles (needs period deltas)
+  atr                            NaN for the first period-1 candles; ATR[period-1] is
+                                 the mean true range of candles 0..period-1 (TR[0] = high-low)
+  ema / macd                     defined from candle 0: seeded with the first value
+                                 (pandas ewm(adjust=False)); the first ~3*period values
+                                 still carry that seed
+"""
+
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+RSI_PERIOD = 14
+BB_PERIOD, BB_STD = 20, 2.0
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ATR_PERIOD = 14
+VOLUME_SMA_PERIOD = 20
+
+_MAX_SCALE = 100 * math.log(10)     # ewm block length keeps decay factors below 1e100
+
+
+def _array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def _ewm(x: np.ndarray, alpha: float, prev) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] along the last axis, y[-1] = prev.
+    Closed form per block: y = d^(k+1) * (prev + alpha * cumsum(x * d^-(j+1))),
+    with blocks short enough that d^-L stays finite (a handful per 10k candles).
+    """
+    out = np.empty(x.shape)
+    if alpha >= 1:
+        out[...] = x
+        return out
+    decay = 1.0 - alpha
+    block = max(1, int(_MAX_SCALE / -math.log(decay)))
+    prev = np.asarray(prev, dtype=np.float64)
+    n = x.shape[-1]
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        scale = decay ** -np.arange(1, stop - start + 1)
+        y = (prev[..., None] + alpha * np.cumsum(x[..., start:stop] * scale, axis=-1)) / scale
+        out[..., start:stop] = y
+        prev = y[..., -1]
+    return out
+
+
+def _rolling(x: np.ndarray, period: int):
+    """Windows of `period` along the last axis (view), or None if too short"""
+    if x.shape[-1] < period:
+        return None
+    return sliding_window_view(x, period, axis=-1)
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average; NaN until `period` values exist"""
+    x = _array(values)
+    out = _nan_like(x)
+    windows = _rolling(x, period)
+    if windows is not None:
+        out[..., period - 1:] = windows.mean(axis=-1)
+    return out
+
+
+def ema(values, period: int) -> np.ndarray:
+    """Exponential moving average, alpha = 2 / (period + 1), seeded with the first value"""
+    x = _array(values)
+    if not x.shape[-1]:
+        return x.copy()
+    return _ewm(x, 2.0 / (period + 1), x[..., 0])
+
+
+def rsi_averages(close, period: int = RSI_PERIOD, method: str = "wilder") -> tuple:
+    """
+    (avg_gain, avg_loss) behind rsi(): one value per delta window, aligned so
+    that the last entry belongs to the last candle. None if fewer than period+1 values.
+    """
+    x = _array(close)
+    if x.shape[-1] < period + 1:
+        return None
+    delta = np.diff(x, axis=-1)
+    gains = np.maximum(delta, 0.0)
+    losses = np.maximum(-delta, 0.0)
+    if method == "wilder":
+        avg_gain = np.empty(delta.shape[:-1] + (delta.shape[-1] - period + 1,))
+        avg_loss = np.empty_like(avg_gain)
+        avg_gain[..., 0] = gains[..., :period].mean(axis=-1)
+        avg_loss[..., 0] = losses[..., :period].mean(axis=-1)
+        avg_gain[..., 1:] = _ewm(gains[..., period:], 1.0 / period, avg_gain[..., 0])
+        avg_loss[..., 1:] = _ewm(losses[..., period:], 1.0 / period, avg_loss[..., 0])
+    elif method == "sma":
+        avg_gain = _rolling(gains, period).mean(axis=-1)
+        avg_loss = _rolling(losses, period).mean(axis=-1)
+    else:
+        raise ValueError(f"Unknown RSI method: {method}")
+    return avg_gain, avg_loss
+
+
+def rsi_from_averages(avg_gain, avg_loss) -> np.ndarray:
+    """100 - 100 / (1 + RS); a window without losses is 100"""
+    avg_gain, avg_loss = _array(avg_gain), _array(avg_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, value)
+
+
+def rsi(close, period: int = RSI_PERIOD, method: str = "wilder") -> np.ndarray:
+    """
+    Relative Strength Index.
+    wilder: averages seeded with the mean of the first `period` gains/losses,
+            then Wilder smoothing (m_analysis.calculate_rsi).
+    sma:    plain mean of the last `period` gains/losses (analysis.technical,
+            the pandas rolling RSI of the Smart Sniper backtest).
+    A window without losses is 100.
+    """
+    x = _array(close)
+    out = _nan_like(x)
+    averages = rsi_averages(x, period, method)
+    if averages is not None:
+        out[..., period:] = rsi_from_averages(*averages)
+    return out
+
+
+def bollinger(close, period: int = BB_PERIOD, num_std: float = BB_STD, ddof: int = 1) -> tuple:
+    """(middle, upper, lower); sample std (ddof=1) like pandas rolling().std()"""
+    x = _array(close)
+    mid, std = _nan_like(x), _nan_like(x)
+    windows = _rolling(x, period)
+    if windows is not None:
+        mid[..., period - 1:] = windows.mean(axis=-1)
+        std[..., period - 1:] = windows.std(axis=-1, ddof=ddof)
+    return mid, mid + num_std * std, mid - num_std * std
+
+
+def macd(close, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL) -> tuple:
+    """(macd, signal, histogram)"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def true_range(high, low, close) -> np.ndarray:
+    h, l, c = _array(high), _array(low), _array(close)
+    tr = h - l
+    if tr.shape[-1] > 1:
+        prev = c[..., :-1]
+        tr[..., 1:] = np.maximum(tr[..., 1:], np.maximum(np.abs(h[..., 1:] - prev),
+                                                         np.abs(l[..., 1:] - prev)))
+    return tr
+
+
+def atr(high, low, close, period: int = ATR_PERIOD) -> np.ndarray:
+    """Average True Range with Wilder smoothing"""
+    tr = true_range(high, low, close)
+    out = _nan_like(tr)
+    if tr.shape[-1] < period:
+        return out
+    seed = tr[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = _ewm(tr[..., period:], 1.0 / period, seed)
+    return out
+
+
+def volume_sma(volume, period: int = VOLUME_SMA_PERIOD) -> np.ndarray:
+    return sma(volume, period)
+
+
+def last(values, default=None):
+    """Newest value of a 1-D indicator as a float (default if empty or still warming up)"""
+    x = np.asarray(values)
+    if not x.size or np.isnan(x[-1]):
+        return default
+    return float(x[-1])
@@ -0,0 +1,200 @@
+"""
+Analysis Memo — candle-close-aware memoization
+For OCEAN HUNTER V10.8.2
+run_bot.py re-evaluates every second on 1m candles and main.py re-runs
+analyze_market(), yet the closed candles only change once per interval.
+Whatever depends on them alone is cached under
+(symbol, interval, last closed candle timestamp, parameter hash); between
+closes only the still-open candle is folded in, which costs O(1).
+The last candle of a window is treated as the open one: once it closes a
+new candle follows it and the key moves on by itself. The last closed
+candle's values are part of the key too, so a closed candle rewritten
+later (stream snapshot replaced by the REST row) is recomputed.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 256
+
+
+def timestamps(candles) -> tuple:
+    """(first, second-to-last, last) candle timestamps, or None if the candles carry none"""
+    column = getattr(candles, "timestamp", None)
+    try:
+        if column is not None:
+            return int(column[0]), int(column[-2]), int(column[-1])
+        first, closed, last = candles[0], candles[-2], candles[-1]
+        if isinstance(first, dict):
+            return int(first["timestamp"]), int(closed["timestamp"]), int(last["timestamp"])
+        return int(first[0]), int(closed[0]), int(last[0])      # raw kline rows
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def rsi_state(closes, period: int, method: str) -> tuple:
+    """
+    RSI averages over the closed candles, in a form rsi_finish() extends by one close.
+    wilder: (prev close, avg_gain, avg_loss) after m_analysis.calculate_rsi's smoothing.
+    sma:    (prev close, sum, sum) of the last period-1 gains/losses.
+    Same summation order as the entry points, so the results are bit-identical.
+    Needs len(closes) > period.
+    """
+    gains, losses = [], []
+    for i in range(1, len(closes)):
+        delta = closes[i] - closes[i - 1]
+        gains.append(max(delta, 0))
+        losses.append(abs(min(delta, 0)))
+    if method == "sma":
+        return closes[-1], sum(gains[len(gains) - period + 1:]), sum(losses[len(losses) - period + 1:])
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    return closes[-1], avg_gain, avg_loss
+
+
+def rsi_finish(state: tuple, close: float, period: int, method: str) -> tuple:
+    """(avg_gain, avg_loss) once the open candle's close is added"""
+    prev, gain_acc, loss_acc = state
+    delta = close - prev
+    gain, loss = max(delta, 0), abs(min(delta, 0))
+    if method == "sma":
+        return (gain_acc + gain) / period, (loss_acc + loss) / period
+    return (gain_acc * (period - 1) + gain) / period, (loss_acc * (period - 1) + loss) / period
+
+
+class _Counters:
+    __slots__ = ("hits", "misses", "evictions", "compute_s", "finish_s")
+
+    def __init__(self):
+        self.hits = self.misses = self.evictions = 0
+        self.compute_s = self.finish_s = 0.0
+
+    def to_dict(self) -> dict:
+        total = self.hits + self.misses
+        avg_compute = self.compute_s / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "compute_ms": round(self.compute_s * 1000, 3),
+            # Closed-candle work a hit did not redo, priced at the average miss
+            "saved_ms": round(max(self.hits * avg_compute - self.finish_s, 0.0) * 1000, 3),
+        }
+
+
+class AnalysisMemo:
+    """
+    Thread-safe LRU of closed-candle state. state() returns the cached value
+    for a key or runs compute() once and stores it; the caller finishes the
+    open candle itself. Cached states are shared: treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(symbol: str, interval, last_closed: int, params: tuple) -> tuple:
+        # The params themselves, not hash(params): equal hashes must not share state
+        return (symbol, interval, int(last_closed), tuple(params))
+
+    def _counter(self, name: str) -> _Counters:
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = _Counters()
+        return counter
+
+    def lookup(self, name: str, key: tuple):
+        """Cached state or None (counted as a hit when found)"""
+        full_key = (name,) + key
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self._counter(name).hits += 1
+            return entry
+
+    def store(self, name: str, key: tuple, entry, seconds: float = 0.0):
+        """Cache a freshly computed state (counted as a miss costing `seconds`)"""
+        full_key = (name,) + key
+        with self._lock:
+            counter = self._counter(name)
+            counter.misses += 1
+            counter.compute_s += seconds
+            self._entries[full_key] = entry
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._counter(old_key[0]).evictions += 1
+
+    def state(self, name: str, key: tuple, compute):
+        """Closed-candle state of one analysis (`name` groups the metrics)"""
+        entry = self.lookup(name, key)
+        if entry is None:
+            start = time.perf_counter()
+            entry = compute()
+            self.store(name, key, entry, time.perf_counter() - start)
+        return entry
+
+    def record_finish(self, name: str, seconds: float):
+        """Time spent on the open-candle part (counted against saved_ms)"""
+        with self._lock:
+            self._counter(name).finish_s += seconds
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            # Batch entries are keyed by the tuple of their symbols
+            for key in [k for k in self._entries
+                        if k[1] == symbol or (isinstance(k[1], tuple) and symbol in k[1])]:
+                del self._entries[key]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "analyses": {name: c.to_dict() for name, c in self._counters.items()},
+            }
+
+
+def memo_rsi(name: str, symbol: str, candles, closes: list, period: int, method: str, interval=None):
+    """
+    (avg_gain, avg_loss) of `closes` (one per candle, the last one open), from
+    the memoized closed-candle state; None when the candles cannot be keyed
+    (no timestamps, too short) so the caller computes in full.
+    """
+    if len(closes) < period + 2:
+        return None
+    stamps = timestamps(candles)
+    if stamps is None:
+        return None
+    first, last_closed, last = stamps
+    memo = get_analysis_memo()
+    # Window start and length are part of the params (Wilder RSI depends on its seed), and so
+    # is the last closed close: a REST rewrite of a stream-pushed candle must not hit stale state
+    key = memo.key(symbol, interval or last - last_closed, last_closed,
+                   (period, method, first, len(closes), closes[-2]))
+    state = memo.state(name, key, lambda: rsi_state(closes[:-1], period, method))
+    start = time.perf_counter()
+    averages = rsi_finish(state, closes[-1], period, method)
+    memo.record_finish(name, time.perf_counter() - start)
+    return averages
+
+
+_analysis_memo = None
+_analysis_memo_lock = threading.Lock()
+
+def get_analysis_memo() -> AnalysisMemo:
+    global _analysis_memo
+    with _analysis_memo_lock:
+        if _analysis_memo is None:
+            _analysis_memo = AnalysisMemo()
+        return _analysis_memo
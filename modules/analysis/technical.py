@@ -1,4 +1,6 @@
 # modules/analysis/technical.py
+from .memo import memo_rsi
+
 def calculate_rsi(prices, period=14):
     if len(prices) < period + 1: return 50
     gains, losses = [], []
@@ -13,10 +15,17 @@ def calculate_rsi(prices, period=14):
     rs = avg_gain / avg_loss
     return round(100 - (100 / (1 + rs)), 2)
 
-def analyze_market(symbol, candles):
+def _rsi_from_averages(avg_gain, avg_loss):
+    if avg_loss == 0: return 100
+    rs = avg_gain / avg_loss
+    return round(100 - (100 / (1 + rs)), 2)
+
+def analyze_market(symbol, candles, interval=None):
     if not candles: return {"signal": "NEUTRAL", "reason": "No Data", "price": 0, "rsi": 0}
-    closes = [c['close'] for c in candles]
-    rsi = calculate_rsi(closes)
+    column = getattr(candles, 'close', None)
+    closes = column.tolist() if column is not None else [c['close'] for c in candles]
+    averages = memo_rsi("technical.rsi", symbol, candles, closes, 14, "sma", interval)
+    rsi = calculate_rsi(closes) if averages is None else _rsi_from_averages(*averages)
     signal, reason = "NEUTRAL", f"RSI {rsi}"
     if rsi < 30: signal, reason = "BUY 🟢", f"Oversold ({rsi})"
     elif rsi > 70: signal, reason = "SELL 🔴", f"Overbought ({rsi})"
@@ -1,4 +1,9 @@
 # modules/data/__init__.py
 from .collector import DataCollector, get_collector
 from .storage import DataStorage, get_storage
-__all__ = ["DataCollector", "get_collector", "DataStorage", "get_storage"]
+from .backfill import Backfiller
+from .resampler import Resampler
+from .candles import Candle, CandleSeries
+from .order_book import OrderBook, OrderBookManager, get_order_books
+__all__ = ["DataCollector", "get_collector", "DataStorage", "get_storage", "Backfiller", "Resampler",
+           "Candle", "CandleSeries", "OrderBook", "OrderBookManager", "get_order_books"]
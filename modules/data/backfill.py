@@ -0,0 +1,282 @@
+"""
+Historical Backfill — paginated, concurrent, resumable
+For OCEAN HUNTER V10.8.2
+Pages MEXC /klines (1000 per request) and Nobitex udf/history over arbitrary
+ranges. Jobs (source, symbol, interval) run concurrently under the shared
+per-exchange rate limiter; after every stored page the cursor is checkpointed,
+so an interrupted multi-year download resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from modules.network.mexc_async import get_async_client, run_sync
+from modules.network.mexc_stream import INTERVAL_MS
+from .storage import get_storage
+
+logger = logging.getLogger("BACKFILL")
+
+SOURCE_MEXC = "mexc"
+SOURCE_NOBITEX = "nobitex"
+
+MEXC_PAGE = 1000        # klines per MEXC request (API cap)
+NOBITEX_PAGE = 500      # bars per udf/history window
+MAX_JOBS = 4            # jobs in flight; pages inside a job stay sequential
+RETRIES = 4
+
+# Our interval names → Nobitex udf resolutions
+NOBITEX_RESOLUTIONS = {
+    "1m": "1", "5m": "5", "15m": "15", "30m": "30", "60m": "60",
+    "4h": "240", "1d": "D",
+}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CHECKPOINT = os.path.join(_ROOT, "data", "backfill_checkpoint.json")
+
+
+def to_ms(value) -> int:
+    """Epoch ms from datetime, "YYYY-MM-DD[ HH:MM]", epoch seconds or epoch ms"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, str):
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                return to_ms(datetime.strptime(value, fmt))
+            except ValueError:
+                continue
+        value = float(value)
+    value = int(value)
+    return value if value > 10**11 else value * 1000
+
+
+class BackfillJob:
+    """One (source, symbol, interval) range; `cursor` is the next open time to fetch"""
+
+    __slots__ = ("source", "symbol", "interval", "start", "end", "cursor", "rows", "status", "error")
+
+    def __init__(self, source: str, symbol: str, interval: str, start: int, end: int):
+        self.source = source
+        self.symbol = symbol
+        self.interval = interval
+        self.start = start
+        self.end = end
+        self.cursor = start
+        self.rows = 0
+        self.status = "pending"
+        self.error = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.source}:{self.symbol}:{self.interval}"
+
+    @property
+    def step(self) -> int:
+        return INTERVAL_MS[self.interval]
+
+    @property
+    def progress(self) -> float:
+        span = self.end - self.start
+        return 1.0 if span <= 0 else min((self.cursor - self.start) / span, 1.0)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Checkpoint:
+    """Job cursors in one JSON file, rewritten atomically after every page"""
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+
+    def restore(self, job: BackfillJob):
+        """Continue from the saved cursor if the saved run covered the same start"""
+        saved = self._state.get(job.key)
+        if not saved or saved.get("start") != job.start:
+            return
+        job.cursor = min(max(saved.get("cursor", job.start), job.start), max(job.end, job.start))
+        job.rows = saved.get("rows", 0)
+
+    def save(self, job: BackfillJob):
+        with self._lock:
+            self._state[job.key] = {
+                "start": job.start, "end": job.end, "cursor": job.cursor,
+                "rows": job.rows, "status": job.status, "updated": int(time.time()),
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp, self.path)
+
+    def get(self, key: str) -> dict:
+        with self._lock:
+            return dict(self._state.get(key, {}))
+
+
+class Backfiller:
+    """
+    Download [start, end) for every (symbol, interval) into DataStorage.
+    Only closed candles are stored: `end` is clipped to the open candle.
+    """
+
+    def __init__(self, source: str = SOURCE_MEXC, storage=None, checkpoint: Checkpoint = None,
+                 max_jobs: int = MAX_JOBS, retries: int = RETRIES):
+        if source not in (SOURCE_MEXC, SOURCE_NOBITEX):
+            raise ValueError(f"Unknown backfill source: {source}")
+        self.source = source
+        self.storage = storage or get_storage()
+        self.checkpoint = checkpoint or Checkpoint()
+        self.max_jobs = max_jobs
+        self.retries = retries
+        self._nobitex = None
+
+    def plan(self, symbols: list, intervals: list, start, end=None) -> list:
+        start_ms = to_ms(start)
+        now_ms = int(time.time() * 1000)
+        end_ms = now_ms if end is None else min(to_ms(end), now_ms)
+        jobs = []
+        for interval in intervals:
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval: {interval}")
+            if self.source == SOURCE_NOBITEX and interval not in NOBITEX_RESOLUTIONS:
+                raise ValueError(f"Nobitex has no resolution for {interval}")
+            step = INTERVAL_MS[interval]
+            for symbol in symbols:
+                job = BackfillJob(self.source, symbol, interval,
+                                  start_ms // step * step, end_ms // step * step)
+                self.checkpoint.restore(job)
+                jobs.append(job)
+        return jobs
+
+    def run(self, symbols: list, intervals: list, start, end=None) -> list:
+        """Blocking entry point; returns the finished jobs"""
+        jobs = self.plan(symbols, intervals, start, end)
+        return run_sync(self.run_jobs(jobs))
+
+    async def run_jobs(self, jobs: list) -> list:
+        slots = asyncio.Semaphore(self.max_jobs)
+
+        async def guarded(job):
+            async with slots:
+                await self._run_job(job)
+
+        await asyncio.gather(*(guarded(job) for job in jobs))
+        return jobs
+
+    async def _run_job(self, job: BackfillJob):
+        if job.cursor >= job.end:
+            job.status = "done"
+            return
+        job.status = "running"
+        logger.info(f"Backfill {job.key} from {_fmt(job.cursor)} to {_fmt(job.end)}")
+        while job.cursor < job.end:
+            window_end = min(job.cursor + job.step * self._page_size(), job.end)
+            rows = await self._fetch_with_retry(job, window_end)
+            if rows is None:
+                job.status = "failed"
+                self.checkpoint.save(job)
+                logger.error(f"Backfill {job.key} stopped at {_fmt(job.cursor)}: {job.error}")
+                return
+            rows = sorted((r for r in rows if job.cursor <= r["open_time"] < window_end),
+                          key=lambda r: r["open_time"])
+            if rows:
+                # Store before advancing the cursor: a crash re-fetches, never skips
+                await asyncio.to_thread(self.storage.save_ohlcv, job.symbol,
+                                        [self._storage_row(r) for r in rows], job.interval)
+                job.rows += len(rows)
+                job.cursor = max(rows[-1]["open_time"] + job.step, job.cursor + job.step)
+                if len(rows) < self._page_size() and job.cursor < window_end:
+                    # Short page: nothing more exists inside this window
+                    job.cursor = window_end
+            else:
+                job.cursor = window_end  # empty window (before listing, halt)
+            self.checkpoint.save(job)
+        job.status = "done"
+        self.checkpoint.save(job)
+        logger.info(f"Backfill {job.key} done: {job.rows} candles")
+
+    def _page_size(self) -> int:
+        return MEXC_PAGE if self.source == SOURCE_MEXC else NOBITEX_PAGE
+
+    async def _fetch_with_retry(self, job: BackfillJob, window_end: int):
+        delay = 1.0
+        for attempt in range(self.retries + 1):
+            try:
+                if self.source == SOURCE_MEXC:
+                    return await self._fetch_mexc(job, window_end)
+                return await self._fetch_nobitex(job, window_end)
+            except (ConnectionError, ValueError) as e:
+                job.error = str(e)
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        return None
+
+    async def _fetch_mexc(self, job: BackfillJob, window_end: int) -> list:
+        data = await get_async_client().get_klines(job.symbol, job.interval, MEXC_PAGE,
+                                                   start_time=job.cursor, end_time=window_end - 1)
+        if not isinstance(data, list):
+            raise ConnectionError(data.get("error") or data.get("msg") or str(data))
+        return [mexc_row(row) for row in data]
+
+    async def _fetch_nobitex(self, job: BackfillJob, window_end: int) -> list:
+        if self._nobitex is None:
+            from modules.network.nobitex_api import NobitexAPI
+            self._nobitex = NobitexAPI()
+        # udf/history takes seconds and an inclusive `to`
+        result = await asyncio.to_thread(
+            self._nobitex.get_ohlcv, job.symbol, NOBITEX_RESOLUTIONS[job.interval],
+            job.cursor // 1000, (window_end - 1) // 1000)
+        status = result.get("s")
+        if status == "no_data":
+            return []
+        if status != "ok":
+            raise ConnectionError(result.get("msg", "Unknown Error"))
+        return nobitex_rows(result)
+
+    @staticmethod
+    def _storage_row(row: dict) -> dict:
+        # DataStorage keeps epoch seconds
+        return {
+            "timestamp": row["open_time"] // 1000,
+            "open": row["open"], "high": row["high"], "low": row["low"],
+            "close": row["close"], "volume": row["volume"],
+        }
+
+
+def mexc_row(row: list) -> dict:
+    """[openTime, open, high, low, close, volume, closeTime, quoteVolume]"""
+    return {
+        "open_time": int(row[0]), "open": float(row[1]), "high": float(row[2]),
+        "low": float(row[3]), "close": float(row[4]), "volume": float(row[5]),
+    }
+
+
+def nobitex_rows(result: dict) -> list:
+    """udf/history columns {t, o, h, l, c, v} (seconds) → rows"""
+    columns = zip(result.get("t", []), result.get("o", []), result.get("h", []),
+                  result.get("l", []), result.get("c", []), result.get("v", []))
+    return [
+        {"open_time": int(t) * 1000, "open": float(o), "high": float(h),
+         "low": float(l), "close": float(c), "volume": float(v)}
+        for t, o, h, l, c, v in columns
+    ]
+
+
+def _fmt(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
@@ -0,0 +1,434 @@
+"""
+Candle Store — columnar binary OHLCV files
+For OCEAN HUNTER V10.8.2
+One directory per symbol/interval: a fixed-size header (row count, time
+range) plus one raw column file per field — int64 timestamps and float64
+open/high/low/close/volume. Columns are memory-mapped with NumPy, so loading
+a year of 1m candles is a few page-table entries, not 500k Python objects.
+A sorted timestamp index (kept in memory, persisted in index.bin) makes
+writes cost O(batch): new candles are appended, overlaps are updated in
+place and late candles are slotted into the index instead of a rewrite.
+Reads never scan: fixed-width rows turn a time range into byte offsets,
+found by binary search over the memory-mapped timestamp column.
+"""
+
+import os
+import struct
+import threading
+import numpy as np
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+DTYPES = {name: np.dtype("<i8") if name == "timestamp" else np.dtype("<f8") for name in COLUMNS}
+ROW_BYTES = sum(dtype.itemsize for dtype in DTYPES.values())
+
+MAGIC = b"OHLC"
+VERSION = 1
+# magic, version, column count, rows, first timestamp, last timestamp
+HEADER = struct.Struct("<4sHHQqq")
+HEADER_FILE = "header.bin"
+
+INDEX_MAGIC = b"OIDX"
+# magic, version, flags, rows covered; then int64 row positions in timestamp order
+INDEX_HEADER = struct.Struct("<4sHHQ")
+INDEX_FILE = "index.bin"
+INDEX_IDENTITY = 1      # rows are physically in timestamp order: no positions stored
+
+
+class CandleStoreError(ValueError):
+    """Corrupt header or mismatched column lengths"""
+
+
+class TimestampIndex:
+    """
+    Sorted timestamps of a store and the row holding each.
+    While rows arrive in order the mapping is the identity and only the
+    timestamps are kept; the first late insert materialises positions.
+    Buffers grow by doubling, so tail appends are amortised O(batch).
+    """
+
+    def __init__(self):
+        self._ts = np.empty(0, dtype=np.int64)
+        self._pos = None
+        self.size = 0
+
+    @property
+    def identity(self) -> bool:
+        return self._pos is None
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._ts[:self.size]
+
+    def positions(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Row numbers of sorted entries [start, stop)"""
+        stop = self.size if stop is None else stop
+        if self._pos is None:
+            return np.arange(start, stop, dtype=np.int64)
+        return self._pos[start:stop]
+
+    def reset(self, ts: np.ndarray, positions: np.ndarray = None):
+        """ts in row order (positions None) or already sorted with their rows"""
+        ts = np.asarray(ts, dtype=np.int64)
+        if positions is None and len(ts) > 1 and not (ts[1:] > ts[:-1]).all():
+            positions = np.argsort(ts, kind="stable")
+            ts = ts[positions]
+        self.size = len(ts)
+        self._ts = np.array(ts, dtype=np.int64)
+        self._pos = None if positions is None else np.array(positions, dtype=np.int64)
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        if needed <= len(self._ts):
+            return
+        capacity = max(needed, 2 * len(self._ts), 1024)
+        ts = np.empty(capacity, dtype=np.int64)
+        ts[:self.size] = self._ts[:self.size]
+        self._ts = ts
+        if self._pos is not None:
+            pos = np.empty(capacity, dtype=np.int64)
+            pos[:self.size] = self._pos[:self.size]
+            self._pos = pos
+
+    def append(self, ts: np.ndarray, first_row: int):
+        """Sorted timestamps newer than everything indexed, stored from `first_row` on"""
+        count = len(ts)
+        self._reserve(count)
+        self._ts[self.size:self.size + count] = ts
+        if self._pos is not None:
+            self._pos[self.size:self.size + count] = np.arange(first_row, first_row + count)
+        self.size += count
+
+    def insert(self, ts: np.ndarray, rows: np.ndarray):
+        """Timestamps anywhere in the range (sorted, not yet indexed) and their rows"""
+        at = np.searchsorted(self.timestamps, ts)
+        positions = self.positions()
+        self._ts = np.insert(self.timestamps, at, ts)
+        self._pos = np.insert(positions, at, rows)
+        self.size = len(self._ts)
+
+    def locate(self, ts: np.ndarray):
+        """(found mask, row numbers of the found timestamps)"""
+        if self.size == 0:
+            return np.zeros(len(ts), dtype=bool), np.empty(0, dtype=np.int64)
+        at = np.searchsorted(self.timestamps, ts)
+        clipped = np.minimum(at, self.size - 1)
+        found = self._ts[clipped] == ts
+        found &= at < self.size
+        rows = at[found] if self._pos is None else self._pos[at[found]]
+        return found, rows
+
+
+class CandleStore:
+    """
+    Columnar series of one symbol/interval. Timestamps are epoch seconds.
+    Rows are stored in arrival order; the index gives timestamp order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self.rows = 0
+        self.first_ts = None
+        self.last_ts = None      # high-water mark
+        self._index = None       # built on first write or unordered read
+        self._ordered = None     # from the index.bin header; None = unknown
+        self._read_header()
+        self._recover()
+        self._read_index_header()
+
+    def __len__(self):
+        return self.rows
+
+    def _column_path(self, name: str) -> str:
+        suffix = "i64" if name == "timestamp" else "f64"
+        return os.path.join(self.path, f"{name}.{suffix}")
+
+    # ── header ──
+
+    def _read_header(self):
+        path = os.path.join(self.path, HEADER_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            raw = f.read(HEADER.size)
+        if len(raw) != HEADER.size:
+            raise CandleStoreError(f"{path}: truncated header")
+        magic, version, ncols, rows, first, last = HEADER.unpack(raw)
+        if magic != MAGIC or version != VERSION or ncols != len(COLUMNS):
+            raise CandleStoreError(f"{path}: not a v{VERSION} candle store")
+        self.rows = rows
+        self.first_ts = first if rows else None
+        self.last_ts = last if rows else None
+
+    def _write_header(self):
+        path = os.path.join(self.path, HEADER_FILE)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), self.rows,
+                                self.first_ts or 0, self.last_ts or 0))
+        os.replace(tmp, path)
+
+    def _recover(self):
+        """
+        The header is written after the columns, so it is the commit point:
+        bytes past `rows` are an interrupted append and are cut off.
+        """
+        sizes = []
+        for name in COLUMNS:
+            path = self._column_path(name)
+            sizes.append(os.path.getsize(path) if os.path.exists(path) else 0)
+        complete = min(size // DTYPES[name].itemsize for name, size in zip(COLUMNS, sizes))
+        if complete < self.rows:
+            # Header ahead of the data (copied store, lost file): trust the columns
+            self.rows = complete
+            ts = self.column("timestamp")
+            self.first_ts = int(ts.min()) if complete else None
+            self.last_ts = int(ts.max()) if complete else None
+            self._write_header()
+        for name, size in zip(COLUMNS, sizes):
+            # Byte sizes: a torn write can leave part of a row behind
+            if size > self.rows * DTYPES[name].itemsize:
+                with open(self._column_path(name), "r+b") as f:
+                    f.truncate(self.rows * DTYPES[name].itemsize)
+
+    def header(self) -> dict:
+        return {"rows": self.rows, "first_ts": self.first_ts, "last_ts": self.last_ts,
+                "ordered": self.ordered}
+
+    # ── index sidecar ──
+
+    @property
+    def index(self) -> TimestampIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = TimestampIndex()
+                self._load_index()
+            return self._index
+
+    @property
+    def ordered(self) -> bool:
+        """Rows physically in timestamp order (reads are plain slices)"""
+        if self._index is not None:
+            return self._index.identity
+        if self._ordered is None:
+            return self.index.identity
+        return self._ordered
+
+    def _read_index_header(self):
+        """Only the flags: enough to serve ordered reads without loading the index"""
+        path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            raw = f.read(INDEX_HEADER.size)
+        if len(raw) == INDEX_HEADER.size:
+            magic, version, flags, covered = INDEX_HEADER.unpack(raw)
+            if magic == INDEX_MAGIC and version == VERSION and covered == self.rows:
+                self._ordered = bool(flags & INDEX_IDENTITY)
+
+    def _load_index(self):
+        """Read index.bin; rebuild from the timestamp column if it is missing or stale"""
+        path = os.path.join(self.path, INDEX_FILE)
+        ts = np.array(self.column("timestamp"))
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = f.read(INDEX_HEADER.size)
+                if len(raw) == INDEX_HEADER.size:
+                    magic, version, flags, covered = INDEX_HEADER.unpack(raw)
+                    if magic == INDEX_MAGIC and version == VERSION and covered == self.rows:
+                        if flags & INDEX_IDENTITY:
+                            self.index.reset(ts)
+                            return
+                        positions = np.fromfile(f, dtype=DTYPES["timestamp"], count=covered)
+                        if len(positions) == covered:
+                            self.index.reset(ts[positions], positions)
+                            return
+        self.index.reset(ts)
+        self._write_index()
+
+    def _write_index(self):
+        """Rewrite the sidecar (identity: header only)"""
+        path = os.path.join(self.path, INDEX_FILE)
+        flags = INDEX_IDENTITY if self.index.identity else 0
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, flags, self.rows))
+            if not self.index.identity:
+                f.write(self.index.positions().astype(DTYPES["timestamp"]).tobytes())
+        os.replace(tmp, path)
+
+    def _append_index(self, first_row: int, count: int):
+        """Tail append: extend the positions in place, then bump the covered count"""
+        path = os.path.join(self.path, INDEX_FILE)
+        if self.index.identity or not os.path.exists(path):
+            self._write_index()
+            return
+        with open(path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(np.arange(first_row, first_row + count, dtype=DTYPES["timestamp"]).tobytes())
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0, self.rows))
+
+    # ── writes ──
+
+    @staticmethod
+    def _coerce(columns: dict) -> dict:
+        arrays = {name: np.ascontiguousarray(columns[name], dtype=DTYPES[name]) for name in COLUMNS}
+        lengths = {len(a) for a in arrays.values()}
+        if len(lengths) != 1:
+            raise CandleStoreError(f"column lengths differ: {sorted(lengths)}")
+        return arrays
+
+    def _append_rows(self, arrays: dict):
+        for name in COLUMNS:
+            with open(self._column_path(name), "ab") as f:
+                f.write(arrays[name].tobytes())
+        ts = arrays["timestamp"]
+        first, last = int(ts.min()), int(ts.max())
+        self.first_ts = first if self.first_ts is None else min(self.first_ts, first)
+        self.last_ts = last if self.last_ts is None else max(self.last_ts, last)
+        self.rows += len(ts)
+
+    def _update_rows(self, rows: np.ndarray, arrays: dict):
+        for name in COLUMNS[1:]:
+            column = np.memmap(self._column_path(name), dtype=DTYPES[name], mode="r+", shape=(self.rows,))
+            column[rows] = arrays[name]
+            column.flush()
+            del column
+
+    def append(self, columns: dict) -> int:
+        """Append rows newer than the high-water mark. Returns the row count added."""
+        arrays = self._coerce(columns)
+        count = len(arrays["timestamp"])
+        if count == 0:
+            return 0
+        with self._lock:
+            index = self.index       # load before the columns grow
+            ts = arrays["timestamp"]
+            if self.last_ts is not None and ts.min() <= self.last_ts or (count > 1 and not (ts[1:] > ts[:-1]).all()):
+                raise CandleStoreError("append() needs strictly increasing timestamps past the tail; use upsert()")
+            first_row = self.rows
+            self._append_rows(arrays)
+            index.append(ts, first_row)
+            self._write_header()
+            self._append_index(first_row, count)
+        return count
+
+    def upsert(self, columns: dict) -> tuple:
+        """
+        Merge any batch: new timestamps are appended (slotted into the index
+        if older than the tail), existing ones are overwritten in place.
+        Duplicates inside the batch: last one wins. Returns (added, updated).
+        Only late rows rewrite the index sidecar (O(rows)); overlaps and
+        tail rows cost O(batch), the sidecar is extended in place.
+        """
+        arrays = self._coerce(columns)
+        ts = arrays["timestamp"]
+        if len(ts) == 0:
+            return 0, 0
+        # Sort + dedupe the batch (last occurrence wins)
+        _, keep = np.unique(ts[::-1], return_index=True)
+        keep = len(ts) - 1 - keep
+        arrays = {name: col[keep] for name, col in arrays.items()}
+        ts = arrays["timestamp"]
+
+        with self._lock:
+            if self.last_ts is None or ts[0] > self.last_ts:
+                return self.append(arrays), 0      # fast path: pure tail append
+
+            index = self.index
+            found, rows = index.locate(ts)
+            updated = int(found.sum())
+            if updated:
+                self._update_rows(rows, {name: col[found] for name, col in arrays.items()})
+            fresh = {name: col[~found] for name, col in arrays.items()}
+            new_ts = fresh["timestamp"]
+            added = len(new_ts)
+            if added:
+                first_row = self.rows
+                late = new_ts <= self.last_ts
+                self._append_rows(fresh)
+                new_rows = np.arange(first_row, first_row + added)
+                if late.any():
+                    index.insert(new_ts[late], new_rows[late])
+                if (~late).any():
+                    index.append(new_ts[~late], int(new_rows[~late][0]))
+                self._write_header()
+                if late.any():
+                    self._write_index()
+                else:
+                    # Overlap + new tail (the usual re-save of the open candle): extend the sidecar
+                    self._append_index(first_row, added)
+            return added, updated
+
+    def rewrite(self, columns: dict):
+        """Replace the whole series (each column swapped in atomically)"""
+        arrays = self._coerce(columns)
+        with self._lock:
+            for name in COLUMNS:
+                path = self._column_path(name)
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(arrays[name].tobytes())
+                os.replace(f"{path}.tmp", path)
+            ts = arrays["timestamp"]
+            self.rows = len(ts)
+            self.first_ts = int(ts.min()) if self.rows else None
+            self.last_ts = int(ts.max()) if self.rows else None
+            self._index = TimestampIndex()
+            self._index.reset(ts)
+            self._write_header()
+            self._write_index()
+
+    def compact(self):
+        """Rewrite rows in timestamp order so reads are zero-copy again"""
+        with self._lock:
+            if not self.ordered:
+                self.rewrite(self.load())
+
+    # ── reads ──
+
+    def column(self, name: str, start: int = 0, stop: int = None) -> np.ndarray:
+        """Read-only view of physical rows [start, stop) of one column"""
+        rows = self.rows
+        stop = rows if stop is None else max(min(stop, rows), 0)
+        start = max(min(start, stop), 0)
+        if stop == start:
+            return np.empty(0, dtype=DTYPES[name])
+        itemsize = DTYPES[name].itemsize
+        return np.memmap(self._column_path(name), dtype=DTYPES[name], mode="r",
+                         offset=start * itemsize, shape=(stop - start,))
+
+    def load(self, start: int = 0, stop: int = None) -> dict:
+        """
+        {column: ndarray} for entries [start, stop) in timestamp order.
+        Zero-copy while rows are physically ordered; a gather otherwise.
+        """
+        with self._lock:
+            if self.ordered:
+                return {name: self.column(name, start, stop) for name in COLUMNS}
+            rows = self.index.positions(start, stop)
+            return {name: self.column(name)[rows] for name in COLUMNS}
+
+    def search(self, ts: int, side: str = "left") -> int:
+        """Position of ts in timestamp order (binary search, O(log n) page reads)"""
+        with self._lock:
+            if self._index is not None or not self.ordered:
+                return int(np.searchsorted(self.index.timestamps, ts, side=side))
+            return int(np.searchsorted(self.column("timestamp"), ts, side=side))
+
+    def range(self, start_ts: int = None, end_ts: int = None) -> dict:
+        """Candles with start_ts <= timestamp <= end_ts (either bound optional)"""
+        with self._lock:
+            start = 0 if start_ts is None else self.search(start_ts, "left")
+            stop = self.rows if end_ts is None else self.search(end_ts, "right")
+            return self.load(start, max(start, stop))
+
+    def tail(self, count: int) -> dict:
+        """The newest `count` candles"""
+        with self._lock:
+            return self.load(max(self.rows - count, 0))
+
+    def size_bytes(self) -> int:
+        """Column bytes, from the row count (no filesystem calls)"""
+        return self.rows * ROW_BYTES
@@ -0,0 +1,254 @@
+"""
+Candle Series — array-backed OHLCV
+For OCEAN HUNTER V10.8.2
+Six contiguous NumPy columns instead of a list of dicts: slicing is a view,
+append is amortised O(1), and a row is a two-slot view that reads the
+columns on access. Candle views also answer candle['close'] / .get(), so
+code written for dict candles keeps working unchanged.
+"""
+
+import numpy as np
+
+FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+_DTYPES = {name: np.int64 if name == "timestamp" else np.float64 for name in FIELDS}
+_KEYS = dict.fromkeys(FIELDS).keys()   # set-like, as csv.DictWriter expects
+_MIN_CAPACITY = 64
+
+
+class Candle:
+    """Lazy row view into a CandleSeries (no per-candle storage)"""
+
+    __slots__ = ("_columns", "_i")
+
+    def __init__(self, columns: dict, i: int):
+        self._columns = columns
+        self._i = i
+
+    @property
+    def timestamp(self) -> int:
+        return int(self._columns["timestamp"][self._i])
+
+    @property
+    def open(self) -> float:
+        return float(self._columns["open"][self._i])
+
+    @property
+    def high(self) -> float:
+        return float(self._columns["high"][self._i])
+
+    @property
+    def low(self) -> float:
+        return float(self._columns["low"][self._i])
+
+    @property
+    def close(self) -> float:
+        return float(self._columns["close"][self._i])
+
+    @property
+    def volume(self) -> float:
+        return float(self._columns["volume"][self._i])
+
+    def __getitem__(self, key: str):
+        if key not in _DTYPES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _DTYPES else default
+
+    def keys(self):
+        return _KEYS
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __repr__(self):
+        return f"Candle({self.to_dict()})"
+
+
+class CandleSeries:
+    """
+    Time-ordered OHLCV columns. Slices share memory with the parent; a view
+    (or a series wrapping read-only arrays, e.g. store memmaps) copies its
+    data into private buffers the first time it is appended to.
+    `maxlen` bounds the series like a deque: the oldest candles are dropped.
+    """
+
+    __slots__ = ("_buf", "_start", "_stop", "_owned", "maxlen")
+
+    def __init__(self, columns: dict = None, maxlen: int = None, copy: bool = False):
+        self.maxlen = maxlen
+        if columns is None:
+            self._buf = {name: np.empty(_MIN_CAPACITY, dtype=_DTYPES[name]) for name in FIELDS}
+            self._start = self._stop = 0
+            self._owned = True
+            return
+        arrays = {name: np.asarray(columns[name], dtype=_DTYPES[name]) for name in FIELDS}
+        lengths = {len(a) for a in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"column lengths differ: {sorted(lengths)}")
+        self._buf = {name: a.copy() for name, a in arrays.items()} if copy else arrays
+        self._start, self._stop = 0, lengths.pop()
+        self._owned = copy
+        if maxlen is not None and len(self) > maxlen:
+            self._start = self._stop - maxlen
+
+    # ── constructors ──
+
+    @classmethod
+    def from_rows(cls, rows, maxlen: int = None) -> "CandleSeries":
+        """Dict candles, Candle views, or raw MEXC klines [t, o, h, l, c, v, ...]"""
+        rows = list(rows)
+        if rows and isinstance(rows[0], (list, tuple)):
+            table = np.array([r[:6] for r in rows], dtype=np.float64)
+            columns = {name: table[:, i] for i, name in enumerate(FIELDS)}
+        else:
+            columns = {name: [r[name] for r in rows] for name in FIELDS}
+        return cls(columns, maxlen=maxlen)
+
+    # ── sequence protocol ──
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __bool__(self):
+        return self._stop > self._start
+
+    def _column(self, name: str) -> np.ndarray:
+        return self._buf[name][self._start:self._stop]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return CandleSeries({name: self._column(name)[key] for name in FIELDS})
+            view = CandleSeries.__new__(CandleSeries)
+            view._buf = self._buf
+            view._start, view._stop = self._start + start, self._start + max(stop, start)
+            view._owned = False
+            view.maxlen = None
+            return view
+        if isinstance(key, str):
+            return self._column(key)
+        i = key + len(self) if key < 0 else key
+        if not 0 <= i < len(self):
+            raise IndexError("candle index out of range")
+        return Candle(self._buf, self._start + i)
+
+    def __iter__(self):
+        for i in range(self._start, self._stop):
+            yield Candle(self._buf, i)
+
+    # ── columns (views, no copies) ──
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._column("timestamp")
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._column("open")
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._column("high")
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._column("low")
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._column("close")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._column("volume")
+
+    def columns(self) -> dict:
+        return {name: self._column(name) for name in FIELDS}
+
+    @property
+    def last_timestamp(self):
+        return int(self._buf["timestamp"][self._stop - 1]) if self else None
+
+    def tail(self, count: int) -> "CandleSeries":
+        return self[max(len(self) - count, 0):]
+
+    # ── writes ──
+
+    def _make_room(self, extra: int):
+        """Own the buffers and have `extra` free slots at the end"""
+        size = len(self)
+        keep = size + extra if self.maxlen is None else min(size + extra, self.maxlen + extra)
+        capacity = len(self._buf["timestamp"])
+        if self._owned and self._stop + extra <= capacity:
+            return
+        # Never shift in place: slices handed out earlier share these buffers
+        new_capacity = max(_MIN_CAPACITY, 2 * keep)
+        buf = {}
+        for name in FIELDS:
+            column = np.empty(new_capacity, dtype=_DTYPES[name])
+            column[:size] = self._buf[name][self._start:self._stop]
+            buf[name] = column
+        self._buf, self._start, self._stop, self._owned = buf, 0, size, True
+
+    def _trim(self):
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self._start = self._stop - self.maxlen
+
+    def append(self, timestamp, open, high, low, close, volume):
+        self._make_room(1)
+        i = self._stop
+        buf = self._buf
+        buf["timestamp"][i] = timestamp
+        buf["open"][i] = open
+        buf["high"][i] = high
+        buf["low"][i] = low
+        buf["close"][i] = close
+        buf["volume"][i] = volume
+        self._stop += 1
+        self._trim()
+
+    def append_candle(self, candle):
+        """Append a dict candle / Candle view"""
+        self.append(candle["timestamp"], candle["open"], candle["high"],
+                    candle["low"], candle["close"], candle["volume"])
+
+    def extend(self, columns: dict):
+        """Append column arrays (already ordered, newer than the tail)"""
+        count = len(columns["timestamp"])
+        if not count:
+            return
+        self._make_room(count)
+        for name in FIELDS:
+            self._buf[name][self._stop:self._stop + count] = columns[name]
+        self._stop += count
+        self._trim()
+
+    def update_last(self, open, high, low, close, volume):
+        """Replace the newest candle's values (it is still open)"""
+        if not self:
+            raise IndexError("update_last on an empty series")
+        if not self._owned:
+            self._make_room(0)
+        i = self._stop - 1
+        buf = self._buf
+        buf["open"][i], buf["high"][i], buf["low"][i] = open, high, low
+        buf["close"][i], buf["volume"][i] = close, volume
+
+    def clear(self):
+        self._start = self._stop
+
+    # ── conversion ──
+
+    def copy(self) -> "CandleSeries":
+        return CandleSeries(self.columns(), maxlen=self.maxlen, copy=True)
+
+    def to_rows(self) -> list:
+        """List of plain dict candles (for code that serialises them)"""
+        columns = [self._column(name).tolist() for name in FIELDS]
+        return [dict(zip(FIELDS, values)) for values in zip(*columns)]
+
+    def __repr__(self):
+        return f"CandleSeries(len={len(self)}, last={self.last_timestamp})"
@@ -1,34 +1,167 @@
 # modules/data/collector.py
+import asyncio
 import time
+import logging
 from typing import Dict, List, Optional
-from modules.network import get_client
+import numpy as np
+from modules.network import get_client, get_async_client, run_sync
+from modules.network.mexc_stream import INTERVAL_MS
+from .backfill import SOURCE_MEXC, SOURCE_NOBITEX, NOBITEX_RESOLUTIONS
+from .candles import CandleSeries, FIELDS
 from .storage import get_storage
 
+logger = logging.getLogger("COLLECTOR")
+
+MAX_WORKERS = 8                            # symbols in flight per collection pass
+DEFAULT_LIMIT = 100                        # candles per symbol
+EXTRA_SYMBOLS = ("BTCUSDT", "PAXGUSDT")    # BTC health + gold hedge, always collected
+
+
+def watch_list() -> List[str]:
+    """TRADE_COINS as trading pairs, plus BTC and PAXG"""
+    from config import TRADE_COINS, QUOTE_CURRENCY
+    symbols = [f"{coin}{QUOTE_CURRENCY}" for coin in TRADE_COINS]
+    return symbols + [s for s in EXTRA_SYMBOLS if s not in symbols]
+
+
+def normalize_mexc(rows: list) -> CandleSeries:
+    """MEXC klines [openTime(ms), open, high, low, close, volume, ...] → CandleSeries"""
+    if not rows:
+        return CandleSeries()
+    table = np.array([row[:6] for row in rows], dtype=np.float64)
+    return _validated({name: table[:, i] for i, name in enumerate(FIELDS)})
+
+
+def normalize_nobitex(result: dict) -> CandleSeries:
+    """Nobitex udf/history {t(s), o, h, l, c, v} → CandleSeries (ms timestamps, like MEXC)"""
+    columns = {name: np.asarray(result.get(key, []), dtype=np.float64)
+               for name, key in zip(FIELDS, ("t", "o", "h", "l", "c", "v"))}
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError(f"udf/history column lengths differ: {sorted(lengths)}")
+    columns["timestamp"] = columns["timestamp"] * 1000
+    return _validated(columns)
+
+
+def _validated(columns: dict) -> CandleSeries:
+    """Drop malformed candles, then sort and dedupe by open time (the last copy wins)"""
+    o, h, l, c, v = (columns[name] for name in FIELDS[1:])
+    ok = (np.isfinite(columns["timestamp"]) & np.isfinite(o) & np.isfinite(h)
+          & np.isfinite(l) & np.isfinite(c) & np.isfinite(v)
+          & (l > 0) & (v >= 0) & (h >= np.maximum(o, c)) & (l <= np.minimum(o, c)))
+    dropped = int(ok.size - np.count_nonzero(ok))
+    if dropped:
+        logger.warning(f"Dropped {dropped} malformed candles")
+    ts = columns["timestamp"][ok].astype(np.int64)
+    order = np.argsort(ts, kind="stable")
+    ordered = ts[order]
+    keep = order[np.append(ordered[1:] != ordered[:-1], True)]
+    return CandleSeries({name: (ts if name == "timestamp" else columns[name][ok])[keep]
+                         for name in FIELDS})
+
+
 class DataCollector:
-    def __init__(self):
+    """
+    Full-OHLCV collection for the watch list. One pass fetches every symbol
+    concurrently (bounded by max_workers), normalises MEXC / Nobitex replies
+    into CandleSeries and stores all of them with one DataStorage.save_batch().
+    """
+
+    def __init__(self, source: str = SOURCE_MEXC, storage=None, max_workers: int = MAX_WORKERS):
+        if source not in (SOURCE_MEXC, SOURCE_NOBITEX):
+            raise ValueError(f"Unknown collector source: {source}")
         self.client = get_client()
+        self.source = source
+        self.storage = storage or get_storage()
+        self.max_workers = max_workers
+        self._nobitex = None
+
+    def test_connection(self) -> bool:
+        """MEXC reachability through the shared keep-alive pool"""
+        return "error" not in self.client.ping()
+
+    def fetch_ohlcv(self, symbol: str, interval: str = "60m",
+                    limit: int = DEFAULT_LIMIT) -> tuple[CandleSeries, str]:
+        """One symbol: (candles, error message or "")"""
+        return run_sync(self._fetch(symbol, interval, limit))
+
+    def collect(self, symbols: List[str] = None, interval: str = "60m",
+                limit: int = DEFAULT_LIMIT, closed_only: bool = True) -> Dict:
+        """
+        One collection pass: fetch every symbol concurrently, store the batch.
+        closed_only drops the still-open candle, so the archive never holds
+        a partial bar. Returns {"stored", "errors", "candles", "latency_ms"}.
+        """
+        symbols = symbols or watch_list()
+        started = time.perf_counter()
+        fetched = run_sync(self.gather(symbols, interval, limit))
+
+        candles, errors = {}, {}
+        cutoff = int(time.time() * 1000) - INTERVAL_MS[interval]
+        for symbol, (series, error) in fetched.items():
+            if error:
+                errors[symbol] = error
+                continue
+            if closed_only:
+                series = series[:int(np.searchsorted(series.timestamp, cutoff, side="right"))]
+            candles[symbol] = series
+
+        batches = {symbol: series.columns() for symbol, series in candles.items() if series}
+        stored = self.storage.save_batch(batches, interval) if batches else {}
+        for symbol, error in errors.items():
+            logger.warning(f"Collect {symbol} ({interval}) failed: {error}")
+        return {
+            "stored": stored,
+            "errors": errors,
+            "candles": candles,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
 
-    def test_connection(self):
-        """Run DNS check"""
-        return self.client.debug_dns()
+    async def gather(self, symbols: List[str], interval: str = "60m",
+                     limit: int = DEFAULT_LIMIT) -> Dict[str, tuple]:
+        """{symbol: (CandleSeries, error)} with at most max_workers requests in flight"""
+        workers = asyncio.Semaphore(self.max_workers)
 
-    def fetch_ohlcv(self, symbol: str) -> tuple[List[Dict], str]:
+        async def worker(symbol):
+            async with workers:
+                return await self._fetch(symbol, interval, limit)
+
+        results = await asyncio.gather(*(worker(s) for s in symbols))
+        return dict(zip(symbols, results))
+
+    async def _fetch(self, symbol: str, interval: str, limit: int) -> tuple[CandleSeries, str]:
         try:
+            if self.source == SOURCE_MEXC:
+                data = await get_async_client().get_klines(symbol, interval, limit)
+                if not isinstance(data, list):
+                    return CandleSeries(), data.get("error") or data.get("msg") or str(data)
+                return normalize_mexc(data), ""
+
+            if interval not in NOBITEX_RESOLUTIONS:
+                return CandleSeries(), f"Nobitex has no resolution for {interval}"
             now = int(time.time())
-            from_ts = now - (24 * 60 * 60)
-            result = self.client.get_ohlcv(symbol=symbol, resolution="60", from_ts=from_ts, to_ts=now)
-            
+            from_ts = now - limit * INTERVAL_MS[interval] // 1000
+            result = await asyncio.to_thread(self._nobitex_api().get_ohlcv, symbol,
+                                             NOBITEX_RESOLUTIONS[interval], from_ts, now)
+            if result.get("s") == "no_data":
+                return CandleSeries(), ""
             if result.get("s") != "ok":
-                return [], result.get("msg", "Unknown Error")
-                
-            candles = []
-            timestamps = result.get("t", [])
-            closes = result.get("c", [])
-            for i in range(len(timestamps)):
-                candles.append({"timestamp": timestamps[i], "close": float(closes[i])})
-            return candles, ""
+                return CandleSeries(), result.get("msg", "Unknown Error")
+            return normalize_nobitex(result), ""
         except Exception as e:
-            return [], str(e)
+            return CandleSeries(), str(e)
+
+    def _nobitex_api(self):
+        if self._nobitex is None:
+            from modules.network.nobitex_api import NobitexAPI
+            self._nobitex = NobitexAPI()
+        return self._nobitex
+
+    def backfill(self, symbols: List[str], intervals: List[str], start, end=None,
+                 source: str = "nobitex") -> list:
+        """Resumable multi-symbol history download into DataStorage (see backfill.py)"""
+        from .backfill import Backfiller
+        return Backfiller(source, storage=self.storage).run(symbols, intervals, start, end)
 
 _collector: Optional[DataCollector] = None
 def get_collector() -> DataCollector:
@@ -0,0 +1,298 @@
+"""
+Order Book — local L2 book per symbol
+For OCEAN HUNTER V10.8.2
+Seeded from a REST depth snapshot and kept current from the WebSocket
+depth diffs (MEXCStream "depth" / "depth_snapshot" events). Every diff must
+continue the book's version; a gap invalidates the book and it is re-seeded
+from a fresh snapshot, replaying the diffs that arrived meanwhile.
+Both sides are sorted price/quantity arrays, so best bid/ask and spread are
+O(1) and depth / top-N imbalance (ARCHITECTURE OBI factor, 11.8.1 spread
+filter) are O(N) reads with no network call.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger("ORDER_BOOK")
+
+SNAPSHOT_LIMIT = 500        # levels per side in a REST snapshot
+OBI_LEVELS = 20             # ARCHITECTURE: Bid Volume > Ask Volume (Top 20)
+MAX_SPREAD_PERCENT = 0.005  # ARCHITECTURE 11.8.1
+MAX_PENDING = 1000          # diffs buffered per symbol while waiting for a snapshot
+RESEED_MIN, RESEED_MAX = 1.0, 60.0  # seconds between REST re-seeds of one symbol (doubles per failure)
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+
+def _levels(rows) -> tuple:
+    """[(price, qty), ...] → (prices, qtys) sorted ascending; zero quantities dropped"""
+    table = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+    table = table[table[:, 1] > 0]
+    order = np.argsort(table[:, 0], kind="stable")
+    return table[order, 0], table[order, 1]
+
+
+def _merge(prices: np.ndarray, qtys: np.ndarray, rows) -> tuple:
+    """Apply absolute level updates (qty 0 removes the level); the last update of a price wins"""
+    update = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+    if not len(update):
+        return prices, qtys
+    _, last = np.unique(update[::-1, 0], return_index=True)
+    update = update[len(update) - 1 - last]          # unique prices, ascending
+    up, uq = update[:, 0], update[:, 1]
+    pos = np.searchsorted(prices, up)
+    hit = pos < len(prices)
+    hit[hit] = prices[pos[hit]] == up[hit]
+    keep = np.ones(len(prices), dtype=bool)
+    keep[pos[hit]] = False
+    live = uq > 0
+    p = np.concatenate((prices[keep], up[live]))
+    q = np.concatenate((qtys[keep], uq[live]))
+    order = np.argsort(p, kind="stable")
+    return p[order], q[order]
+
+
+class OrderBook:
+    """
+    L2 book of one symbol. Both sides are kept ascending by price:
+    the best bid is the last bid level, the best ask the first ask level.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.version = None          # last applied update id; None = not synced
+        self.updated = 0.0
+        self._bid_p = self._bid_q = _EMPTY
+        self._ask_p = self._ask_q = _EMPTY
+        self._lock = threading.RLock()
+
+    @property
+    def synced(self) -> bool:
+        return self.version is not None
+
+    # ── writers ──
+
+    def apply_snapshot(self, version: int, bids, asks):
+        with self._lock:
+            self._bid_p, self._bid_q = _levels(bids)
+            self._ask_p, self._ask_q = _levels(asks)
+            self.version = int(version)
+            self.updated = time.time()
+
+    def apply_diff(self, version: int, bids, asks) -> bool:
+        """
+        Apply one depth diff. Returns False if it does not continue the book
+        (not synced, or a sequence gap); the book is then invalid until the
+        next snapshot. Diffs already covered by the snapshot are skipped.
+        """
+        version = int(version)
+        with self._lock:
+            if self.version is None:
+                return False
+            if version <= self.version:
+                return True
+            if version != self.version + 1:
+                logger.warning(f"{self.symbol}: depth gap (have {self.version}, got {version})")
+                self.version = None
+                return False
+            if bids:
+                self._bid_p, self._bid_q = _merge(self._bid_p, self._bid_q, bids)
+            if asks:
+                self._ask_p, self._ask_q = _merge(self._ask_p, self._ask_q, asks)
+            self.version = version
+            self.updated = time.time()
+            return True
+
+    # ── readers ──
+
+    def best_bid(self):
+        """(price, qty) or None"""
+        with self._lock:
+            if not len(self._bid_p):
+                return None
+            return float(self._bid_p[-1]), float(self._bid_q[-1])
+
+    def best_ask(self):
+        with self._lock:
+            if not len(self._ask_p):
+                return None
+            return float(self._ask_p[0]), float(self._ask_q[0])
+
+    def mid(self):
+        with self._lock:
+            if not len(self._bid_p) or not len(self._ask_p):
+                return None
+            return float(self._bid_p[-1] + self._ask_p[0]) / 2
+
+    def spread(self):
+        """(best_ask - best_bid) / best_bid, as in ARCHITECTURE 11.8.1; None without both sides"""
+        with self._lock:
+            if not len(self._bid_p) or not len(self._ask_p):
+                return None
+            bid, ask = self._bid_p[-1], self._ask_p[0]
+            return float((ask - bid) / bid)
+
+    def spread_ok(self, max_spread: float = MAX_SPREAD_PERCENT) -> bool:
+        spread = self.spread()
+        return spread is not None and spread <= max_spread
+
+    def depth(self, pct: float, notional: bool = False) -> dict:
+        """Volume resting within pct of the mid: {"bid", "ask"} (base qty, or quote with notional=True)"""
+        with self._lock:
+            mid = self.mid()
+            if mid is None:
+                return {"bid": 0.0, "ask": 0.0}
+            i = np.searchsorted(self._bid_p, mid * (1 - pct), side="left")
+            j = np.searchsorted(self._ask_p, mid * (1 + pct), side="right")
+            bid_q, ask_q = self._bid_q[i:], self._ask_q[:j]
+            if notional:
+                return {"bid": float(np.dot(self._bid_p[i:], bid_q)),
+                        "ask": float(np.dot(self._ask_p[:j], ask_q))}
+            return {"bid": float(bid_q.sum()), "ask": float(ask_q.sum())}
+
+    def imbalance(self, levels: int = OBI_LEVELS) -> float:
+        """(bid vol - ask vol) / (bid vol + ask vol) over the top `levels`, in [-1, 1]"""
+        with self._lock:
+            bid = float(self._bid_q[-levels:].sum())
+            ask = float(self._ask_q[:levels].sum())
+        total = bid + ask
+        return (bid - ask) / total if total else 0.0
+
+    def obi(self, levels: int = OBI_LEVELS) -> bool:
+        """OBI factor: bid volume > ask volume over the top `levels`"""
+        return self.imbalance(levels) > 0
+
+    def top(self, levels: int = OBI_LEVELS) -> dict:
+        """Best `levels` per side, best first: {"bids": [(p, q)], "asks": [(p, q)]}"""
+        with self._lock:
+            bids = list(zip(self._bid_p[-levels:][::-1].tolist(), self._bid_q[-levels:][::-1].tolist()))
+            asks = list(zip(self._ask_p[:levels].tolist(), self._ask_q[:levels].tolist()))
+        return {"bids": bids, "asks": asks}
+
+    def size(self) -> tuple:
+        return len(self._bid_p), len(self._ask_p)
+
+    def age(self, now: float = None):
+        return (now or time.time()) - self.updated if self.updated else None
+
+
+class OrderBookManager:
+    """
+    Books for many symbols. attach() feeds them from a MEXCStream; a book
+    that sees a gap without the stream re-syncing it (e.g. attached mid-stream)
+    is re-seeded over REST, and the diffs buffered meanwhile are replayed.
+    Re-seeds from the stream thread are rate-limited per symbol (backing off
+    while REST keeps failing); diffs in between are only buffered.
+    """
+
+    def __init__(self, rest=None, snapshot_limit: int = SNAPSHOT_LIMIT, max_pending: int = MAX_PENDING,
+                 reseed_min: float = RESEED_MIN, reseed_max: float = RESEED_MAX):
+        self._rest = rest
+        self.snapshot_limit = snapshot_limit
+        self.max_pending = max_pending
+        self.reseed_min = reseed_min
+        self.reseed_max = reseed_max
+        self._books = {}
+        self._pending = {}
+        self._retry_at = {}         # symbol → monotonic time of the next allowed re-seed
+        self._seed_failures = {}
+        self._lock = threading.Lock()
+        self._stats = {"snapshots": 0, "diffs": 0, "gaps": 0, "resyncs": 0, "resync_failures": 0,
+                       "resyncs_deferred": 0}
+
+    @property
+    def rest(self):
+        if self._rest is None:
+            from modules.network import get_client
+            self._rest = get_client()
+        return self._rest
+
+    def book(self, symbol: str) -> OrderBook:
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = OrderBook(symbol)
+                self._pending[symbol] = deque(maxlen=self.max_pending)
+            return book
+
+    def get(self, symbol: str):
+        """Synced book or None"""
+        book = self._books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def attach(self, stream, symbols: list):
+        """Subscribe `symbols` to depth diffs and keep their books current"""
+        stream.on("depth_snapshot", self.on_snapshot)
+        stream.on("depth", self.on_diff)
+        for symbol in symbols:
+            self.book(symbol)
+            stream.subscribe_depth(symbol)
+
+    def seed(self, symbol: str) -> bool:
+        """(Re)build a book from a fresh REST snapshot, then replay buffered diffs"""
+        book = self.book(symbol)
+        snapshot = self.rest.get_orderbook(symbol, self.snapshot_limit, fresh=True)
+        if not isinstance(snapshot, dict) or "bids" not in snapshot:
+            failures = self._seed_failures.get(symbol, 0) + 1
+            self._seed_failures[symbol] = failures
+            self._retry_at[symbol] = time.monotonic() + min(self.reseed_min * 2 ** (failures - 1), self.reseed_max)
+            self._stats["resync_failures"] += 1
+            logger.warning(f"Order book snapshot failed for {symbol}: {snapshot}")
+            return False
+        self._seed_failures[symbol] = 0
+        self._retry_at[symbol] = time.monotonic() + self.reseed_min
+        self.on_snapshot({
+            "symbol": symbol,
+            "version": int(snapshot.get("lastUpdateId", 0)),
+            "bids": [(float(p), float(q)) for p, q, *_ in snapshot.get("bids", [])],
+            "asks": [(float(p), float(q)) for p, q, *_ in snapshot.get("asks", [])],
+        })
+        return book.synced
+
+    # ── stream handlers ──
+
+    def on_snapshot(self, payload: dict):
+        symbol = payload["symbol"]
+        book = self.book(symbol)
+        book.apply_snapshot(payload["version"], payload["bids"], payload["asks"])
+        self._stats["snapshots"] += 1
+        pending = self._pending[symbol]
+        while pending:
+            diff = pending.popleft()
+            if not book.apply_diff(diff["version"], diff["bids"], diff["asks"]):
+                pending.clear()
+                break
+
+    def on_diff(self, payload: dict):
+        symbol = payload["symbol"]
+        book = self.book(symbol)
+        self._stats["diffs"] += 1
+        was_synced = book.synced
+        if book.apply_diff(payload["version"], payload["bids"], payload["asks"]):
+            return
+        self._pending[symbol].append(payload)
+        if was_synced:
+            self._stats["gaps"] += 1
+        if time.monotonic() < self._retry_at.get(symbol, 0.0):
+            # Seeded (or failed) moments ago: keep buffering instead of a REST call per diff
+            self._stats["resyncs_deferred"] += 1
+            return
+        self._stats["resyncs"] += 1
+        self.seed(symbol)
+
+    def stats(self) -> dict:
+        with self._lock:
+            books = {s: {"synced": b.synced, "version": b.version, "levels": b.size()}
+                     for s, b in self._books.items()}
+        return dict(self._stats, books=books)
+
+
+_order_books = None
+def get_order_books() -> OrderBookManager:
+    global _order_books
+    if _order_books is None:
+        _order_books = OrderBookManager()
+    return _order_books
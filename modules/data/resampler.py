@@ -0,0 +1,337 @@
+"""
+Multi-Timeframe Resampler — 1m (or trades) → M15 / 1H / 4H ...
+For OCEAN HUNTER V10.8.2
+One 1m kline subscription per symbol feeds every timeframe the strategies
+need. Each update is O(1) per timeframe: a bar keeps the aggregate of its
+finished base candles plus the latest snapshot of the open one, so the
+repeated pushes of a still-open 1m candle never double count.
+"""
+
+import logging
+import threading
+from collections import deque
+import numpy as np
+from modules.network.mexc_stream import INTERVAL_MS
+
+logger = logging.getLogger("RESAMPLER")
+
+BASE_INTERVAL = "1m"
+DEFAULT_TIMEFRAMES = ("15m", "60m", "4h")
+HISTORY = 500            # closed bars kept per (symbol, timeframe)
+
+# Exchange weeks start on Monday; the epoch was a Thursday
+_WEEK_OFFSET = 4 * 86_400_000
+
+
+def bucket(open_time: int, interval: str) -> int:
+    """Open time (ms) of the `interval` bar containing open_time"""
+    step = INTERVAL_MS[interval]
+    if interval == "1W":
+        return (open_time - _WEEK_OFFSET) // step * step + _WEEK_OFFSET
+    return open_time // step * step
+
+
+class Bar:
+    """
+    One higher-timeframe candle under construction.
+    The OHLCV fields aggregate finished base candles; `live` is the open one.
+    """
+
+    __slots__ = ("open_time", "step", "open", "high", "low", "close", "volume",
+                 "quote_volume", "live", "last_base")
+
+    def __init__(self, open_time: int, step: int):
+        self.open_time = open_time
+        self.step = step
+        self.open = None
+        self.high = float("-inf")
+        self.low = float("inf")
+        self.close = None
+        self.volume = 0.0
+        self.quote_volume = 0.0
+        self.live = None
+        self.last_base = None
+
+    def fold(self, c: dict):
+        """Add a finished base candle"""
+        if self.open is None:
+            self.open = c["open"]
+        self.high = max(self.high, c["high"])
+        self.low = min(self.low, c["low"])
+        self.close = c["close"]
+        self.volume += c["volume"]
+        self.quote_volume += c.get("quote_volume", 0.0)
+        self.last_base = c["open_time"]
+
+    def snapshot(self, symbol: str, interval: str, closed: bool) -> dict:
+        live = self.live
+        open_ = self.open if self.open is not None else (live["open"] if live else None)
+        high, low, close = self.high, self.low, self.close
+        volume, quote_volume = self.volume, self.quote_volume
+        if live is not None:
+            high, low, close = max(high, live["high"]), min(low, live["low"]), live["close"]
+            volume += live["volume"]
+            quote_volume += live.get("quote_volume", 0.0)
+        return {
+            "symbol": symbol, "interval": interval, "open_time": self.open_time,
+            "open": open_, "high": high, "low": low, "close": close,
+            "volume": volume, "quote_volume": quote_volume,
+            "close_time": self.open_time + self.step - 1, "closed": closed,
+        }
+
+
+class Resampler:
+    """
+    Builds `timeframes` bars for every symbol from base-interval candles.
+    Events (like MEXCStream): "bar" on every update, "bar_closed" once per bar.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, base: str = BASE_INTERVAL, history: int = HISTORY):
+        for tf in timeframes:
+            if tf not in INTERVAL_MS:
+                raise ValueError(f"Unsupported timeframe: {tf}")
+            if INTERVAL_MS[tf] % INTERVAL_MS[base]:
+                raise ValueError(f"{tf} is not a multiple of {base}")
+        self.base = base
+        self.base_step = INTERVAL_MS[base]
+        self.timeframes = tuple(timeframes)
+        self.history = history
+        self._bars = {}          # (symbol, tf) -> Bar
+        self._closed = {}        # (symbol, tf) -> deque of closed bar dicts
+        self._closed_until = {}  # (symbol, tf) -> open time of the newest closed bar
+        self._live = {}          # symbol -> open base candle
+        self._handlers = {}
+        self._lock = threading.RLock()
+        self._stats = {"updates": 0, "trades": 0, "bars_closed": 0, "seeded": 0}
+
+    # ── events ──
+
+    def on(self, event: str, handler):
+        """Register a handler(bar: dict); returns it so it can be used as a decorator"""
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def _emit(self, event: str, payload: dict):
+        for handler in self._handlers.get(event, ()):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"{event} handler failed: {e!r}")
+
+    def attach(self, stream, symbols: list, trades: bool = False):
+        """
+        Subscribe `symbols` on a MEXCStream and resample from it: base-interval
+        klines by default, or the raw deals stream with trades=True.
+        """
+        if trades:
+            stream.on("deal", lambda d: self.update_trade(d["symbol"], d["price"], d["qty"], int(d["time"])))
+            for symbol in symbols:
+                stream.subscribe_deals(symbol)
+            return stream
+
+        def on_kline(candle):
+            if candle.get("interval") == self.base:
+                self.update(candle, closed=False)
+
+        def on_closed(candle):
+            if candle.get("interval") == self.base:
+                self.update(candle, closed=True)
+
+        stream.on("kline", on_kline)
+        stream.on("kline_closed", on_closed)
+        for symbol in symbols:
+            stream.subscribe_kline(symbol, self.base)
+        return stream
+
+    # ── updates ──
+
+    def update(self, candle: dict, closed: bool = False):
+        """
+        A base candle (dict with symbol, open_time ms, OHLCV). Open candles may
+        be pushed repeatedly; `closed=True` marks the final version.
+        """
+        symbol = candle["symbol"]
+        events = []
+        with self._lock:
+            self._stats["updates"] += 1
+            live = self._live.get(symbol)
+            if not closed and live is not None and candle["open_time"] < live["open_time"]:
+                return  # stale push of an already replaced candle
+            if live is not None and candle["open_time"] > live["open_time"]:
+                # The stream moved on without a close event: the snapshot is final
+                events += self._finish(symbol, live)
+                live = None
+            if closed:
+                if live is not None and live["open_time"] == candle["open_time"]:
+                    self._live.pop(symbol, None)
+                events += self._finish(symbol, candle)
+            else:
+                self._live[symbol] = candle
+                events += self._touch(symbol, candle)
+        for event, payload in events:
+            self._emit(event, payload)
+
+    def update_trade(self, symbol: str, price: float, qty: float, time_ms: int):
+        """Fold one trade into the open base candle, then update every timeframe"""
+        open_time = time_ms // self.base_step * self.base_step
+        with self._lock:
+            self._stats["trades"] += 1
+            live = self._live.get(symbol)
+            if live is None or live["open_time"] != open_time:
+                if live is not None and open_time < live["open_time"]:
+                    return  # late trade for a finished candle
+                candle = {"symbol": symbol, "interval": self.base, "open_time": open_time,
+                          "open": price, "high": price, "low": price, "close": price,
+                          "volume": qty, "quote_volume": price * qty}
+            else:
+                candle = dict(live, high=max(live["high"], price), low=min(live["low"], price),
+                              close=price, volume=live["volume"] + qty,
+                              quote_volume=live.get("quote_volume", 0.0) + price * qty)
+            self.update(candle, closed=False)
+
+    def _bar(self, symbol: str, tf: str, open_time: int, events: list):
+        """
+        Current bar of tf for a base candle at open_time (closing the previous
+        one if passed), or None if that bar has already been closed.
+        """
+        key = (symbol, tf)
+        start = bucket(open_time, tf)
+        if start <= self._closed_until.get(key, -1):
+            return None
+        bar = self._bars.get(key)
+        if bar is not None and start > bar.open_time:
+            events.append(self._close(symbol, tf, bar))
+            bar = None
+        if bar is None:
+            bar = self._bars[key] = Bar(start, INTERVAL_MS[tf])
+        return bar
+
+    def _touch(self, symbol: str, candle: dict) -> list:
+        events = []
+        for tf in self.timeframes:
+            bar = self._bar(symbol, tf, candle["open_time"], events)
+            if bar is None or candle["open_time"] < bar.open_time:
+                continue
+            if bar.last_base is not None and candle["open_time"] <= bar.last_base:
+                continue  # already folded
+            bar.live = candle
+            events.append(("bar", bar.snapshot(symbol, tf, closed=False)))
+        return events
+
+    def _finish(self, symbol: str, candle: dict) -> list:
+        events = []
+        for tf in self.timeframes:
+            bar = self._bar(symbol, tf, candle["open_time"], events)
+            if bar is None or candle["open_time"] < bar.open_time:
+                continue
+            if bar.last_base is not None and candle["open_time"] <= bar.last_base:
+                continue  # already folded
+            if bar.live is not None and bar.live["open_time"] == candle["open_time"]:
+                bar.live = None
+            bar.fold(candle)
+            if candle["open_time"] + self.base_step >= bar.open_time + bar.step:
+                # Last base candle of the bar: close now instead of on the next update
+                events.append(self._close(symbol, tf, bar))
+                del self._bars[(symbol, tf)]
+            else:
+                events.append(("bar", bar.snapshot(symbol, tf, closed=False)))
+        return events
+
+    def _close(self, symbol: str, tf: str, bar: Bar) -> tuple:
+        snapshot = bar.snapshot(symbol, tf, closed=True)
+        self._closed_until[(symbol, tf)] = bar.open_time
+        self._closed.setdefault((symbol, tf), deque(maxlen=self.history)).append(snapshot)
+        self._stats["bars_closed"] += 1
+        return ("bar_closed", snapshot)
+
+    # ── backfill ──
+
+    def seed(self, symbol: str, columns: dict):
+        """
+        Rebuild history from stored base candles ({column: array}, e.g.
+        DataStorage.get_range(..., columns=True)). Vectorised; emits nothing.
+        """
+        ts = np.asarray(columns["timestamp"], dtype=np.int64)
+        if not len(ts):
+            return
+        if ts.max() < 10**11:
+            ts = ts * 1000  # the store keeps seconds
+        base = {"timestamp": ts, **{k: np.asarray(columns[k], dtype=float)
+                                    for k in ("open", "high", "low", "close", "volume")}}
+        with self._lock:
+            for tf in self.timeframes:
+                bars = resample_columns(base, tf, self.base)
+                complete = bars.pop("complete")
+                history = self._closed.setdefault((symbol, tf), deque(maxlen=self.history))
+                history.clear()
+                count = len(bars["timestamp"])
+                for i in range(max(count - self.history - 1, 0), count):
+                    row = {
+                        "symbol": symbol, "interval": tf, "open_time": int(bars["timestamp"][i]),
+                        "open": float(bars["open"][i]), "high": float(bars["high"][i]),
+                        "low": float(bars["low"][i]), "close": float(bars["close"][i]),
+                        "volume": float(bars["volume"][i]), "quote_volume": 0.0,
+                        "close_time": int(bars["timestamp"][i]) + INTERVAL_MS[tf] - 1,
+                        "closed": bool(complete[i]),
+                    }
+                    if complete[i] or i < count - 1:
+                        # Older partial bars (gaps in the archive) are finished anyway
+                        history.append(dict(row, closed=True))
+                        self._closed_until[(symbol, tf)] = row["open_time"]
+                        self._bars.pop((symbol, tf), None)
+                    else:
+                        # Trailing partial bar: continue it from the live stream
+                        bar = self._bars[(symbol, tf)] = Bar(row["open_time"], INTERVAL_MS[tf])
+                        bar.open, bar.high, bar.low, bar.close = row["open"], row["high"], row["low"], row["close"]
+                        bar.volume = row["volume"]
+                        bar.last_base = int(ts[-1])
+            self._stats["seeded"] += len(ts)
+
+    def seed_from_storage(self, storage, symbol: str, since=None):
+        """seed() from DataStorage's base-interval series (e.g. after a backfill)"""
+        self.seed(symbol, storage.get_range(symbol, since, None, interval=self.base, columns=True))
+
+    # ── reads ──
+
+    def current(self, symbol: str, tf: str):
+        """The open bar of tf as a dict, or None"""
+        with self._lock:
+            bar = self._bars.get((symbol, tf))
+            return bar.snapshot(symbol, tf, closed=False) if bar else None
+
+    def closed_bars(self, symbol: str, tf: str, limit: int = None) -> list:
+        """Closed bars, oldest first"""
+        with self._lock:
+            bars = list(self._closed.get((symbol, tf), ()))
+        return bars if limit is None else bars[-limit:]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, open_bars=len(self._bars))
+
+
+def resample_columns(columns: dict, interval: str, base: str = BASE_INTERVAL) -> dict:
+    """
+    Offline resampling of sorted base candles ({column: array}, ms timestamps).
+    Returns bar columns plus a boolean "complete" column (False for a bar
+    whose last base candle is missing, e.g. the one still forming).
+    """
+    ts = np.asarray(columns["timestamp"], dtype=np.int64)
+    if not len(ts):
+        empty = {k: np.empty(0) for k in ("timestamp", "open", "high", "low", "close", "volume")}
+        empty["complete"] = np.empty(0, dtype=bool)
+        return empty
+    step = INTERVAL_MS[interval]
+    offset = _WEEK_OFFSET if interval == "1W" else 0
+    buckets = (ts - offset) // step * step + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    return {
+        "timestamp": buckets[starts],
+        "open": np.asarray(columns["open"], dtype=float)[starts],
+        "high": np.maximum.reduceat(np.asarray(columns["high"], dtype=float), starts),
+        "low": np.minimum.reduceat(np.asarray(columns["low"], dtype=float), starts),
+        "close": np.asarray(columns["close"], dtype=float)[ends],
+        "volume": np.add.reduceat(np.asarray(columns["volume"], dtype=float), starts),
+        "complete": ts[ends] + INTERVAL_MS[base] >= buckets[starts] + step,
+    }
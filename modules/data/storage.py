@@ -1,90 +1,215 @@
 # modules/data/storage.py
 import os
 import csv
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+import numpy as np
+from .candle_store import CandleStore, COLUMNS
+from .candles import CandleSeries
+
+def _to_seconds(ts: np.ndarray) -> np.ndarray:
+    # MEXC rows carry ms; the store keeps epoch seconds
+    ts = np.asarray(ts, dtype=np.int64)
+    return np.where(ts > 10**11, ts // 1000, ts)
+
+def _fmt_ts(ts) -> str:
+    return datetime.fromtimestamp(int(ts)).strftime('%Y-%m-%d %H:%M:%S') if ts else ''
 
 class DataStorage:
+    """
+    OHLCV archive: one columnar CandleStore per symbol (and interval).
+    Legacy CSV files in the same directory are imported on first access.
+    """
     def __init__(self, data_dir: str = None):
         if data_dir is None:
             current = os.path.dirname(os.path.abspath(__file__))
             root = os.path.dirname(os.path.dirname(current))
             data_dir = os.path.join(root, "data", "ohlcv")
         self.data_dir = data_dir
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
         self._ensure_dir()
 
     def _ensure_dir(self):
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
-    def _get_filepath(self, symbol: str) -> str:
+    def _series_name(self, symbol: str, interval: str = None) -> str:
         safe_symbol = symbol.replace("/", "_").upper()
-        return os.path.join(self.data_dir, f"{safe_symbol}.csv")
+        return f"{safe_symbol}_{interval}" if interval else safe_symbol
+
+    def _get_filepath(self, symbol: str, interval: str = None) -> str:
+        """Legacy CSV location (import/export)"""
+        return os.path.join(self.data_dir, f"{self._series_name(symbol, interval)}.csv")
+
+    def _store(self, symbol: str, interval: str = None) -> CandleStore:
+        name = self._series_name(symbol, interval)
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = CandleStore(os.path.join(self.data_dir, name))
+                legacy = self._get_filepath(symbol, interval)
+                if len(store) == 0 and os.path.exists(legacy):
+                    self._import_into(store, legacy)
+            return store
+
+    def _exists(self, symbol: str, interval: str = None) -> bool:
+        name = self._series_name(symbol, interval)
+        return (name in self._stores
+                or os.path.isdir(os.path.join(self.data_dir, name))
+                or os.path.exists(self._get_filepath(symbol, interval)))
+
+    # ── writes ──
 
-    def save_ohlcv(self, symbol: str, data: List[Dict]) -> bool:
+    def save_ohlcv(self, symbol: str, data: List[Dict], interval: str = None) -> bool:
         if not data:
             return False
-        filepath = self._get_filepath(symbol)
-        file_exists = os.path.exists(filepath)
         try:
-            existing_timestamps = set()
-            if file_exists:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        existing_timestamps.add(row.get('timestamp', ''))
-            new_data = [row for row in data if str(row.get('timestamp', '')) not in existing_timestamps]
-            if not new_data:
-                return True
-            fieldnames = ['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume']
-            with open(filepath, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader()
-                for row in new_data:
-                    ts = row.get('timestamp', 0)
-                    dt = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else ''
-                    writer.writerow({
-                        'timestamp': ts, 'datetime': dt,
-                        'open': row.get('open', 0), 'high': row.get('high', 0),
-                        'low': row.get('low', 0), 'close': row.get('close', 0),
-                        'volume': row.get('volume', 0)
-                    })
-            return True
+            columns = {name: [row.get(name, 0) for row in data] for name in COLUMNS}
+            return self.save_columns(symbol, columns, interval) >= 0
         except Exception as e:
             print(f"[Storage] Error saving {symbol}: {e}")
             return False
 
-    def get_latest(self, symbol: str, count: int = 100) -> List[Dict]:
-        filepath = self._get_filepath(symbol)
-        if not os.path.exists(filepath):
-            return []
+    def save_columns(self, symbol: str, columns: Dict[str, Any], interval: str = None) -> int:
+        """
+        Store column arrays. New timestamps are appended, ones already stored
+        are overwritten with the newer values. Returns rows added.
+        Cost is O(batch): dedupe runs against the store's in-memory index.
+        """
+        batch = {name: columns[name] for name in COLUMNS}
+        batch["timestamp"] = _to_seconds(columns["timestamp"])
+        added, _ = self._store(symbol, interval).upsert(batch)
+        return added
+
+    def save_batch(self, batches: Dict[str, Dict[str, Any]], interval: str = None) -> Dict[str, int]:
+        """
+        Store {symbol: columns} as one unit: every batch is validated before
+        any is written, and the writes run under one lock so another batch
+        never interleaves. Each series commits atomically (header commit point).
+        Returns {symbol: rows added}.
+        """
+        prepared = {}
+        for symbol, columns in batches.items():
+            batch = {name: np.asarray(columns[name]) for name in COLUMNS}
+            lengths = {len(col) for col in batch.values()}
+            if len(lengths) != 1:
+                raise ValueError(f"{symbol}: column lengths differ: {sorted(lengths)}")
+            batch["timestamp"] = _to_seconds(batch["timestamp"])
+            prepared[symbol] = batch
+        stores = {symbol: self._store(symbol, interval) for symbol in prepared}
+        with self._write_lock:
+            return {symbol: stores[symbol].upsert(batch)[0] for symbol, batch in prepared.items()}
+
+    def compact(self, symbol: str, interval: str = None):
+        """Restore physical timestamp order after late inserts (zero-copy reads)"""
+        if self._exists(symbol, interval):
+            self._store(symbol, interval).compact()
+
+    # ── reads ──
+
+    def load(self, symbol: str, interval: str = None) -> Dict[str, np.ndarray]:
+        """Whole series as {column: ndarray} (memory-mapped, zero-copy)"""
+        if not self._exists(symbol, interval):
+            return {name: np.empty(0) for name in COLUMNS}
+        return self._store(symbol, interval).load()
+
+    def get_latest(self, symbol: str, count: int = 100, interval: str = None,
+                   columns: bool = False):
+        """Newest `count` candles; only their bytes are read (columns=True: ndarrays, no dicts)"""
+        if not self._exists(symbol, interval):
+            return {name: np.empty(0) for name in COLUMNS} if columns else []
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                rows = list(csv.DictReader(f))
-            return rows[-count:] if len(rows) > count else rows
+            data = self._store(symbol, interval).tail(count)
+            return data if columns else self._rows(data)
         except Exception as e:
             print(f"[Storage] Error reading {symbol}: {e}")
-            return []
+            return {name: np.empty(0) for name in COLUMNS} if columns else []
 
-    def get_stats(self, symbol: str) -> Dict[str, Any]:
-        filepath = self._get_filepath(symbol)
-        if not os.path.exists(filepath):
+    def get_range(self, symbol: str, start_ts: int = None, end_ts: int = None,
+                  interval: str = None, columns: bool = False):
+        """
+        Candles with start_ts <= timestamp <= end_ts (epoch s or ms; bounds optional).
+        Binary search on the timestamp column, then a slice of each column file.
+        """
+        if not self._exists(symbol, interval):
+            return {name: np.empty(0) for name in COLUMNS} if columns else []
+        try:
+            start_ts = None if start_ts is None else int(_to_seconds([start_ts])[0])
+            end_ts = None if end_ts is None else int(_to_seconds([end_ts])[0])
+            data = self._store(symbol, interval).range(start_ts, end_ts)
+            return data if columns else self._rows(data)
+        except Exception as e:
+            print(f"[Storage] Error reading {symbol}: {e}")
+            return {name: np.empty(0) for name in COLUMNS} if columns else []
+
+    def get_series(self, symbol: str, start_ts: int = None, end_ts: int = None,
+                   interval: str = None) -> CandleSeries:
+        """get_range() as a CandleSeries over the store's memmaps (copied only if appended to)"""
+        return CandleSeries(self.get_range(symbol, start_ts, end_ts, interval, columns=True))
+
+    @staticmethod
+    def _rows(data: Dict[str, np.ndarray]) -> List[Dict]:
+        columns = [data[name].tolist() for name in COLUMNS]
+        return [
+            {'timestamp': ts, 'datetime': _fmt_ts(ts), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for ts, o, h, l, c, v in zip(*columns)
+        ]
+
+    def get_stats(self, symbol: str, interval: str = None) -> Dict[str, Any]:
+        """O(1): everything comes from the store header"""
+        if not self._exists(symbol, interval):
             return {"exists": False, "rows": 0}
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                rows = list(csv.DictReader(f))
-            if not rows:
+            store = self._store(symbol, interval)
+            if not len(store):
                 return {"exists": True, "rows": 0}
             return {
-                "exists": True, "rows": len(rows),
-                "first_date": rows[0].get('datetime', 'N/A'),
-                "last_date": rows[-1].get('datetime', 'N/A'),
-                "file_size_kb": round(os.path.getsize(filepath) / 1024, 2)
+                "exists": True, "rows": len(store),
+                "first_date": _fmt_ts(store.first_ts),
+                "last_date": _fmt_ts(store.last_ts),
+                "first_ts": store.first_ts, "last_ts": store.last_ts,
+                "file_size_kb": round(store.size_bytes() / 1024, 2)
             }
         except Exception as e:
             return {"exists": True, "rows": 0, "error": str(e)}
 
+    # ── CSV import / export ──
+
+    @staticmethod
+    def _read_csv(filepath: str) -> Dict[str, np.ndarray]:
+        """CSV → sorted, deduplicated columns (one vectorised parse, no per-row dicts)"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            header = f.readline().strip().split(',')
+        missing = [name for name in COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"{filepath}: missing columns {missing}")
+        table = np.loadtxt(filepath, delimiter=',', skiprows=1, ndmin=2,
+                           usecols=[header.index(name) for name in COLUMNS])
+        columns = {name: table[:, i] for i, name in enumerate(COLUMNS)}
+        columns["timestamp"] = _to_seconds(columns["timestamp"].astype(np.int64))
+        order = np.argsort(columns["timestamp"], kind="stable")
+        _, first = np.unique(columns["timestamp"][order], return_index=True)
+        return {name: col[order][first] for name, col in columns.items()}
+
+    def _import_into(self, store: CandleStore, filepath: str):
+        store.rewrite(self._read_csv(filepath))
+
+    def import_csv(self, filepath: str, symbol: str, interval: str = None) -> int:
+        """Load a CSV with timestamp,open,high,low,close,volume columns (extra columns ignored). Returns rows added."""
+        return self.save_columns(symbol, self._read_csv(filepath), interval)
+
+    def export_csv(self, symbol: str, filepath: str = None, interval: str = None) -> str:
+        filepath = filepath or self._get_filepath(symbol, interval)
+        fieldnames = ['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume']
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self._rows(self.load(symbol, interval)))
+        return filepath
+
 _storage: Optional[DataStorage] = None
 def get_storage() -> DataStorage:
     global _storage
@@ -1,3 +1,5 @@
+from modules.analysis.memo import memo_rsi
+
 
 def calculate_rsi(prices, period=14):
     """Calculates Relative Strength Index (RSI)"""
@@ -33,17 +35,25 @@ def calculate_rsi(prices, period=14):
     rsi = 100 - (100 / (1 + rs))
     return round(rsi, 2)
 
-def analyze_market(symbol, candles):
+def _rsi_from_averages(avg_gain, avg_loss):
+    if avg_loss == 0:
+        return 100
+    rs = avg_gain / avg_loss
+    return round(100 - (100 / (1 + rs)), 2)
+
+def analyze_market(symbol, candles, interval=None):
     """Analyzes market data and returns a signal"""
     if not candles or len(candles) < 20:
         return {"signal": "WAIT", "rsi": 0, "price": 0}
         
-    # Extract closing prices
-    closes = [float(c['close']) for c in candles]
+    # Extract closing prices (CandleSeries: straight from the close column)
+    column = getattr(candles, 'close', None)
+    closes = column.tolist() if column is not None else [float(c['close']) for c in candles]
     current_price = closes[-1]
     
-    # Calculate RSI
-    rsi = calculate_rsi(closes)
+    # Calculate RSI (closed candles memoized, only the open one recomputed)
+    averages = memo_rsi("m_analysis.rsi", symbol, candles, closes, 14, "wilder", interval)
+    rsi = calculate_rsi(closes) if averages is None else _rsi_from_averages(*averages)
     
     # Logic Strategy
     signal = "NEUTRAL ⚪"
@@ -1,70 +1,223 @@
+import asyncio
 import requests
 import os
 import csv
 import time
-from datetime import datetime
+from modules.network.mexc_async import get_async_client, run_sync
+from modules.network.proxy_resolver import get_proxy_resolver
+from modules.network.mexc_stream import INTERVAL_MS
+from modules.data.candles import CandleSeries
 
 # --- CONFIG ---
 MEXC_BASE = "https://api.mexc.com"
-PROXY_URL = "http://127.0.0.1:10809"
-PROXIES = {"http": PROXY_URL, "https": PROXY_URL}
+BUFFER_SIZE = 500          # candles kept in memory per (symbol, interval)
+MAX_KLINES = 1000          # MEXC per-request cap
+
+class CandleBuffer:
+    """
+    Bounded, time-ordered candles of one (symbol, interval), stored as a
+    CandleSeries. The newest candle may still be open; merge() replaces it in place.
+    """
+    def __init__(self, capacity=BUFFER_SIZE):
+        self.candles = CandleSeries(maxlen=capacity)
+        self.exhausted = False  # a full-window fetch came back short: no older history exists
+
+    def __len__(self):
+        return len(self.candles)
+
+    @property
+    def last_timestamp(self):
+        return self.candles.last_timestamp
+
+    def merge(self, rows):
+        """Merge raw MEXC klines (ascending). Returns the number of new candles."""
+        added = 0
+        if rows and self.candles and int(rows[0][0]) < self.candles.timestamp[0]:
+            # A longer window than we hold: the reply supersedes the buffer
+            self.candles = CandleSeries(maxlen=self.candles.maxlen)
+        for row in rows:
+            ts = int(row[0])
+            last = self.last_timestamp
+            if last is not None and ts < last:
+                continue  # already have it
+            values = (float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]))
+            if ts == last:
+                self.candles.update_last(*values)
+            else:
+                self.candles.append(ts, *values)
+                added += 1
+        return added
+
+    def needs_history(self, limit):
+        """True while the buffer holds fewer than `limit` candles and older ones may exist"""
+        return len(self) < min(limit, self.candles.maxlen) and not self.exhausted
+
+    def window(self, limit):
+        """
+        The newest `limit` candles (oldest first), as a zero-copy CandleSeries view.
+        The view shares the buffer, so a later merge() that refreshes the open
+        candle shows through; call .copy() to keep a snapshot.
+        """
+        return self.candles.tail(limit)
 
 class DataEngine:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", buffer_size=BUFFER_SIZE):
         self.data_dir = data_dir
+        self.buffer_size = buffer_size
+        self._buffers = {}
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-            
-    def fetch_candles(self, symbol, interval="60m", limit=50):
+
+    def _buffer(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._buffers:
+            self._buffers[key] = CandleBuffer(self.buffer_size)
+        return self._buffers[key]
+
+    def _sync_params(self, symbol, interval, limit, live=False):
+        """
+        Request needed to bring the buffer up to date, or None to serve from memory.
+        Cold buffer (or a longer window than held, while older history exists):
+        the full window. Warm buffer: only candles from the newest one on
+        (startTime), so the open candle is replaced and closed ones appended.
+        A symbol with less history than `limit` (new listing) stays incremental.
+        """
+        buf = self._buffer(symbol, interval)
+        params = {"symbol": symbol, "interval": interval}
+        step = INTERVAL_MS.get(interval)
+        last = buf.last_timestamp
+        if last is None or buf.needs_history(limit) or step is None:
+            params["limit"] = min(max(limit, len(buf)), MAX_KLINES)
+            return params
+
+        now_ms = int(time.time() * 1000)
+        if not live and now_ms < last + step:
+            return None  # newest candle has not closed yet
+        params["startTime"] = last
+        params["limit"] = min((now_ms - last) // step + 2, MAX_KLINES)
+        return params
+
+    def _merge(self, symbol, interval, params, rows):
+        buf = self._buffer(symbol, interval)
+        buf.merge(rows)
+        if "startTime" not in params and len(rows) < params["limit"]:
+            buf.exhausted = True
+
+    def buffered_candles(self, symbol, interval="60m", limit=50):
+        """Indicator window straight from memory (no request)"""
+        return self._buffer(symbol, interval).window(limit)
+
+    def fetch_candles(self, symbol, interval="60m", limit=50, live=False):
         """
         Fetch OHLCV Data from MEXC
         Intervals: 1m, 5m, 15m, 30m, 60m, 4h, 1d, 1M
+        Incremental: after the first call only candles newer than the last
+        one are requested, once per candle close (live=True also refreshes
+        the still-open candle).
         """
         endpoint = "/api/v3/klines"
-        params = {
-            "symbol": symbol,
-            "interval": interval,
-            "limit": limit
-        }
-        
+        params = self._sync_params(symbol, interval, limit, live)
+        if params is None:
+            return self.buffered_candles(symbol, interval, limit)
+
+        proxies = get_proxy_resolver().requests_proxies()
         try:
             print(f"   ⬇️ Fetching {symbol} ({interval})...")
             resp = requests.get(
                 f"{MEXC_BASE}{endpoint}", 
                 params=params, 
-                proxies=PROXIES, 
+                proxies=proxies, 
                 verify=False, 
                 timeout=10
             )
             
             if resp.status_code == 200:
-                data = resp.json()
-                # MEXC Format: [Open Time, Open, High, Low, Close, Volume, Close Time, ...]
-                processed_data = []
-                for candle in data:
-                    processed_data.append({
-                        "timestamp": candle[0],
-                        "datetime": datetime.fromtimestamp(candle[0]/1000).strftime('%Y-%m-%d %H:%M:%S'),
-                        "open": candle[1],
-                        "high": candle[2],
-                        "low": candle[3],
-                        "close": candle[4],
-                        "volume": candle[5]
-                    })
-                return processed_data
+                self._merge(symbol, interval, params, resp.json())
+                return self.buffered_candles(symbol, interval, limit)
             else:
                 print(f"   ❌ API Error: {resp.status_code} - {resp.text}")
-                return []
-                
+                return CandleSeries()
+
+        except requests.exceptions.ProxyError as e:
+            print(f"   ❌ Proxy Error: {e}")
+            get_proxy_resolver().report_failure(proxies["https"])
+            return CandleSeries()
         except Exception as e:
             print(f"   ❌ Connection Error: {e}")
-            return []
+            return CandleSeries()
+
+    def fetch_candles_many(self, symbols, interval="60m", limit=50, live=False):
+        """
+        Fetch OHLCV for several symbols concurrently (incremental, like fetch_candles).
+        Returns {symbol: CandleSeries}; a failed symbol maps to an empty series.
+        """
+        plans = {s: self._sync_params(s, interval, limit, live) for s in symbols}
+        stale = [s for s in symbols if plans[s] is not None]
+
+        raw = {}
+        if stale:
+            print(f"   ⬇️ Fetching {len(stale)} symbols ({interval}) concurrently...")
+            try:
+                # Shared client loop: keep-alive streams survive until the next call
+                raw = run_sync(self._gather(stale, plans))
+            except Exception as e:
+                print(f"   ❌ Connection Error: {e}")
+                return {symbol: CandleSeries() for symbol in symbols}
+
+        results = {}
+        for symbol in symbols:
+            if symbol in raw:
+                data = raw[symbol]
+                if not isinstance(data, list):
+                    print(f"   ❌ API Error ({symbol}): {data}")
+                    results[symbol] = CandleSeries()
+                    continue
+                self._merge(symbol, interval, plans[symbol], data)
+            results[symbol] = self.buffered_candles(symbol, interval, limit)
+        return results
+
+    @staticmethod
+    async def _gather(symbols, plans):
+        client = get_async_client()
+        tasks = [
+            client.get_klines(s, plans[s]["interval"], plans[s]["limit"], start_time=plans[s].get("startTime"))
+            for s in symbols
+        ]
+        return dict(zip(symbols, await asyncio.gather(*tasks)))
+
+    def backfill(self, symbols, intervals=("60m",), start="2024-01-01", end=None):
+        """
+        Page MEXC history for every (symbol, interval) into the candle store.
+        Runs concurrently under the shared rate limiter and resumes from the
+        checkpoint if a previous run was interrupted.
+        """
+        from modules.data.backfill import Backfiller
+        jobs = Backfiller("mexc").run(list(symbols), list(intervals), start, end)
+        for job in jobs:
+            icon = "✅" if job.status == "done" else "❌"
+            print(f"   {icon} {job.symbol} ({job.interval}): {job.rows} candles")
+        return jobs
+
+    def save(self, symbol, data, interval="60m"):
+        """Append candles to the columnar store (only rows not stored yet are written)"""
+        from modules.data.storage import get_storage
+        if not data:
+            return False
+        if isinstance(data, CandleSeries):
+            ok = get_storage().save_columns(symbol, data.columns(), interval) >= 0
+        else:
+            ok = get_storage().save_ohlcv(symbol, data, interval)
+        if ok:
+            print(f"   💾 Stored {symbol} ({interval}, {len(data)} rows)")
+        return ok
 
     def save_to_csv(self, symbol, data):
         if not data:
             return False
             
         filename = os.path.join(self.data_dir, f"{symbol}_history.csv")
+        if isinstance(data, CandleSeries):
+            data = data.to_rows()
         keys = data[0].keys()
         
         try:
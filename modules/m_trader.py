@@ -74,10 +74,18 @@ class PaperTrader:
             return log
         return None
         
-    def get_portfolio_value(self, current_prices):
-        """Calculates total value (USDT + Assets)"""
+    def get_portfolio_value(self, current_prices=None, price_cache=None):
+        """
+        Calculates total value (USDT + Assets)
+        Prices: current_prices first, then fresh price-cache quotes, then entry price.
+        """
+        current_prices = current_prices or {}
         total = self.state["usdt_balance"]
         for sym, pos in self.state["positions"].items():
-            current_price = current_prices.get(sym, pos["entry_price"])
+            current_price = current_prices.get(sym)
+            if current_price is None and price_cache is not None:
+                current_price = price_cache.price(sym)
+            if current_price is None:
+                current_price = pos["entry_price"]
             total += pos["amount"] * current_price
         return total
@@ -1,5 +1,9 @@
-from .mexc_api import MEXCClient
+from .mexc_api import MEXCClient, get_client as _get_mexc_client
+from .mexc_async import AsyncMEXCClient, get_async_client, run_sync
 from .telegram_bot import TelegramBot
+from .price_cache import PriceCache, get_price_cache
+from .response_cache import ResponseCache, get_response_cache
 
 def get_client():
-    return MEXCClient()
+    # Shared instance so every caller reuses the same keep-alive pool
+    return _get_mexc_client()
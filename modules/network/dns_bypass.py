@@ -1,71 +1,383 @@
 # modules/network/dns_bypass.py
 import socket
 import requests
-import json
 import random
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger("DNS")
 
 # --- STATIC FALLBACK IPS ---
 # These are known Cloudflare IPs often used by Nobitex.
-# Used ONLY if DoH fails.
+# Raced against DoH answers and kept as low-priority candidates.
 STATIC_NOBITEX_IPS = [
     "104.26.13.16",
     "104.26.12.16",
     "172.67.70.166"
 ]
 
+STATIC_IPS = {
+    "api.nobitex.ir": STATIC_NOBITEX_IPS,
+}
+
+# Hosts answered from the cache instead of the (possibly poisoned) system resolver
+COVERED_HOSTS = ("api.nobitex.ir", "api.mexc.com", "api.telegram.org")
+
+# DNS-over-HTTPS JSON endpoints (all return the Google-style "Answer" list)
+DOH_PROVIDERS = {
+    "google": ("https://dns.google/resolve", {}),
+    "cloudflare": ("https://cloudflare-dns.com/dns-query", {"accept": "application/dns-json"}),
+    "quad9": ("https://dns.quad9.net:5053/dns-query", {"accept": "application/dns-json"}),
+}
+
+MIN_TTL = 30
+MAX_TTL = 3600
+STATIC_TTL = 300
+REFRESH_AHEAD = 0.2      # refresh when 20% of the TTL is left
+RACE_GRACE = 0.15        # after the first answer, wait this long for the others
+
+
+def resolve_doh(domain, provider="google", timeout=5):
+    """Resolve A records via one DoH provider (Bypasses UDP blocks). Returns (ips, ttl)."""
+    url, headers = DOH_PROVIDERS[provider]
+    # We must disable proxy for the DNS lookup itself
+    response = requests.get(url, params={"name": domain, "type": "A"}, headers=headers,
+                            timeout=timeout, proxies={"http": None, "https": None})
+    response.raise_for_status()
+    data = response.json()
+    ips, ttls = [], []
+    for answer in data.get("Answer", []):
+        if answer.get("type") == 1:  # Type A
+            ips.append(answer["data"])
+            ttls.append(int(answer.get("TTL", MIN_TTL)))
+    if not ips:
+        raise LookupError(f"{provider}: no A record for {domain}")
+    return ips, min(max(min(ttls), MIN_TTL), MAX_TTL)
+
+
 def resolve_doh_google(domain):
-    """Resolve IP using Google DNS-over-HTTPS (Bypasses UDP blocks)"""
+    """Resolve IP using Google DNS-over-HTTPS (first A record, or None)"""
     try:
-        print(f"   ☁️  Requesting DoH from Google for {domain}...")
-        url = f"https://dns.google/resolve?name={domain}&type=A"
-        # We must disable proxy for the DNS lookup itself
-        response = requests.get(url, timeout=5, proxies={"http": None, "https": None})
-        
-        if response.status_code == 200:
-            data = response.json()
-            if "Answer" in data:
-                # Get the first A record
-                for answer in data["Answer"]:
-                    if answer["type"] == 1: # Type A
-                        ip = answer["data"]
-                        print(f"      ✅ DoH Success: {ip}")
-                        return ip
+        return resolve_doh(domain, "google")[0][0]
     except Exception as e:
         print(f"      ⚠️ DoH Failed: {e}")
     return None
 
+
 def get_static_ip():
     """Return a random known IP for Nobitex"""
     ip = random.choice(STATIC_NOBITEX_IPS)
     print(f"   ⚠️ Using Static Fallback IP: {ip}")
     return ip
 
+
+def probe_ip(ip, port=443, timeout=2.0):
+    """TCP connect time to ip:port in seconds, or None if unreachable"""
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return time.perf_counter() - started
+    except OSError:
+        return None
+
+
+class IPScore:
+    """Health of one address: smoothed connect latency and consecutive failures"""
+
+    __slots__ = ("latency", "failures", "last_ok")
+
+    def __init__(self):
+        self.latency = None
+        self.failures = 0
+        self.last_ok = 0.0
+
+    def record(self, latency):
+        if latency is None:
+            self.failures += 1
+            return
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        self.failures = 0
+        self.last_ok = time.time()
+
+    def rank(self):
+        # Healthy first, fastest first; untested addresses between the two
+        return (self.failures, self.latency if self.latency is not None else 10.0)
+
+
+class DNSEntry:
+    __slots__ = ("ips", "ttl", "fetched", "source")
+
+    def __init__(self, ips, ttl, source):
+        self.ips = ips
+        self.ttl = ttl
+        self.fetched = time.time()
+        self.source = source
+
+    @property
+    def expires(self):
+        return self.fetched + self.ttl
+
+    def needs_refresh(self, now):
+        return now >= self.expires - self.ttl * REFRESH_AHEAD
+
+
+class DNSCache:
+    """
+    TTL-aware resolver cache. After warm-up, lookups are a dict read:
+    entries are refreshed in the background before they expire and a stale
+    entry is served while its refresh is in flight.
+    """
+
+    def __init__(self, hosts=COVERED_HOSTS, providers=None, probe_port=443):
+        self.hosts = set(hosts)
+        self.providers = list(providers or DOH_PROVIDERS)
+        self.probe_port = probe_port
+        self._entries = {}
+        self._scores = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        # Refreshes fan out DoH queries and probes on a separate pool so they never starve each other
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dns-refresh")
+        self._io = ThreadPoolExecutor(max_workers=16, thread_name_prefix="dns-io")
+        self._refresher = None
+        self._stop = threading.Event()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "failures": 0}
+
+    def covers(self, host):
+        return host in self.hosts
+
+    # ── lookups ──
+
+    def resolve(self, host):
+        """IPs for host, best first. Blocks only if nothing has ever been resolved."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None:
+                if now < entry.expires:
+                    self._stats["hits"] += 1
+                else:
+                    self._stats["stale_hits"] += 1
+                if entry.needs_refresh(now):
+                    self._refresh_async(host)
+                return self._ordered(entry.ips)
+            self._stats["misses"] += 1
+            future = self._refresh_async(host)
+        future.result()
+        with self._lock:
+            entry = self._entries.get(host)
+            return self._ordered(entry.ips) if entry else []
+
+    def _ordered(self, ips):
+        """Lock held"""
+        return sorted(ips, key=lambda ip: self._scores.setdefault(ip, IPScore()).rank())
+
+    def report_failure(self, host, ip):
+        """A connection to ip failed: demote it, refresh the host if nothing healthy is left"""
+        with self._lock:
+            self._scores.setdefault(ip, IPScore()).record(None)
+            entry = self._entries.get(host)
+            if entry and all(self._scores.setdefault(i, IPScore()).failures for i in entry.ips):
+                self._refresh_async(host)
+
+    # ── refresh ──
+
+    def _refresh_async(self, host):
+        """Start (or join) the refresh of one host. Lock held."""
+        future = self._inflight.get(host)
+        if future is None or future.done():
+            future = self._executor.submit(self._refresh, host)
+            self._inflight[host] = future
+        return future
+
+    def _race_doh(self, host):
+        """Query every provider at once; merge the answers that arrive close to the first"""
+        futures = {self._io.submit(resolve_doh, host, p): p for p in self.providers}
+        pending = set(futures)
+        ips, ttls = [], []
+        first_at = None
+        deadline = time.monotonic() + 5
+        while pending:
+            timeout = deadline - time.monotonic()
+            if first_at is not None:
+                timeout = min(timeout, first_at + RACE_GRACE - time.monotonic())
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    answer, ttl = future.result()
+                except Exception as e:
+                    logger.debug(f"DoH {futures[future]} failed for {host}: {e}")
+                    continue
+                ips.extend(ip for ip in answer if ip not in ips)
+                ttls.append(ttl)
+                if first_at is None:
+                    first_at = time.monotonic()
+        return ips, (min(ttls) if ttls else None)
+
+    def _refresh(self, host):
+        ips, ttl = self._race_doh(host)
+        source = "doh"
+        if not ips:
+            with self._lock:
+                previous = self._entries.get(host)
+            if previous is not None:
+                # Keep serving the last good answer; retry soon
+                ips, ttl, source = previous.ips, MIN_TTL, "stale"
+            else:
+                ttl, source = STATIC_TTL, "static"
+        # After the fallback: a previous entry already carries the static addresses
+        static = [ip for ip in STATIC_IPS.get(host, []) if ip not in ips]
+        candidates = ips + static
+        if not candidates:
+            with self._lock:
+                self._stats["failures"] += 1
+            logger.warning(f"DNS: no address for {host}")
+            return
+
+        # Health-check every candidate in parallel; order by connect latency
+        latencies = list(self._io.map(lambda ip: probe_ip(ip, self.probe_port), candidates))
+        with self._lock:
+            for ip, latency in zip(candidates, latencies):
+                self._scores.setdefault(ip, IPScore()).record(latency)
+            self._entries[host] = DNSEntry(candidates, ttl, source)
+            self._stats["refreshes"] += 1
+        best = self._ordered_snapshot(candidates)
+        logger.info(f"DNS {host} → {best[:3]} (ttl {ttl}s, {source})")
+
+    def _ordered_snapshot(self, ips):
+        with self._lock:
+            return self._ordered(ips)
+
+    # ── background ──
+
+    def warm_up(self, wait_for=False):
+        """Resolve every covered host now and start the refresher thread"""
+        with self._lock:
+            futures = [self._refresh_async(h) for h in self.hosts if h not in self._entries]
+            if self._refresher is None or not self._refresher.is_alive():
+                self._stop.clear()
+                self._refresher = threading.Thread(target=self._refresh_loop, name="dns-refresh", daemon=True)
+                self._refresher.start()
+        if wait_for:
+            for future in futures:
+                future.result()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self._next_wakeup()):
+            now = time.time()
+            try:
+                with self._lock:
+                    for host, entry in self._entries.items():
+                        if entry.needs_refresh(now):
+                            self._refresh_async(host)
+            except RuntimeError:
+                # Executor refuses new work during interpreter shutdown
+                return
+
+    def _next_wakeup(self):
+        now = time.time()
+        with self._lock:
+            waits = [e.expires - e.ttl * REFRESH_AHEAD - now for e in self._entries.values()]
+        return min(max(min(waits, default=MIN_TTL), 1.0), MIN_TTL)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            now = time.time()
+            stats["hosts"] = {
+                host: {"ips": self._ordered(e.ips), "ttl_left": round(e.expires - now, 1), "source": e.source}
+                for host, e in self._entries.items()
+            }
+            stats["scores"] = {
+                ip: {"latency_ms": round(s.latency * 1000, 1) if s.latency is not None else None,
+                     "failures": s.failures}
+                for ip, s in self._scores.items()
+            }
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_dns_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DNSCache()
+        return _cache
+
+
 # --- MONKEY PATCH ---
 REAL_GETADDRINFO = socket.getaddrinfo
-CACHED_IP = None
+CACHED_IP = None  # best address of api.nobitex.ir, kept for older callers
+
+# (type, proto) pairs the system resolver returns for an IPv4 address
+SOCKET_KINDS = ((socket.SOCK_STREAM, socket.IPPROTO_TCP), (socket.SOCK_DGRAM, socket.IPPROTO_UDP))
+
+
+def _port_number(port):
+    """getaddrinfo's port argument (None, number, numeric string or service name) as an int"""
+    if port is None:
+        return 0
+    if isinstance(port, bytes):
+        port = port.decode("ascii")
+    if isinstance(port, str):
+        return int(port) if port.isdigit() else socket.getservbyname(port)
+    return port
 
 def patched_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
     global CACHED_IP
-    
-    if host == "api.nobitex.ir":
-        print(f"   🛡️ Intercepted: {host}")
-        
-        if CACHED_IP:
-            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (CACHED_IP, port))]
-            
-        # 1. Try DoH (Best Method)
-        resolved_ip = resolve_doh_google(host)
-        
-        # 2. Try Static Fallback (Last Resort)
-        if not resolved_ip:
-            resolved_ip = get_static_ip()
-        
-        if resolved_ip:
-            print(f"   💉 Injecting: {resolved_ip}")
-            CACHED_IP = resolved_ip
-            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (resolved_ip, port))]
-        
+
+    cache = get_dns_cache()
+    # Only the socket kinds the caller asked for, as the real resolver does
+    kinds = [(t, p) for t, p in SOCKET_KINDS if type in (0, t) and proto in (0, p)]
+    if cache.covers(host) and family in (0, socket.AF_INET) and kinds:
+        ips = cache.resolve(host)
+        if ips:
+            if host == "api.nobitex.ir":
+                CACHED_IP = ips[0]
+            port = _port_number(port)
+            # Every address, best first: create_connection falls through on failure
+            return [(socket.AF_INET, t, p, '', (ip, port)) for ip in ips for t, p in kinds]
+
     return REAL_GETADDRINFO(host, port, family, type, proto, flags)
 
-def apply_patch():
+def cache_for(host):
+    """The DNS cache when it answers for host (patch applied), else None"""
+    if socket.getaddrinfo is not patched_getaddrinfo:
+        return None
+    cache = get_dns_cache()
+    return cache if cache.covers(host) else None
+
+def create_connection(address, timeout: float = 15.0, source_address=None):
+    """
+    socket.create_connection that tries the cached addresses one by one and
+    reports each refused one, so the cache demotes it (and re-resolves the
+    host once none is left) instead of handing it out first again.
+    """
+    host, port = address
+    cache = cache_for(host)
+    ips = cache.resolve(host) if cache else None
+    if not ips:
+        return socket.create_connection(address, timeout, source_address)
+    error = None
+    for ip in ips:
+        try:
+            return socket.create_connection((ip, port), timeout, source_address)
+        except OSError as e:
+            error = e
+            cache.report_failure(host, ip)
+    raise error
+
+def apply_patch(warm_up=True):
     socket.getaddrinfo = patched_getaddrinfo
+    if warm_up:
+        # Resolve in the background so DNS is off the request path by the first call
+        get_dns_cache().warm_up()
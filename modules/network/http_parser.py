@@ -0,0 +1,269 @@
+"""
+HTTP/1.1 Response Parser — shared by the raw-socket clients
+For OCEAN HUNTER V10.8.2
+Handles status line, headers, Content-Length and chunked bodies without
+read-until-EOF, so sockets can be kept alive and large bodies are copied once.
+"""
+
+import json
+
+MAX_HEAD_SIZE = 64 * 1024
+MAX_LINE_SIZE = 4096        # chunk-size / trailer line, newline included
+RECV_SIZE = 64 * 1024
+
+# Parser states
+_HEAD, _LENGTH, _CHUNK_SIZE, _CHUNK_DATA, _CHUNK_CRLF, _TRAILER, _EOF, _DONE = range(8)
+
+
+class HTTPParseError(ValueError):
+    """Malformed HTTP response"""
+
+
+class StaleConnectionError(ConnectionError):
+    """Socket was closed by the server before any response byte arrived"""
+
+
+class HTTPResponse:
+    """Parsed response. `body` is a bytearray that is never copied again."""
+
+    __slots__ = ("status", "reason", "headers", "body", "keep_alive")
+
+    def __init__(self, status: int, reason: str, headers: dict, body, keep_alive: bool):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="ignore")
+
+    def json(self):
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"<HTTPResponse {self.status} {len(self.body)} bytes>"
+
+
+class ResponseParser:
+    """
+    Incremental (sans-IO) parser for a single response.
+    feed() consumes bytes and returns how many were used; anything left over
+    belongs to the next pipelined response on the same connection.
+    """
+
+    def __init__(self, method: str = "GET"):
+        self.method = method
+        self.state = _HEAD
+        self.status = 0
+        self.reason = ""
+        self.headers = {}
+        self.keep_alive = True
+        self._head = bytearray()
+        self._body = bytearray()
+        self._filled = 0        # bytes written into a Content-Length body
+        self._chunk_left = 0
+        self._line = bytearray()
+
+    @property
+    def done(self) -> bool:
+        return self.state == _DONE
+
+    @property
+    def started(self) -> bool:
+        return bool(self._head) or self.state != _HEAD
+
+    def body_window(self):
+        """Writable view of the still-empty part of a Content-Length body (for recv_into)"""
+        if self.state != _LENGTH:
+            return None
+        return memoryview(self._body)[self._filled:]
+
+    def advance(self, n: int):
+        """Mark n bytes written through body_window()"""
+        self._filled += n
+        if self._filled >= len(self._body):
+            self.state = _DONE
+
+    def feed(self, data) -> int:
+        view = memoryview(data)
+        total = len(view)
+        pos = 0
+        while pos < total and self.state != _DONE:
+            if self.state == _HEAD:
+                pos = self._feed_head(view, pos)
+            elif self.state == _LENGTH:
+                n = min(total - pos, len(self._body) - self._filled)
+                self._body[self._filled:self._filled + n] = view[pos:pos + n]
+                pos += n
+                self.advance(n)
+            elif self.state == _CHUNK_DATA:
+                n = min(total - pos, self._chunk_left)
+                self._body += view[pos:pos + n]
+                pos += n
+                self._chunk_left -= n
+                if self._chunk_left == 0:
+                    self.state = _CHUNK_CRLF
+            elif self.state in (_CHUNK_SIZE, _CHUNK_CRLF, _TRAILER):
+                pos = self._feed_line(view, pos)
+            elif self.state == _EOF:
+                self._body += view[pos:]
+                pos = total
+        return pos
+
+    def feed_eof(self):
+        """Peer closed the connection"""
+        if self.state == _EOF:
+            self.state = _DONE
+        elif self.state != _DONE:
+            if not self.started:
+                raise StaleConnectionError("connection closed before response")
+            raise ConnectionError("connection closed mid-response")
+
+    def result(self) -> HTTPResponse:
+        return HTTPResponse(self.status, self.reason, self.headers, self._body, self.keep_alive)
+
+    # ── internals ──
+
+    def _feed_head(self, view, pos: int) -> int:
+        # Search only the new bytes plus 3 bytes of overlap for the terminator
+        start = max(0, len(self._head) - 3)
+        self._head += view[pos:]
+        end = self._head.find(b"\r\n\r\n", start)
+        if end == -1:
+            if len(self._head) > MAX_HEAD_SIZE:
+                raise HTTPParseError("response headers too large")
+            return len(view)
+        used = len(view) - (len(self._head) - (end + 4))
+        self._parse_head(bytes(self._head[:end]))
+        del self._head[end:]
+        return used
+
+    def _parse_head(self, raw: bytes):
+        lines = raw.decode("iso-8859-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+            raise HTTPParseError(f"bad status line: {lines[0][:80]!r}")
+        version, status = parts[0], int(parts[1])
+
+        # Interim 1xx responses are skipped, the real one follows
+        if 100 <= status < 200:
+            self._head = bytearray()
+            return
+
+        self.status = status
+        self.reason = parts[2] if len(parts) > 2 else ""
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if not sep:
+                continue
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        self.headers = headers
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            self.keep_alive = "keep-alive" in connection
+        else:
+            self.keep_alive = "close" not in connection
+
+        if self.method == "HEAD" or status in (204, 304):
+            self.state = _DONE
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            self.state = _CHUNK_SIZE
+        elif "content-length" in headers:
+            try:
+                length = int(headers["content-length"].split(",")[0])
+            except ValueError:
+                raise HTTPParseError("bad Content-Length")
+            self._body = bytearray(length)
+            self.state = _LENGTH if length else _DONE
+        else:
+            self.keep_alive = False
+            self.state = _EOF
+
+    def _feed_line(self, view, pos: int) -> int:
+        # Search as far as the line may still grow: the newline can sit anywhere in the view
+        limit = MAX_LINE_SIZE - len(self._line)
+        end = bytes(view[pos:pos + limit]).find(b"\n")
+        if end == -1:
+            if len(view) - pos >= limit:
+                raise HTTPParseError("chunk line too long")
+            self._line += view[pos:]
+            return len(view)
+        self._line += view[pos:pos + end + 1]
+        line = bytes(self._line).strip()
+        self._line = bytearray()
+        pos += end + 1
+
+        if self.state == _CHUNK_SIZE:
+            try:
+                size = int(line.split(b";", 1)[0], 16)
+            except ValueError:
+                raise HTTPParseError(f"bad chunk size: {line[:20]!r}")
+            if size == 0:
+                self.state = _TRAILER
+            else:
+                self._chunk_left = size
+                self.state = _CHUNK_DATA
+        elif self.state == _CHUNK_CRLF:
+            if line:
+                raise HTTPParseError("missing CRLF after chunk")
+            self.state = _CHUNK_SIZE
+        elif self.state == _TRAILER:
+            if not line:
+                self.state = _DONE
+        return pos
+
+
+class HTTPReader:
+    """
+    Reads consecutive responses from one socket, keeping leftover bytes
+    between calls so pipelined responses are not lost.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._buf = bytearray(RECV_SIZE)
+        self._view = memoryview(self._buf)
+        self._pending = b""
+
+    def read_response(self, method: str = "GET") -> HTTPResponse:
+        parser = ResponseParser(method)
+        if self._pending:
+            used = parser.feed(self._pending)
+            self._pending = self._pending[used:]
+
+        while not parser.done:
+            window = parser.body_window()
+            if window is not None:
+                # Content-Length body: receive straight into the final buffer
+                n = self.sock.recv_into(window)
+                if n == 0:
+                    parser.feed_eof()
+                parser.advance(n)
+                continue
+
+            n = self.sock.recv_into(self._buf)
+            if n == 0:
+                parser.feed_eof()
+                break
+            used = parser.feed(self._view[:n])
+            if used < n:
+                self._pending = bytes(self._view[used:n])
+
+        return parser.result()
+
+
+def read_response(sock, method: str = "GET") -> HTTPResponse:
+    """Read exactly one response from a socket"""
+    return HTTPReader(sock).read_response(method)
+
+
+def parse_json_body(response: HTTPResponse):
+    """Decode a JSON body, or None if the body is not JSON"""
+    if bytes(response.body[:64]).lstrip()[:1] in (b"{", b"["):
+        return response.json()
+    return None
@@ -0,0 +1,423 @@
+"""
+HTTP Keep-Alive Connection Pool — Raw Socket Implementation
+For OCEAN HUNTER V10.8.2
+Reuses TLS connections across requests so each call costs one RTT
+"""
+
+import asyncio
+import socket
+import ssl
+import select
+import threading
+import time
+import logging
+from collections import deque
+from .tls import get_ssl_context
+from .dns_bypass import create_connection, cache_for
+from .http_parser import HTTPReader, HTTPResponse, ResponseParser, StaleConnectionError, RECV_SIZE
+
+logger = logging.getLogger("HTTP_POOL")
+
+
+class PooledConnection:
+    """One TLS socket owned by a ConnectionPool"""
+
+    __slots__ = ("sock", "reader", "created_at", "last_used", "requests")
+
+    def __init__(self, sock: ssl.SSLSocket):
+        self.sock = sock
+        self.reader = HTTPReader(sock)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.requests = 0
+
+    def is_stale(self, idle_timeout: float) -> bool:
+        """True if the socket idled too long or the peer already closed it"""
+        if time.monotonic() - self.last_used > idle_timeout:
+            return True
+        try:
+            if self.sock.pending():
+                return True
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            if not readable:
+                return False
+            # Readable while idle: either FIN/RST, or a late TLS 1.3 session
+            # ticket that carries no application data
+            self.sock.setblocking(False)
+            try:
+                # EOF or unexpected bytes — either way the socket is unusable
+                self.sock.recv(1)
+                return True
+            except ssl.SSLWantReadError:
+                return False
+            finally:
+                self.sock.setblocking(True)
+        except (OSError, ValueError):
+            return True
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive TLS connections to a single host.
+    Each thread checks a connection out, uses it exclusively and returns it.
+    """
+
+    def __init__(self, host: str, port: int = 443, max_idle: int = 4,
+                 idle_timeout: float = 30.0, timeout: float = 15.0, connect=None):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        # Optional factory returning a connected plain TCP socket (e.g. via proxy)
+        self._connect = connect
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "stale_discarded": 0,
+            "retries": 0,
+            "requests": 0,
+            "pipelined": 0,
+            "errors": 0,
+        }
+
+    def _new_connection(self) -> PooledConnection:
+        if self._connect:
+            raw = self._connect(self.host, self.port)
+        else:
+            raw = create_connection((self.host, self.port), timeout=self.timeout)
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        context = get_ssl_context()
+        try:
+            sock = context.wrap_socket(raw, server_hostname=self.host)
+        except Exception:
+            raw.close()
+            raise
+        with self._lock:
+            self._stats["created"] += 1
+        return PooledConnection(sock)
+
+    def acquire(self) -> tuple:
+        """Check out a connection. Returns (connection, reused)."""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                self._in_use += 1
+            if conn is None:
+                try:
+                    return self._new_connection(), False
+                except Exception:
+                    with self._lock:
+                        self._in_use -= 1
+                    raise
+            if conn.is_stale(self.idle_timeout):
+                conn.close()
+                with self._lock:
+                    self._in_use -= 1
+                    self._stats["stale_discarded"] += 1
+                continue
+            with self._lock:
+                self._stats["reused"] += 1
+            return conn, True
+
+    def release(self, conn: PooledConnection, reusable: bool = True):
+        """Return a connection; closes it instead if not reusable or pool is full"""
+        conn.last_used = time.monotonic()
+        if reusable:
+            get_ssl_context().remember_session(self.host, conn.sock)
+        with self._lock:
+            self._in_use -= 1
+            if reusable and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, payload: bytes, method: str = "GET", retry: bool = True) -> HTTPResponse:
+        """
+        Send a raw request and read the response on a pooled connection.
+        If a reused socket turns out to be dead before any reply byte arrives,
+        the request is sent once more on a fresh connection. Pass retry=False
+        for non-idempotent calls (orders) so they are never sent twice.
+        """
+        conn, reused = self.acquire()
+        try:
+            conn.sock.settimeout(self.timeout)
+            conn.sock.sendall(payload)
+            response = conn.reader.read_response(method)
+        except (StaleConnectionError, BrokenPipeError, ConnectionResetError, ssl.SSLError) as e:
+            self.release(conn, reusable=False)
+            if reused and retry:
+                with self._lock:
+                    self._stats["retries"] += 1
+                logger.debug(f"Stale pooled connection to {self.host}: {e} — retrying")
+                return self.request(payload, method, retry=False)
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        except Exception:
+            self.release(conn, reusable=False)
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+
+        conn.requests += 1
+        with self._lock:
+            self._stats["requests"] += 1
+        self.release(conn, reusable=response.keep_alive)
+        return response
+
+    def pipeline(self, payloads: list, method: str = "POST", retry: bool = True) -> list:
+        """
+        Write several requests back-to-back on one connection, then read the
+        responses in order. If the server closes the connection part-way,
+        the unanswered requests are sent again on a fresh connection.
+        With retry=False nothing is re-sent after a dead connection, since the
+        server may have acted on requests it never answered: the responses read
+        so far are returned (fewer than payloads), or the error is raised if
+        there are none. An explicit Connection: close still continues.
+        """
+        if not payloads:
+            return []
+        conn, reused = self.acquire()
+        responses = []
+        try:
+            conn.sock.settimeout(self.timeout)
+            conn.sock.sendall(b"".join(payloads))
+            for _ in payloads:
+                response = conn.reader.read_response(method)
+                responses.append(response)
+                if not response.keep_alive:
+                    break
+        except (StaleConnectionError, BrokenPipeError, ConnectionResetError, ssl.SSLError) as e:
+            self.release(conn, reusable=False)
+            if retry and (reused or responses):
+                with self._lock:
+                    self._stats["retries"] += 1
+                    self._stats["requests"] += len(responses)
+                logger.debug(f"Pipeline to {self.host} cut after {len(responses)} responses: {e}")
+                return responses + self.pipeline(payloads[len(responses):], method, retry=False)
+            with self._lock:
+                self._stats["errors"] += 1
+                self._stats["requests"] += len(responses)
+            if responses:
+                logger.debug(f"Pipeline to {self.host} cut after {len(responses)} responses: {e}")
+                return responses
+            raise
+        except Exception:
+            self.release(conn, reusable=False)
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+
+        complete = len(responses) == len(payloads)
+        conn.requests += len(responses)
+        with self._lock:
+            self._stats["requests"] += len(responses)
+            self._stats["pipelined"] += len(responses)
+        self.release(conn, reusable=complete and responses[-1].keep_alive)
+        if not complete:
+            # Server answered with Connection: close mid-batch
+            return responses + self.pipeline(payloads[len(responses):], method, retry)
+        return responses
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._in_use
+        stats["host"] = self.host
+        return stats
+
+
+class AsyncPooledConnection:
+    """One asyncio TLS stream owned by an AsyncConnectionPool"""
+
+    __slots__ = ("reader", "writer", "pending", "last_used")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending = b""
+        self.last_used = time.monotonic()
+
+    def is_stale(self, idle_timeout: float) -> bool:
+        if time.monotonic() - self.last_used > idle_timeout:
+            return True
+        return self.reader.at_eof() or self.writer.is_closing()
+
+    async def read_response(self, method: str) -> HTTPResponse:
+        parser = ResponseParser(method)
+        if self.pending:
+            used = parser.feed(self.pending)
+            self.pending = self.pending[used:]
+        while not parser.done:
+            data = await self.reader.read(RECV_SIZE)
+            if not data:
+                parser.feed_eof()
+                break
+            used = parser.feed(data)
+            if used < len(data):
+                self.pending = data[used:]
+        return parser.result()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except (OSError, RuntimeError):
+            pass
+
+
+class AsyncConnectionPool:
+    """
+    asyncio counterpart of ConnectionPool. Streams belong to one event loop,
+    so idle connections left over from a previous loop are dropped.
+    """
+
+    def __init__(self, host: str, port: int = 443, max_idle: int = 8,
+                 idle_timeout: float = 30.0, timeout: float = 15.0, connect=None):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        # Optional blocking factory returning a connected plain TCP socket (run in an executor)
+        self._connect = connect
+        self._idle = deque()
+        self._loop = None
+        self._in_use = 0
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "stale_discarded": 0,
+            "retries": 0,
+            "requests": 0,
+            "errors": 0,
+        }
+
+    async def _open_direct(self, context):
+        """TLS streams straight to the host, trying the DNS cache's addresses one by one"""
+        cache = cache_for(self.host)
+        ips = None
+        if cache:
+            ips = await asyncio.get_running_loop().run_in_executor(None, cache.resolve, self.host)
+        if not ips:
+            return await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=context, server_hostname=self.host),
+                self.timeout)
+        error = None
+        for ip in ips:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.open_connection(ip, self.port, ssl=context, server_hostname=self.host),
+                    self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                error = e
+                cache.report_failure(self.host, ip)
+        raise error
+
+    async def _new_connection(self) -> AsyncPooledConnection:
+        context = get_ssl_context()
+        if self._connect:
+            loop = asyncio.get_running_loop()
+            raw = await asyncio.wait_for(
+                loop.run_in_executor(None, self._connect, self.host, self.port), self.timeout)
+            raw.setblocking(False)
+            opener = asyncio.open_connection(sock=raw, ssl=context, server_hostname=self.host)
+            reader, writer = await asyncio.wait_for(opener, self.timeout)
+        else:
+            reader, writer = await self._open_direct(context)
+        context.note_handshake(self.host, writer.get_extra_info("ssl_object"))
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stats["created"] += 1
+        return AsyncPooledConnection(reader, writer)
+
+    async def acquire(self) -> tuple:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams from an earlier asyncio.run() cannot be used here
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+            self._loop = loop
+        self._in_use += 1
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.is_stale(self.idle_timeout):
+                conn.close()
+                self._stats["stale_discarded"] += 1
+                continue
+            self._stats["reused"] += 1
+            return conn, True
+        try:
+            return await self._new_connection(), False
+        except BaseException:
+            self._in_use -= 1
+            raise
+
+    def release(self, conn: AsyncPooledConnection, reusable: bool = True):
+        conn.last_used = time.monotonic()
+        self._in_use -= 1
+        if reusable:
+            get_ssl_context().remember_session(self.host, conn.writer.get_extra_info("ssl_object"))
+        if reusable and len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    async def request(self, payload: bytes, method: str = "GET", retry: bool = True) -> HTTPResponse:
+        """Same contract as ConnectionPool.request()"""
+        conn, reused = await self.acquire()
+        try:
+            conn.writer.write(payload)
+            await conn.writer.drain()
+            response = await asyncio.wait_for(conn.read_response(method), self.timeout)
+        except (StaleConnectionError, ConnectionResetError, BrokenPipeError, ssl.SSLError) as e:
+            self.release(conn, reusable=False)
+            if reused and retry:
+                self._stats["retries"] += 1
+                logger.debug(f"Stale async connection to {self.host}: {e} — retrying")
+                return await self.request(payload, method, retry=False)
+            self._stats["errors"] += 1
+            raise
+        except BaseException:
+            self.release(conn, reusable=False)
+            self._stats["errors"] += 1
+            raise
+
+        self._stats["requests"] += 1
+        self.release(conn, reusable=response.keep_alive)
+        return response
+
+    async def close(self):
+        idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+            try:
+                await conn.writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["idle"] = len(self._idle)
+        stats["in_use"] = self._in_use
+        stats["host"] = self.host
+        return stats
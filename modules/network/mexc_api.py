@@ -2,10 +2,10 @@
 MEXC API Client — Raw Socket Implementation
 For OCEAN HUNTER V10.8.2
 Fixed: Content-Type header for authentication
+Keep-alive: requests share pooled TLS connections
+Public GETs go through the shared TTL / single-flight response cache
 """
 
-import socket
-import ssl
 import hmac
 import hashlib
 import time
@@ -14,23 +14,38 @@ import os
 import logging
 from urllib.parse import urlencode
 from dotenv import load_dotenv
+from .http_pool import ConnectionPool
+from .http_parser import parse_json_body
+from .price_cache import get_price_cache
+from .proxy_resolver import get_proxy_resolver
+from .rate_limiter import get_limiter, lane_for, RateLimitRejected
+from .response_cache import get_response_cache
 
 load_dotenv()
 logger = logging.getLogger("MEXC_API")
 
 
-class MEXCClient:
-    """MEXC Spot API via raw HTTPS socket"""
+class MEXCRequestBuilder:
+    """Credentials + request signing shared by the sync and async clients"""
 
     def __init__(self):
         self.api_key = os.getenv("MEXC_API_KEY", "")
         self.api_secret = os.getenv("MEXC_SECRET_KEY", "")
         self.host = "api.mexc.com"
         self.base_path = "/api/v3"
+        self.limiter = get_limiter("mexc")
+        self.price_cache = get_price_cache()
+        self.response_cache = get_response_cache()
 
-    def _raw_request(self, method: str, path: str, params: dict = None, signed: bool = False) -> dict:
-        """Send HTTPS request via raw socket"""
-        params = params or {}
+    def _cache_key(self, method: str, path: str, params: dict = None, signed: bool = False):
+        """Response-cache key for a public GET with a TTL, else None"""
+        if method != "GET" or signed or not self.response_cache.cacheable(path):
+            return None
+        return self.response_cache.key(self.host, path, params)
+
+    def _build_request(self, method: str, path: str, params: dict = None, signed: bool = False) -> bytes:
+        """Encode a signed/unsigned HTTP/1.1 request for the keep-alive transport"""
+        params = dict(params or {})
 
         if signed:
             params["timestamp"] = int(time.time() * 1000)
@@ -60,7 +75,7 @@ class MEXCClient:
             f"Host: {self.host}",
             f"X-MEXC-APIKEY: {self.api_key}",
             f"Content-Type: {content_type}",
-            "Connection: close",
+            "Connection: keep-alive",
         ]
 
         if body:
@@ -69,35 +84,99 @@ class MEXCClient:
         request = "\r\n".join(headers) + "\r\n\r\n"
         if body:
             request += body
+        return request.encode("utf-8")
+
+    @staticmethod
+    def _decode(response) -> dict:
+        data = parse_json_body(response)
+        if data is None:
+            return {"raw": response.text()}
+        return data
+
+    def _feed_cache(self, kind: str, data, symbols: list = None):
+        """Store an all-symbols ticker reply in the price cache; return the rows for `symbols`"""
+        if isinstance(data, dict):
+            if "error" in data or "symbol" not in data:
+                return data
+            data = [data]
+        if not isinstance(data, list):
+            return {"error": f"unexpected {kind} ticker reply"}
+        if kind == "price":
+            self.price_cache.update_prices(data)
+        elif kind == "book":
+            self.price_cache.update_book(data)
+        else:
+            self.price_cache.update_24hr(data)
+        if symbols is None:
+            return data
+        wanted = set(symbols)
+        return [row for row in data if row.get("symbol") in wanted]
+
+    @staticmethod
+    def _klines_params(symbol: str, interval: str, limit: int,
+                       start_time: int = None, end_time: int = None) -> dict:
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        if end_time is not None:
+            params["endTime"] = int(end_time)
+        return params
+
+    @staticmethod
+    def _extract_balance(account: dict, asset: str = None) -> dict:
+        if "error" in account:
+            return account
+        balances = account.get("balances", [])
+        if asset:
+            for b in balances:
+                if b.get("asset") == asset:
+                    return b
+            return {"asset": asset, "free": "0", "locked": "0"}
+        return {"balances": balances}
+
+    @staticmethod
+    def _order_params(symbol: str, side: str, order_type: str,
+                      quantity: float, price: float = None) -> dict:
+        params = {
+            "symbol": symbol,
+            "side": side.upper(),
+            "type": order_type.upper(),
+            "quantity": str(quantity),
+        }
+        if price and order_type.upper() == "LIMIT":
+            params["price"] = str(price)
+        return params
+
+
+class MEXCClient(MEXCRequestBuilder):
+    """MEXC Spot API via raw HTTPS socket (thread-safe, keep-alive pool)"""
+
+    def __init__(self):
+        super().__init__()
+        self.pool = ConnectionPool(self.host, 443, timeout=15, connect=get_proxy_resolver().connect)
+
+    def _raw_request(self, method: str, path: str, params: dict = None, signed: bool = False) -> dict:
+        """Send HTTPS request via raw socket (public GETs served from the response cache)"""
+        key = self._cache_key(method, path, params, signed)
+        if key is None:
+            return self._send(method, path, params, signed)
+        return self.response_cache.fetch(key, lambda: self._send(method, path, params, signed))
 
+    def _send(self, method: str, path: str, params: dict = None, signed: bool = False) -> dict:
         try:
-            context = ssl.create_default_context()
-            with socket.create_connection((self.host, 443), timeout=15) as sock:
-                with context.wrap_socket(sock, server_hostname=self.host) as ssock:
-                    ssock.sendall(request.encode("utf-8"))
-                    response = b""
-                    while True:
-                        chunk = ssock.recv(4096)
-                        if not chunk:
-                            break
-                        response += chunk
-
-            response_text = response.decode("utf-8", errors="ignore")
-
-            if "\r\n\r\n" in response_text:
-                _, body_text = response_text.split("\r\n\r\n", 1)
-            else:
-                body_text = response_text
-
-            if body_text.startswith("{") or body_text.startswith("["):
-                return json.loads(body_text)
-            else:
-                lines = body_text.split("\r\n")
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith("{") or line.startswith("["):
-                        return json.loads(line)
-            return {"raw": body_text}
+            self.limiter.acquire(lane_for(method, path))
+        except RateLimitRejected as e:
+            logger.warning(f"Rate limit: {e}")
+            return {"error": f"rate limited: {e}"}
+
+        # Sign after waiting so the timestamp is fresh
+        request = self._build_request(method, path, params, signed)
+
+        try:
+            # Orders must never be re-sent on a stale socket, reads may be
+            response = self.pool.request(request, method, retry=(method == "GET"))
+            self.limiter.observe(response.status, response.headers)
+            return self._decode(response)
 
         except json.JSONDecodeError as e:
             logger.error(f"JSON parse error: {e}")
@@ -106,6 +185,21 @@ class MEXCClient:
             logger.error(f"Request failed: {e}")
             return {"error": str(e)}
 
+    def pool_stats(self) -> dict:
+        """Keep-alive pool counters (created / reused / stale_discarded ...)"""
+        return self.pool.stats()
+
+    def rate_stats(self) -> dict:
+        """Per-lane queue-wait metrics of the shared MEXC limiter"""
+        return self.limiter.metrics()
+
+    def cache_stats(self) -> dict:
+        """Response-cache hit / miss / coalesced counters per endpoint"""
+        return self.response_cache.metrics()
+
+    def close(self):
+        self.pool.close()
+
     def ping(self) -> dict:
         return self._raw_request("GET", "/ping")
 
@@ -113,36 +207,62 @@ class MEXCClient:
         return self._raw_request("GET", "/time")
 
     def get_ticker_price(self, symbol: str = "BTCUSDT") -> dict:
-        return self._raw_request("GET", "/ticker/price", {"symbol": symbol})
+        data = self._raw_request("GET", "/ticker/price", {"symbol": symbol})
+        self._feed_cache("price", data)
+        return data
+
+    def get_orderbook(self, symbol: str, limit: int = 20, fresh: bool = False) -> dict:
+        """fresh=True bypasses the response cache (snapshots for sequence sync)"""
+        params = {"symbol": symbol, "limit": limit}
+        if fresh:
+            return self._send("GET", "/depth", params)
+        return self._raw_request("GET", "/depth", params)
 
-    def get_orderbook(self, symbol: str, limit: int = 20) -> dict:
-        return self._raw_request("GET", "/depth", {"symbol": symbol, "limit": limit})
+    def get_exchange_info(self, symbols: list = None) -> dict:
+        params = {"symbols": ",".join(symbols)} if symbols else None
+        return self._raw_request("GET", "/exchangeInfo", params)
+
+    # ── All-symbols tickers (one request for the whole market, feeds the price cache) ──
+
+    def get_all_prices(self, symbols: list = None) -> list:
+        """Last price of every symbol: [{"symbol", "price"}] (filtered to `symbols` if given)"""
+        return self._feed_cache("price", self._raw_request("GET", "/ticker/price"), symbols)
+
+    def get_book_tickers(self, symbols: list = None) -> list:
+        """Best bid/ask of every symbol"""
+        return self._feed_cache("book", self._raw_request("GET", "/ticker/bookTicker"), symbols)
+
+    def get_24hr_tickers(self, symbols: list = None) -> list:
+        """24h statistics of every symbol"""
+        return self._feed_cache("24hr", self._raw_request("GET", "/ticker/24hr"), symbols)
+
+    def refresh_prices(self, symbols: list, max_age: float = None, book: bool = False) -> dict:
+        """
+        {symbol: price} from the cache, refreshed with one all-symbols request
+        only if any of `symbols` is stale. book=True also refreshes bid/ask,
+        likewise only if a book is stale.
+        """
+        if self.price_cache.stale_symbols(symbols, max_age):
+            self.get_all_prices()
+        if book and self.price_cache.stale_books(symbols, max_age):
+            self.get_book_tickers()
+        return self.price_cache.prices(symbols, max_age)
+
+    def get_klines(self, symbol: str, interval: str = "60m", limit: int = 100,
+                   start_time: int = None, end_time: int = None) -> list:
+        """Raw klines: [open_time, open, high, low, close, volume, close_time, quote_volume]"""
+        return self._raw_request("GET", "/klines",
+                                 self._klines_params(symbol, interval, limit, start_time, end_time))
 
     def get_account(self) -> dict:
         return self._raw_request("GET", "/account", signed=True)
 
     def get_balance(self, asset: str = None) -> dict:
-        account = self.get_account()
-        if "error" in account:
-            return account
-        balances = account.get("balances", [])
-        if asset:
-            for b in balances:
-                if b.get("asset") == asset:
-                    return b
-            return {"asset": asset, "free": "0", "locked": "0"}
-        return {"balances": balances}
+        return self._extract_balance(self.get_account(), asset)
 
     def create_order(self, symbol: str, side: str, order_type: str,
                      quantity: float, price: float = None) -> dict:
-        params = {
-            "symbol": symbol,
-            "side": side.upper(),
-            "type": order_type.upper(),
-            "quantity": str(quantity),
-        }
-        if price and order_type.upper() == "LIMIT":
-            params["price"] = str(price)
+        params = self._order_params(symbol, side, order_type, quantity, price)
         return self._raw_request("POST", "/order", params, signed=True)
 
     def cancel_order(self, symbol: str, order_id: str = None) -> dict:
@@ -0,0 +1,238 @@
+"""
+MEXC API Client — asyncio Implementation
+For OCEAN HUNTER V10.8.2
+Same methods as MEXCClient, plus concurrent multi-symbol fan-out so a tick
+costs roughly max(RTT) instead of sum(RTT). Synchronous callers go through
+run_sync(): one long-lived event loop on a daemon thread, so the pooled
+keep-alive streams survive from one call (one main.py cycle) to the next.
+"""
+
+import asyncio
+import json
+import time
+import threading
+import logging
+from .http_pool import AsyncConnectionPool
+from .mexc_api import MEXCRequestBuilder
+from .proxy_resolver import get_proxy_resolver
+from .rate_limiter import lane_for, RateLimitRejected
+
+logger = logging.getLogger("MEXC_ASYNC")
+
+BTC_SYMBOL = "BTCUSDT"
+
+
+class AsyncMEXCClient(MEXCRequestBuilder):
+    """MEXC Spot API over pooled asyncio TLS streams"""
+
+    def __init__(self, max_concurrency: int = 8):
+        super().__init__()
+        self.pool = AsyncConnectionPool(self.host, 443, max_idle=max_concurrency, timeout=15,
+                                        connect=get_proxy_resolver().connect)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _slot(self) -> asyncio.Semaphore:
+        """Concurrency cap, recreated per event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _raw_request(self, method: str, path: str, params: dict = None, signed: bool = False):
+        key = self._cache_key(method, path, params, signed)
+        if key is None:
+            return await self._send(method, path, params, signed)
+        return await self.response_cache.fetch_async(
+            key, lambda: self._send(method, path, params, signed))
+
+    async def _send(self, method: str, path: str, params: dict = None, signed: bool = False):
+        try:
+            await self.limiter.acquire_async(lane_for(method, path))
+        except RateLimitRejected as e:
+            logger.warning(f"Rate limit: {e}")
+            return {"error": f"rate limited: {e}"}
+
+        request = self._build_request(method, path, params, signed)
+        try:
+            async with self._slot():
+                response = await self.pool.request(request, method, retry=(method == "GET"))
+            self.limiter.observe(response.status, response.headers)
+            return self._decode(response)
+
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON parse error: {e}")
+            return {"error": str(e)}
+        except Exception as e:
+            logger.error(f"Request failed: {e!r}")
+            return {"error": str(e) or type(e).__name__}
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    def rate_stats(self) -> dict:
+        return self.limiter.metrics()
+
+    def cache_stats(self) -> dict:
+        return self.response_cache.metrics()
+
+    async def close(self):
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ── Public endpoints ──
+
+    async def ping(self) -> dict:
+        return await self._raw_request("GET", "/ping")
+
+    async def get_server_time(self) -> dict:
+        return await self._raw_request("GET", "/time")
+
+    async def get_ticker_price(self, symbol: str = "BTCUSDT") -> dict:
+        data = await self._raw_request("GET", "/ticker/price", {"symbol": symbol})
+        self._feed_cache("price", data)
+        return data
+
+    async def get_orderbook(self, symbol: str, limit: int = 20, fresh: bool = False) -> dict:
+        params = {"symbol": symbol, "limit": limit}
+        if fresh:
+            return await self._send("GET", "/depth", params)
+        return await self._raw_request("GET", "/depth", params)
+
+    async def get_exchange_info(self, symbols: list = None) -> dict:
+        params = {"symbols": ",".join(symbols)} if symbols else None
+        return await self._raw_request("GET", "/exchangeInfo", params)
+
+    async def get_all_prices(self, symbols: list = None) -> list:
+        return self._feed_cache("price", await self._raw_request("GET", "/ticker/price"), symbols)
+
+    async def get_book_tickers(self, symbols: list = None) -> list:
+        return self._feed_cache("book", await self._raw_request("GET", "/ticker/bookTicker"), symbols)
+
+    async def get_24hr_tickers(self, symbols: list = None) -> list:
+        return self._feed_cache("24hr", await self._raw_request("GET", "/ticker/24hr"), symbols)
+
+    async def refresh_prices(self, symbols: list, max_age: float = None, book: bool = False) -> dict:
+        pending = []
+        if self.price_cache.stale_symbols(symbols, max_age):
+            pending.append(self.get_all_prices())
+        if book and self.price_cache.stale_books(symbols, max_age):
+            pending.append(self.get_book_tickers())
+        await asyncio.gather(*pending)
+        return self.price_cache.prices(symbols, max_age)
+
+    async def get_klines(self, symbol: str, interval: str = "60m", limit: int = 100,
+                         start_time: int = None, end_time: int = None) -> list:
+        return await self._raw_request("GET", "/klines",
+                                       self._klines_params(symbol, interval, limit, start_time, end_time))
+
+    # ── Signed endpoints ──
+
+    async def get_account(self) -> dict:
+        return await self._raw_request("GET", "/account", signed=True)
+
+    async def get_balance(self, asset: str = None) -> dict:
+        return self._extract_balance(await self.get_account(), asset)
+
+    async def create_order(self, symbol: str, side: str, order_type: str,
+                           quantity: float, price: float = None) -> dict:
+        params = self._order_params(symbol, side, order_type, quantity, price)
+        return await self._raw_request("POST", "/order", params, signed=True)
+
+    async def cancel_order(self, symbol: str, order_id: str = None) -> dict:
+        params = {"symbol": symbol}
+        if order_id:
+            params["orderId"] = order_id
+        return await self._raw_request("DELETE", "/order", params, signed=True)
+
+    async def get_open_orders(self, symbol: str = None) -> dict:
+        params = {"symbol": symbol} if symbol else {}
+        return await self._raw_request("GET", "/openOrders", params, signed=True)
+
+    # ── Fan-out ──
+
+    async def gather_klines(self, symbols: list, interval: str = "60m", limit: int = 100) -> dict:
+        """Klines for many symbols concurrently: {symbol: klines or {"error": ...}}"""
+        results = await asyncio.gather(*(self.get_klines(s, interval, limit) for s in symbols))
+        return dict(zip(symbols, results))
+
+    async def gather_market_snapshot(self, symbols: list, interval: str = "15m", limit: int = 100,
+                                     btc_interval: str = "60m", btc_limit: int = 100,
+                                     depth_limit: int = 20) -> dict:
+        """
+        Everything one strategy tick needs, fetched concurrently:
+        OHLCV + order book for every symbol and the BTC health candles.
+        All requests share the MEXC market-data lane, so orders placed
+        meanwhile still go first.
+        """
+        started = time.perf_counter()
+        kline_tasks = [self.get_klines(s, interval, limit) for s in symbols]
+        book_tasks = [self.get_orderbook(s, depth_limit) for s in symbols]
+        btc_task = self.get_klines(BTC_SYMBOL, btc_interval, btc_limit)
+
+        results = await asyncio.gather(btc_task, *kline_tasks, *book_tasks)
+        n = len(symbols)
+        klines = dict(zip(symbols, results[1:1 + n]))
+        books = dict(zip(symbols, results[1 + n:]))
+
+        errors = {}
+        for sym in symbols:
+            for kind, payload in (("klines", klines[sym]), ("orderbook", books[sym])):
+                if isinstance(payload, dict) and "error" in payload:
+                    errors.setdefault(sym, {})[kind] = payload["error"]
+        if isinstance(results[0], dict) and "error" in results[0]:
+            errors.setdefault(BTC_SYMBOL, {})["btc_klines"] = results[0]["error"]
+
+        return {
+            "klines": klines,
+            "orderbooks": books,
+            "btc_klines": results[0],
+            "errors": errors,
+            "interval": interval,
+            "btc_interval": btc_interval,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+
+_async_client_instance = None
+
+def get_async_client() -> AsyncMEXCClient:
+    global _async_client_instance
+    if _async_client_instance is None:
+        _async_client_instance = AsyncMEXCClient()
+    return _async_client_instance
+
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+def client_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop the async clients run on (started on first use)"""
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or not _loop_thread.is_alive():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="mexc-async-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+def run_sync(coro, timeout: float = None):
+    """Run a coroutine on the client loop from synchronous code and return its result"""
+    loop = client_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() called on the client loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
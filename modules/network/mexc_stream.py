@@ -0,0 +1,599 @@
+"""
+MEXC Market Stream — WebSocket client (RFC 6455 over raw sockets)
+For OCEAN HUNTER V10.8.2
+Kline / deals / depth / bookTicker push channels with heartbeat, auto-reconnect,
+resubscribe, sequence-gap detection and REST backfill. Replaces kline polling.
+"""
+
+import os
+import json
+import time
+import base64
+import random
+import socket
+import struct
+import hashlib
+import threading
+import logging
+from collections import deque
+from urllib.parse import urlparse
+from .tls import get_ssl_context
+from .dns_bypass import create_connection
+from .price_cache import get_price_cache
+
+logger = logging.getLogger("MEXC_STREAM")
+
+WS_URL = "wss://wbs.mexc.com/ws"
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+MAX_SUBSCRIPTIONS = 30          # MEXC limit per connection
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+RECV_SIZE = 64 * 1024
+DEPTH_SNAPSHOT_LIMIT = 500
+RESYNC_MIN, RESYNC_MAX = 1.0, 60.0   # seconds between depth snapshots per symbol (backoff on failure)
+
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+# REST interval → stream interval name
+KLINE_INTERVALS = {
+    "1m": "Min1", "5m": "Min5", "15m": "Min15", "30m": "Min30", "60m": "Min60",
+    "4h": "Hour4", "8h": "Hour8", "1d": "Day1", "1W": "Week1", "1M": "Month1",
+}
+STREAM_INTERVALS = {v: k for k, v in KLINE_INTERVALS.items()}
+INTERVAL_MS = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000, "60m": 3_600_000,
+    "4h": 14_400_000, "8h": 28_800_000, "1d": 86_400_000, "1W": 604_800_000,
+}
+
+
+def kline_channel(symbol: str, interval: str = "1m") -> str:
+    return f"spot@public.kline.v3.api@{symbol}@{KLINE_INTERVALS[interval]}"
+
+def deals_channel(symbol: str) -> str:
+    return f"spot@public.deals.v3.api@{symbol}"
+
+def depth_channel(symbol: str) -> str:
+    return f"spot@public.increase.depth.v3.api@{symbol}"
+
+def book_ticker_channel(symbol: str) -> str:
+    return f"spot@public.bookTicker.v3.api@{symbol}"
+
+
+class WebSocketError(ConnectionError):
+    """Handshake failure, protocol violation or closed stream"""
+
+
+# ── framing ──
+
+def _mask(data: bytes, key: bytes) -> bytes:
+    n = len(data)
+    if not n:
+        return b""
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(n, "big")
+
+
+def encode_frame(opcode: int, payload: bytes = b"", mask: bool = True) -> bytes:
+    """Single FIN frame; clients must mask (RFC 6455 5.3)"""
+    header = bytearray([0x80 | opcode])
+    n = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header.append(mask_bit | n)
+    elif n < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", n)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", n)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _mask(payload, key)
+    return bytes(header) + payload
+
+
+class FrameParser:
+    """Incremental frame decoder; reassembles fragmented messages, passes control frames through"""
+
+    def __init__(self, max_size: int = MAX_FRAME_SIZE):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self._fragments = []
+        self._fragment_op = None
+
+    def feed(self, data) -> list:
+        """Returns complete (opcode, payload) messages"""
+        self._buf += data
+        messages = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return messages
+            fin, opcode, payload = frame
+            if opcode >= OP_CLOSE:
+                messages.append((opcode, payload))
+            elif opcode == OP_CONT:
+                if self._fragment_op is None:
+                    raise WebSocketError("continuation frame without a start")
+                self._fragments.append(payload)
+                if fin:
+                    messages.append((self._fragment_op, b"".join(self._fragments)))
+                    self._fragments, self._fragment_op = [], None
+            elif fin:
+                messages.append((opcode, payload))
+            else:
+                self._fragment_op, self._fragments = opcode, [payload]
+
+    def _next_frame(self):
+        buf = self._buf
+        if len(buf) < 2:
+            return None
+        fin = bool(buf[0] & 0x80)
+        opcode = buf[0] & 0x0F
+        masked = buf[1] & 0x80
+        length = buf[1] & 0x7F
+        pos = 2
+        if length == 126:
+            if len(buf) < 4:
+                return None
+            length = struct.unpack_from("!H", buf, 2)[0]
+            pos = 4
+        elif length == 127:
+            if len(buf) < 10:
+                return None
+            length = struct.unpack_from("!Q", buf, 2)[0]
+            pos = 10
+        if length > self.max_size:
+            raise WebSocketError(f"frame too large: {length}")
+        key = None
+        if masked:
+            if len(buf) < pos + 4:
+                return None
+            key = bytes(buf[pos:pos + 4])
+            pos += 4
+        if len(buf) < pos + length:
+            return None
+        payload = bytes(buf[pos:pos + length])
+        del buf[:pos + length]
+        if key:
+            payload = _mask(payload, key)
+        return fin, opcode, payload
+
+
+class WebSocketConnection:
+    """One client connection: Upgrade handshake, framed send/recv"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.parser = FrameParser()
+        self._pending = deque()
+        self._send_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, url: str, connect=None, timeout: float = 10.0) -> "WebSocketConnection":
+        parsed = urlparse(url)
+        secure = parsed.scheme == "wss"
+        host = parsed.hostname
+        port = parsed.port or (443 if secure else 80)
+
+        raw = connect(host, port) if connect else create_connection((host, port), timeout=timeout)
+        raw.settimeout(timeout)
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock = get_ssl_context().wrap_socket(raw, server_hostname=host) if secure else raw
+
+        try:
+            key = base64.b64encode(os.urandom(16)).decode("ascii")
+            path = parsed.path or "/"
+            if parsed.query:
+                path += f"?{parsed.query}"
+            sock.sendall((
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Version: 13\r\n\r\n"
+            ).encode("ascii"))
+
+            head = b""
+            while b"\r\n\r\n" not in head:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise WebSocketError("connection closed during handshake")
+                head += chunk
+                if len(head) > 65536:
+                    raise WebSocketError("handshake response too large")
+            head, _, rest = head.partition(b"\r\n\r\n")
+
+            lines = head.decode("iso-8859-1").split("\r\n")
+            if len(lines[0].split(" ")) < 2 or lines[0].split(" ")[1] != "101":
+                raise WebSocketError(f"upgrade refused: {lines[0][:80]}")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            expected = base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+            if headers.get("sec-websocket-accept") != expected:
+                raise WebSocketError("bad Sec-WebSocket-Accept")
+        except Exception:
+            sock.close()
+            raise
+
+        conn = cls(sock)
+        if rest:
+            conn._pending.extend(conn.parser.feed(rest))
+        return conn
+
+    def send(self, opcode: int, payload: bytes = b""):
+        frame = encode_frame(opcode, payload)
+        with self._send_lock:
+            self.sock.sendall(frame)
+
+    def send_json(self, message: dict):
+        self.send(OP_TEXT, json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+    def recv(self) -> tuple:
+        """Next (opcode, payload); raises socket.timeout if nothing arrives in time"""
+        while not self._pending:
+            data = self.sock.recv(RECV_SIZE)
+            if not data:
+                raise WebSocketError("connection closed by server")
+            self._pending.extend(self.parser.feed(data))
+        return self._pending.popleft()
+
+    def close(self, code: int = 1000):
+        try:
+            self.send(OP_CLOSE, struct.pack("!H", code))
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class MEXCStream:
+    """
+    Background-thread market stream. Handlers registered with on(event, fn)
+    run on the stream thread and must return quickly. Events:
+      kline, kline_closed, deal, depth, depth_snapshot, book_ticker, gap, status
+    Trade prices and top-of-book also go into the shared PriceCache.
+    """
+
+    def __init__(self, url: str = WS_URL, rest=None, heartbeat: float = 20.0,
+                 idle_timeout: float = 45.0, connect=None, max_backoff: float = 30.0,
+                 price_cache=None, resync_min: float = RESYNC_MIN, resync_max: float = RESYNC_MAX):
+        self.url = url
+        self.heartbeat = heartbeat
+        self.idle_timeout = idle_timeout
+        self.max_backoff = max_backoff
+        self.resync_min = resync_min
+        self.resync_max = resync_max
+        self._rest = rest
+        self._connect = connect
+        if connect is None and url.startswith("wss://"):
+            from .proxy_resolver import get_proxy_resolver
+            self._connect = get_proxy_resolver().connect
+        self.price_cache = price_cache or get_price_cache()
+
+        self._channels = {}
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._updated = threading.Condition()
+        self._update_seq = 0
+        self._conn = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_kline = {}
+        self._depth_version = {}
+        self._resync_at = {}        # symbol → monotonic time of the next allowed depth snapshot
+        self._resync_failures = {}
+        self._stats = {"connects": 0, "reconnects": 0, "messages": 0, "pings": 0, "pongs": 0,
+                       "gaps": 0, "backfilled": 0, "resyncs": 0, "resync_failures": 0,
+                       "resyncs_deferred": 0}
+
+    @property
+    def rest(self):
+        if self._rest is None:
+            from .mexc_api import get_client
+            self._rest = get_client()
+        return self._rest
+
+    # ── subscriptions ──
+
+    def subscribe_kline(self, symbol: str, interval: str = "1m"):
+        self._add(kline_channel(symbol, interval), "kline", symbol, interval)
+
+    def subscribe_deals(self, symbol: str):
+        self._add(deals_channel(symbol), "deals", symbol)
+
+    def subscribe_depth(self, symbol: str):
+        self._add(depth_channel(symbol), "depth", symbol)
+
+    def subscribe_book_ticker(self, symbol: str):
+        self._add(book_ticker_channel(symbol), "bookTicker", symbol)
+
+    def _add(self, channel: str, kind: str, symbol: str, interval: str = None):
+        with self._lock:
+            if channel in self._channels:
+                return
+            if len(self._channels) >= MAX_SUBSCRIPTIONS:
+                raise ValueError(f"MEXC allows {MAX_SUBSCRIPTIONS} subscriptions per connection")
+            self._channels[channel] = (kind, symbol, interval)
+            conn = self._conn
+        if conn is not None:
+            conn.send_json({"method": "SUBSCRIPTION", "params": [channel]})
+
+    def unsubscribe(self, channel: str):
+        with self._lock:
+            self._channels.pop(channel, None)
+            conn = self._conn
+        if conn is not None:
+            conn.send_json({"method": "UNSUBSCRIPTION", "params": [channel]})
+
+    def on(self, event: str, handler):
+        """Register a handler(payload: dict); returns it so it can be used as a decorator"""
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def _emit(self, event: str, payload: dict):
+        for handler in self._handlers.get(event, ()):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"{event} handler failed: {e!r}")
+
+    # ── lifecycle ──
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mexc-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        conn = self._conn
+        if conn is not None:
+            conn.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the next market update (True) or timeout (False)"""
+        with self._updated:
+            seq = self._update_seq
+            return self._updated.wait_for(lambda: self._update_seq != seq, timeout)
+
+    def latest_kline(self, symbol: str, interval: str = "1m"):
+        return self._last_kline.get((symbol, interval))
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["connected"] = self.connected
+        stats["channels"] = len(self._channels)
+        return stats
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._session()
+            except (OSError, ValueError) as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Stream disconnected: {e!r}")
+            if self._stop.is_set():
+                break
+            if time.monotonic() - started > 60:
+                backoff = 1.0
+            delay = backoff * (0.5 + random.random() / 2)
+            self._emit("status", {"state": "reconnecting", "delay": round(delay, 2)})
+            self._stop.wait(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+        self._emit("status", {"state": "stopped"})
+
+    def _session(self):
+        conn = WebSocketConnection.open(self.url, self._connect, timeout=10)
+        conn.sock.settimeout(min(1.0, self.heartbeat))
+        with self._lock:
+            channels = list(self._channels)
+            self._conn = conn
+        self._stats["connects"] += 1
+        if self._stats["connects"] > 1:
+            self._stats["reconnects"] += 1
+        self._emit("status", {"state": "connected"})
+
+        try:
+            if channels:
+                conn.send_json({"method": "SUBSCRIPTION", "params": channels})
+            # Whatever happened while we were away is fetched over REST
+            self._depth_version.clear()
+            for (symbol, interval), last in list(self._last_kline.items()):
+                self._backfill(symbol, interval, last["open_time"], reason="reconnect")
+
+            last_ping = last_rx = time.monotonic()
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now - last_ping >= self.heartbeat:
+                    conn.send_json({"method": "PING"})
+                    self._stats["pings"] += 1
+                    last_ping = now
+                if now - last_rx > self.idle_timeout:
+                    raise WebSocketError(f"no data for {self.idle_timeout}s")
+                try:
+                    opcode, payload = conn.recv()
+                except socket.timeout:
+                    continue
+                last_rx = time.monotonic()
+                if opcode == OP_PING:
+                    conn.send(OP_PONG, payload)
+                elif opcode == OP_CLOSE:
+                    raise WebSocketError("server closed the stream")
+                elif opcode == OP_TEXT:
+                    self._dispatch(json.loads(payload))
+        finally:
+            with self._lock:
+                self._conn = None
+            conn.close()
+
+    # ── message handling ──
+
+    def _dispatch(self, message: dict):
+        channel = message.get("c")
+        if channel is None:
+            # Subscription ack or PONG: {"id": 0, "code": 0, "msg": "..."}
+            if message.get("msg") == "PONG":
+                self._stats["pongs"] += 1
+            elif message.get("code") not in (0, None):
+                logger.warning(f"Stream error reply: {message}")
+            return
+
+        self._stats["messages"] += 1
+        data = message.get("d") or {}
+        symbol = message.get("s")
+        if ".kline." in channel:
+            self._on_kline(symbol, data.get("k") or {})
+        elif ".deals." in channel:
+            for deal in data.get("deals", []):
+                price = float(deal["p"])
+                self.price_cache.update(symbol, price, deal["t"] / 1000)
+                self._emit("deal", {"symbol": symbol, "price": price, "qty": float(deal["v"]),
+                                    "side": "BUY" if deal.get("S") == 1 else "SELL", "time": deal["t"]})
+        elif ".depth." in channel:
+            self._on_depth(symbol, data)
+        elif ".bookTicker." in channel:
+            row = {"symbol": symbol, "bidPrice": data.get("b"), "bidQty": data.get("B"),
+                   "askPrice": data.get("a"), "askQty": data.get("A")}
+            self.price_cache.update_book([row])
+            self._emit("book_ticker", {"symbol": symbol, "bid": float(data["b"]), "bid_qty": float(data["B"]),
+                                       "ask": float(data["a"]), "ask_qty": float(data["A"]),
+                                       "time": message.get("t")})
+        with self._updated:
+            self._update_seq += 1
+            self._updated.notify_all()
+
+    def _on_kline(self, symbol: str, k: dict):
+        interval = STREAM_INTERVALS.get(k.get("i"), k.get("i"))
+        candle = {
+            "symbol": symbol,
+            "interval": interval,
+            # Stream times are in seconds, REST in milliseconds
+            "open_time": int(k["t"]) * 1000,
+            "open": float(k["o"]),
+            "high": float(k["h"]),
+            "low": float(k["l"]),
+            "close": float(k["c"]),
+            "volume": float(k["v"]),
+            "quote_volume": float(k.get("a", 0)),
+            "close_time": int(k["T"]) * 1000,
+        }
+        key = (symbol, interval)
+        previous = self._last_kline.get(key)
+        if previous is not None:
+            if candle["open_time"] < previous["open_time"]:
+                return
+            if candle["open_time"] > previous["open_time"]:
+                step = INTERVAL_MS.get(interval)
+                if step and candle["open_time"] - previous["open_time"] > step:
+                    # Missed at least one whole candle: take the closed ones from REST
+                    self._backfill(symbol, interval, previous["open_time"], candle["open_time"], reason="gap")
+                else:
+                    self._emit("kline_closed", previous)
+        self._last_kline[key] = candle
+        self.price_cache.update(symbol, candle["close"])
+        self._emit("kline", candle)
+
+    def _backfill(self, symbol: str, interval: str, since: int, until: int = None, reason: str = "gap"):
+        """Emit REST candles with since <= open_time < until as closed (open one as `kline`)"""
+        self._stats["gaps"] += 1
+        self._emit("gap", {"channel": "kline", "symbol": symbol, "interval": interval,
+                           "since": since, "until": until, "reason": reason})
+        rows = self.rest.get_klines(symbol, interval, limit=1000, start_time=since,
+                                    end_time=(until - 1) if until else None)
+        if not isinstance(rows, list):
+            logger.warning(f"Kline backfill failed for {symbol}: {rows}")
+            return
+        now_ms = int(time.time() * 1000)
+        for row in rows:
+            candle = {
+                "symbol": symbol, "interval": interval, "open_time": int(row[0]),
+                "open": float(row[1]), "high": float(row[2]), "low": float(row[3]),
+                "close": float(row[4]), "volume": float(row[5]), "close_time": int(row[6]),
+                "quote_volume": float(row[7]) if len(row) > 7 else 0.0, "backfill": True,
+            }
+            if until is not None and candle["open_time"] >= until:
+                continue
+            if until is None and candle["close_time"] >= now_ms:
+                # Still open: becomes the current candle
+                self._last_kline[(symbol, interval)] = candle
+                self._emit("kline", candle)
+                continue
+            self._stats["backfilled"] += 1
+            self._emit("kline_closed", candle)
+
+    def _on_depth(self, symbol: str, data: dict):
+        version = int(data.get("r", 0))
+        last = self._depth_version.get(symbol)
+        if last is not None and version <= last:
+            return
+        if last is None or version != last + 1:
+            if last is not None:
+                self._stats["gaps"] += 1
+                self._emit("gap", {"channel": "depth", "symbol": symbol, "expected": last + 1, "got": version})
+            snapshot_version = self._resync_depth(symbol)
+            if snapshot_version is None:
+                return      # still unsynced: a later diff retries once the backoff allows
+            if version <= snapshot_version:
+                return
+            if snapshot_version < version - 1:
+                # Snapshot older than this diff: snapshot+1 .. version-1 are missing
+                self._stats["gaps"] += 1
+                self._depth_version.pop(symbol, None)
+                self._emit("gap", {"channel": "depth", "symbol": symbol,
+                                   "expected": snapshot_version + 1, "got": version})
+                return
+        self._depth_version[symbol] = version
+        self._emit("depth", {
+            "symbol": symbol,
+            "version": version,
+            "bids": [(float(x["p"]), float(x["v"])) for x in data.get("bids", [])],
+            "asks": [(float(x["p"]), float(x["v"])) for x in data.get("asks", [])],
+        })
+
+    def _resync_depth(self, symbol: str):
+        """
+        REST snapshot; returns its lastUpdateId (diffs up to it are already included).
+        Rate-limited per symbol and backing off while REST keeps failing, so an
+        unsynced symbol doesn't cost a blocking REST call on every diff.
+        """
+        if time.monotonic() < self._resync_at.get(symbol, 0.0):
+            self._stats["resyncs_deferred"] += 1
+            self._depth_version.pop(symbol, None)
+            return None
+        book = self.rest.get_orderbook(symbol, DEPTH_SNAPSHOT_LIMIT, fresh=True)
+        if not isinstance(book, dict) or "bids" not in book:
+            failures = self._resync_failures.get(symbol, 0) + 1
+            self._resync_failures[symbol] = failures
+            self._resync_at[symbol] = time.monotonic() + min(self.resync_min * 2 ** (failures - 1), self.resync_max)
+            self._stats["resync_failures"] += 1
+            logger.warning(f"Depth resync failed for {symbol}: {book}")
+            self._depth_version.pop(symbol, None)
+            return None
+        self._resync_failures[symbol] = 0
+        self._resync_at[symbol] = time.monotonic() + self.resync_min
+        self._stats["resyncs"] += 1
+        version = int(book.get("lastUpdateId", 0))
+        self._depth_version[symbol] = version
+        self._emit("depth_snapshot", {
+            "symbol": symbol,
+            "version": version,
+            "bids": [(float(p), float(q)) for p, q, *_ in book.get("bids", [])],
+            "asks": [(float(p), float(q)) for p, q, *_ in book.get("asks", [])],
+        })
+        return version
@@ -1,6 +1,7 @@
 # modules/network/nobitex_api.py
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 import sys
 import os
 
@@ -15,35 +16,81 @@ try:
 except ImportError as e:
     print(f"⚠️ Could not load DNS Bypass: {e}")
 
+from modules.network.rate_limiter import get_limiter, LANE_MARKET_DATA, RateLimitRejected
+from modules.network.tls import get_ssl_context
+from modules.network.response_cache import get_response_cache
+
+class SharedTLSAdapter(HTTPAdapter):
+    """Mounts the process-wide TLS context (session resumption) into requests"""
+
+    def __init__(self, verify=True, **kwargs):
+        self._ssl_context = get_ssl_context(verify=verify)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self._ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    @staticmethod
+    def _tls_socket(resp):
+        """The response's SSLSocket: the pooled connection's, or the body's once http.client let go of it"""
+        conn = getattr(resp, "connection", None) or getattr(resp, "_connection", None)
+        sock = getattr(conn, "sock", None)
+        if sock is None:
+            raw = getattr(getattr(getattr(resp, "_fp", None), "fp", None), "raw", None)
+            sock = getattr(raw, "_sock", None)
+        return sock if hasattr(sock, "session") else None
+
+    def build_response(self, req, resp):
+        # TLS 1.3 tickets arrive after the handshake: store the session once the reply head is in
+        sock = self._tls_socket(resp)
+        if sock is not None:
+            self._ssl_context.remember_session(sock.server_hostname, sock)
+        return super().build_response(req, resp)
+
 class NobitexAPI:
     BASE_URL = "https://api.nobitex.ir"
 
     def __init__(self):
+        # 25 req/min, 2.5s spacing, Orders > Balance > Market Data
+        self.limiter = get_limiter("nobitex")
+        self.response_cache = get_response_cache()
         self.session = requests.Session()
         # CRITICAL: Disable proxies for the main connection too
         self.session.trust_env = False 
+        # verify=False below: the pinned IP's certificate may not match
+        self.session.mount("https://", SharedTLSAdapter(verify=False))
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "application/json"
         })
 
     def get_ohlcv(self, symbol, resolution="60", from_ts=None, to_ts=None):
-        url = f"{self.BASE_URL}/market/udf/history"
+        # Identical windows within the TTL share one request (25 req/min budget)
         params = {"symbol": symbol, "resolution": resolution, "from": from_ts, "to": to_ts}
-        
+        key = self.response_cache.key(self.BASE_URL, "udf/history", params)
+        return self.response_cache.fetch(key, lambda: self._get_ohlcv(params))
+
+    def _get_ohlcv(self, params):
+        url = f"{self.BASE_URL}/market/udf/history"
         try:
+            self.limiter.acquire(LANE_MARKET_DATA)
             print(f"   📡 Connecting to {url} ...")
             # verify=False is needed because we might be using a direct IP which doesn't match the SSL cert
             response = self.session.get(url, params=params, timeout=20, verify=False)
+            self.limiter.observe(response.status_code, {k.lower(): v for k, v in response.headers.items()})
             
             if response.status_code == 200:
                 data = response.json()
-                if data.get("s") == "ok":
+                if data.get("s") in ("ok", "no_data"):
+                    # no_data: nothing in [from, to] (e.g. before listing), not a failure
                     return data
                 else:
                     return {"s": "error", "msg": f"API Error: {data.get('s')}"}
             else:
                 return {"s": "error", "msg": f"HTTP {response.status_code}"}
                 
+        except RateLimitRejected as e:
+            return {"s": "error", "msg": f"Rate limited: {e}"}
         except Exception as e:
             return {"s": "error", "msg": f"{type(e).__name__}: {str(e)}"}
@@ -0,0 +1,213 @@
+"""
+Price Cache — shared last-price / top-of-book store
+For OCEAN HUNTER V10.8.2
+Fed by the all-symbols ticker endpoints (one request for the whole market);
+read by the trader and the stream consumers with staleness limits.
+"""
+
+import time
+import threading
+
+DEFAULT_MAX_AGE = 10.0  # seconds
+
+
+class PriceQuote:
+    """Latest known market state of one symbol"""
+
+    __slots__ = ("symbol", "price", "bid", "ask", "bid_qty", "ask_qty",
+                 "volume", "quote_volume", "change_pct", "updated", "book_updated")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.price = None
+        self.bid = None
+        self.ask = None
+        self.bid_qty = None
+        self.ask_qty = None
+        self.volume = None
+        self.quote_volume = None
+        self.change_pct = None
+        self.updated = 0.0
+        self.book_updated = 0.0
+
+    @property
+    def mid(self):
+        if self.bid and self.ask:
+            return (self.bid + self.ask) / 2
+        return self.price
+
+    @property
+    def spread(self):
+        """(ask - bid) / bid, as in ARCHITECTURE 11.8.1"""
+        if self.bid and self.ask:
+            return (self.ask - self.bid) / self.bid
+        return None
+
+    def age(self, now: float = None) -> float:
+        return (now or time.time()) - self.updated
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceCache:
+    """Thread-safe {symbol: PriceQuote}; bulk updates replace many symbols under one lock"""
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._last_bulk = {}
+
+    def _quote(self, symbol: str) -> PriceQuote:
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            quote = self._quotes[symbol] = PriceQuote(symbol)
+        return quote
+
+    # ── writers ──
+
+    def update(self, symbol: str, price: float, timestamp: float = None):
+        with self._lock:
+            quote = self._quote(symbol)
+            quote.price = float(price)
+            quote.updated = timestamp or time.time()
+
+    def update_prices(self, rows: list):
+        """Rows from /ticker/price: [{"symbol", "price"}]"""
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                price = _float(row.get("price"))
+                if price is None:
+                    continue
+                quote = self._quote(row["symbol"])
+                quote.price = price
+                quote.updated = now
+            self._last_bulk["price"] = now
+
+    def update_book(self, rows: list):
+        """Rows from /ticker/bookTicker: [{"symbol", "bidPrice", "bidQty", "askPrice", "askQty"}]"""
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                quote = self._quote(row["symbol"])
+                quote.bid = _float(row.get("bidPrice"))
+                quote.ask = _float(row.get("askPrice"))
+                quote.bid_qty = _float(row.get("bidQty"))
+                quote.ask_qty = _float(row.get("askQty"))
+                quote.book_updated = now
+                if quote.price is None or quote.updated < now - self.max_age:
+                    # No fresh trade price: the mid is the best estimate
+                    mid = quote.mid
+                    if mid is not None:
+                        quote.price = mid
+                        quote.updated = now
+            self._last_bulk["book"] = now
+
+    def update_24hr(self, rows: list):
+        """Rows from /ticker/24hr: lastPrice, volume, quoteVolume, priceChangePercent, bid/ask"""
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                quote = self._quote(row["symbol"])
+                last = _float(row.get("lastPrice"))
+                if last is not None:
+                    quote.price = last
+                    quote.updated = now
+                quote.volume = _float(row.get("volume"))
+                quote.quote_volume = _float(row.get("quoteVolume"))
+                quote.change_pct = _float(row.get("priceChangePercent"))
+                bid, ask = _float(row.get("bidPrice")), _float(row.get("askPrice"))
+                if bid and ask:
+                    quote.bid, quote.ask = bid, ask
+                    quote.book_updated = now
+            self._last_bulk["24hr"] = now
+
+    # ── readers ──
+
+    def get(self, symbol: str, max_age: float = None):
+        """Fresh quote or None (missing or older than max_age)"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            quote = self._quotes.get(symbol)
+            if quote is None or quote.price is None or quote.age() > max_age:
+                return None
+            return quote
+
+    def price(self, symbol: str, max_age: float = None, default=None):
+        quote = self.get(symbol, max_age)
+        return quote.price if quote else default
+
+    def prices(self, symbols: list = None, max_age: float = None) -> dict:
+        """{symbol: price} for every fresh quote (optionally only `symbols`)"""
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            names = self._quotes.keys() if symbols is None else symbols
+            result = {}
+            for symbol in names:
+                quote = self._quotes.get(symbol)
+                if quote and quote.price is not None and now - quote.updated <= max_age:
+                    result[symbol] = quote.price
+            return result
+
+    def spread(self, symbol: str, max_age: float = None):
+        """Relative bid/ask spread, or None without a fresh book"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            quote = self._quotes.get(symbol)
+            if quote is None or time.time() - quote.book_updated > max_age:
+                return None
+            return quote.spread
+
+    def is_stale(self, symbol: str, max_age: float = None) -> bool:
+        return self.get(symbol, max_age) is None
+
+    def stale_symbols(self, symbols: list, max_age: float = None) -> list:
+        fresh = self.prices(symbols, max_age)
+        return [s for s in symbols if s not in fresh]
+
+    def stale_books(self, symbols: list, max_age: float = None) -> list:
+        """Symbols without a bid/ask newer than max_age"""
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            return [s for s in symbols
+                    if s not in self._quotes or now - self._quotes[s].book_updated > max_age]
+
+    def age(self, symbol: str):
+        with self._lock:
+            quote = self._quotes.get(symbol)
+            return quote.age() if quote and quote.updated else None
+
+    def snapshot(self, symbols: list = None) -> dict:
+        with self._lock:
+            names = self._quotes.keys() if symbols is None else symbols
+            return {s: self._quotes[s].to_dict() for s in names if s in self._quotes}
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "symbols": len(self._quotes),
+                "last_bulk_age": {k: round(now - t, 2) for k, t in self._last_bulk.items()},
+            }
+
+
+_price_cache_instance = None
+_price_cache_lock = threading.Lock()
+
+def get_price_cache() -> PriceCache:
+    global _price_cache_instance
+    with _price_cache_lock:
+        if _price_cache_instance is None:
+            _price_cache_instance = PriceCache()
+        return _price_cache_instance
@@ -0,0 +1,326 @@
+"""
+Proxy Resolver — discover, rank and cache the local HTTP/SOCKS proxy once
+For OCEAN HUNTER V10.8.2
+Probes all candidates concurrently (tunnel + TLS handshake), keeps the fastest,
+and re-probes in the background only when a client reports a failure.
+"""
+
+import os
+import time
+import socket
+import threading
+import importlib.util
+import logging
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from .tls import get_ssl_context
+from .dns_bypass import create_connection
+
+load_dotenv()
+logger = logging.getLogger("PROXY")
+
+# Common local proxies (V2Ray, NekoBox/Hiddify, Clash)
+DEFAULT_CANDIDATES = [
+    "http://127.0.0.1:10809",
+    "socks5://127.0.0.1:10808",
+    "http://127.0.0.1:2081",
+    "socks5://127.0.0.1:2080",
+    "http://127.0.0.1:7890",
+    "socks5://127.0.0.1:7891",
+    "socks5://127.0.0.1:1080",
+]
+
+PROBE_HOST = "api.telegram.org"
+REPROBE_INTERVAL = 30.0     # seconds between background re-probes while running direct
+
+
+class ProxyError(ConnectionError):
+    """Proxy refused or failed to open the tunnel"""
+
+
+class TunnelRefused(ProxyError):
+    """The proxy works but would not reach the target (CONNECT / SOCKS5 reply)"""
+
+
+class Proxy:
+    """One candidate with its last measured health"""
+
+    __slots__ = ("scheme", "host", "port", "latency", "healthy", "checked_at", "failures")
+
+    def __init__(self, scheme: str, host: str, port: int):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.latency = None
+        self.healthy = False
+        self.checked_at = 0.0
+        self.failures = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "Proxy":
+        parsed = urlparse(url if "://" in url else f"http://{url}")
+        scheme = "socks5" if parsed.scheme.startswith("socks") else "http"
+        return cls(scheme, parsed.hostname or "127.0.0.1", parsed.port or (1080 if scheme == "socks5" else 8080))
+
+    @property
+    def url(self) -> str:
+        # socks5h: let the proxy resolve names (blocked DNS stays off the request path)
+        scheme = "socks5h" if self.scheme == "socks5" else "http"
+        return f"{scheme}://{self.host}:{self.port}"
+
+    def key(self) -> tuple:
+        return (self.scheme, self.host, self.port)
+
+    def __repr__(self):
+        state = f"{self.latency * 1000:.0f}ms" if self.healthy and self.latency else "down"
+        return f"<Proxy {self.url} {state}>"
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ProxyError("proxy closed the connection")
+        data += chunk
+    return data
+
+
+def socks5_tunnel(sock: socket.socket, host: str, port: int):
+    """SOCKS5 CONNECT (no auth, remote name resolution) on a connected socket"""
+    sock.sendall(b"\x05\x01\x00")
+    if _recv_exact(sock, 2) != b"\x05\x00":
+        raise ProxyError("SOCKS5 handshake rejected")
+
+    sock.sendall(b"\x05\x01\x00\x03" + bytes([len(host)]) + host.encode() + port.to_bytes(2, "big"))
+
+    # Reply: VER REP RSV ATYP BND.ADDR BND.PORT — consume all of it so
+    # no stray bytes reach the TLS layer
+    resp = _recv_exact(sock, 4)
+    if resp[1] != 0:
+        raise TunnelRefused(f"SOCKS5 connect failed: code {resp[1]}")
+    atyp = resp[3]
+    if atyp == 1:
+        _recv_exact(sock, 4 + 2)
+    elif atyp == 4:
+        _recv_exact(sock, 16 + 2)
+    else:
+        _recv_exact(sock, _recv_exact(sock, 1)[0] + 2)
+
+
+def http_tunnel(sock: socket.socket, host: str, port: int):
+    """HTTP CONNECT on a connected socket; reads exactly up to the end of the reply head"""
+    sock.sendall(f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode("ascii"))
+    head = b""
+    while not head.endswith(b"\r\n\r\n"):
+        chunk = sock.recv(1)
+        if not chunk:
+            raise ProxyError("proxy closed the connection during CONNECT")
+        head += chunk
+        if len(head) > 8192:
+            raise ProxyError("CONNECT reply too large")
+    status = head.split(b" ", 2)[1:2]
+    if status != [b"200"]:
+        raise TunnelRefused(f"CONNECT failed: {head.splitlines()[0].decode('iso-8859-1')}")
+
+
+def open_tunnel(proxy: Proxy, host: str, port: int, timeout: float = 15.0) -> socket.socket:
+    """Plain TCP socket to host:port through proxy (or direct when proxy is None)"""
+    if proxy is None:
+        return create_connection((host, port), timeout=timeout)
+    sock = socket.create_connection((proxy.host, proxy.port), timeout=timeout)
+    try:
+        if proxy.scheme == "socks5":
+            socks5_tunnel(sock, host, port)
+        else:
+            http_tunnel(sock, host, port)
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+class ProxyResolver:
+    """
+    Process-wide proxy choice. get() is a dict lookup after the first probe;
+    clients call report_failure() when a tunnel breaks, which switches to the
+    next-best proxy and re-ranks everything in a background thread.
+    """
+
+    def __init__(self, candidates: list = None, probe_host: str = PROBE_HOST,
+                 probe_timeout: float = 3.0, use_proxy: bool = None):
+        if use_proxy is None:
+            use_proxy = os.getenv("USE_PROXY", "true").lower() == "true"
+        self.use_proxy = use_proxy
+        self.probe_host = probe_host
+        self.probe_timeout = probe_timeout
+        self._candidates = [Proxy.from_url(u) for u in (candidates or self._configured_candidates())]
+        self._lock = threading.Lock()
+        self._current = None
+        self._probed = False
+        self._probed_at = 0.0
+        self._probe_thread = None
+        self._stats = {"probes": 0, "failovers": 0, "failures_reported": 0}
+
+    @staticmethod
+    def _configured_candidates() -> list:
+        """.env settings first, then the usual local ports (deduplicated)"""
+        urls = []
+        for var in ("HTTPS_PROXY", "https_proxy", "ALL_PROXY"):
+            if os.getenv(var):
+                urls.append(os.getenv(var))
+        if os.getenv("PROXY_PORT"):
+            scheme = "socks5" if os.getenv("PROXY_TYPE", "socks5").lower().startswith("socks") else "http"
+            urls.append(f"{scheme}://{os.getenv('PROXY_HOST', '127.0.0.1')}:{os.getenv('PROXY_PORT')}")
+        urls.extend(DEFAULT_CANDIDATES)
+
+        seen, unique = set(), []
+        for url in urls:
+            key = Proxy.from_url(url).key()
+            if key not in seen:
+                seen.add(key)
+                unique.append(url)
+        return unique
+
+    # ── probing ──
+
+    def _probe_one(self, proxy: Proxy):
+        """Tunnel + TLS handshake to the probe host; records latency"""
+        started = time.perf_counter()
+        try:
+            raw = open_tunnel(proxy, self.probe_host, 443, timeout=self.probe_timeout)
+            with get_ssl_context().wrap_socket(raw, server_hostname=self.probe_host):
+                pass
+            proxy.latency = time.perf_counter() - started
+            proxy.healthy = True
+        except (OSError, ValueError):
+            proxy.healthy = False
+            proxy.latency = None
+        proxy.checked_at = time.time()
+
+    def probe(self) -> list:
+        """Probe every candidate concurrently and pick the fastest healthy one"""
+        with ThreadPoolExecutor(max_workers=len(self._candidates) or 1) as executor:
+            list(executor.map(self._probe_one, self._candidates))
+        ranked = self.ranked()
+        with self._lock:
+            self._current = ranked[0] if ranked else None
+            self._probed = True
+            self._probed_at = time.monotonic()
+            self._stats["probes"] += 1
+        if ranked:
+            logger.info(f"Proxy selected: {ranked[0]!r} ({len(ranked)} healthy)")
+        else:
+            logger.warning("No healthy proxy found — falling back to direct connections")
+        return ranked
+
+    def ranked(self) -> list:
+        """Healthy candidates, fastest first"""
+        return sorted((p for p in self._candidates if p.healthy), key=lambda p: p.latency)
+
+    def _start_probe(self):
+        """Background probe unless one is already running (caller holds the lock)"""
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(target=self.probe, name="proxy-probe", daemon=True)
+            self._probe_thread.start()
+        return self._probe_thread
+
+    def _reprobe_async(self):
+        with self._lock:
+            self._start_probe()
+
+    def _reprobe_if_direct(self):
+        """Running direct with proxies configured: look again (e.g. V2Ray started after the bot)"""
+        with self._lock:
+            if (self._candidates and self._probed and self._current is None
+                    and time.monotonic() - self._probed_at >= REPROBE_INTERVAL):
+                self._start_probe()
+
+    # ── public API ──
+
+    def get(self):
+        """The proxy to use, or None for a direct connection"""
+        if not self.use_proxy:
+            return None
+        if not self._probed:
+            # One probe however many threads ask at once; the rest wait for it
+            with self._lock:
+                thread = None if self._probed else self._start_probe()
+            if thread is not None:
+                thread.join()
+        elif self._current is None:
+            self._reprobe_if_direct()
+        return self._current
+
+    def report_failure(self, proxy):
+        """A client could not get through `proxy` (Proxy or URL): fail over now, re-rank in the background"""
+        if isinstance(proxy, str):
+            key = Proxy.from_url(proxy).key()
+            proxy = next((p for p in self._candidates if p.key() == key), None)
+        if proxy is None:
+            return
+        with self._lock:
+            proxy.failures += 1
+            proxy.healthy = False
+            self._stats["failures_reported"] += 1
+            if self._current is proxy:
+                alternatives = sorted((p for p in self._candidates if p.healthy), key=lambda p: p.latency)
+                self._current = alternatives[0] if alternatives else None
+                self._stats["failovers"] += 1
+                # Nothing known-good left: the next get() waits for the re-probe
+                self._probed = bool(alternatives)
+        logger.warning(f"Proxy {proxy.url} failed — switching to {self._current!r}")
+        self._reprobe_async()
+
+    def connect(self, host: str, port: int = 443, timeout: float = 15.0) -> socket.socket:
+        """
+        Plain TCP socket to host:port through the current proxy. Fails over
+        once when the proxy itself is unreachable; a TunnelRefused (the proxy
+        answered but the target is refused / unreachable) is raised as is.
+        """
+        proxy = self.get()
+        try:
+            return open_tunnel(proxy, host, port, timeout)
+        except TunnelRefused:
+            raise
+        except OSError:
+            if proxy is None:
+                if self.use_proxy and self._candidates:
+                    # Direct is failing too: maybe a proxy came up since the last probe
+                    self._reprobe_async()
+                raise
+            self.report_failure(proxy)
+        return open_tunnel(self.get(), host, port, timeout)
+
+    def requests_proxies(self):
+        """`proxies=` argument for requests (None = direct)"""
+        proxy = self.get()
+        if proxy is not None and proxy.scheme == "socks5" and importlib.util.find_spec("socks") is None:
+            # requests needs PySocks for socks5h://; use the best HTTP proxy instead
+            proxy = next((p for p in self.ranked() if p.scheme == "http"), None)
+        if proxy is None:
+            return None
+        return {"http": proxy.url, "https": proxy.url}
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["current"] = self._current.url if self._current else None
+        stats["candidates"] = [
+            {"url": p.url, "healthy": p.healthy, "failures": p.failures,
+             "latency_ms": round(p.latency * 1000, 1) if p.latency else None}
+            for p in self._candidates
+        ]
+        return stats
+
+
+_resolver_instance = None
+_resolver_lock = threading.Lock()
+
+def get_proxy_resolver() -> ProxyResolver:
+    global _resolver_instance
+    with _resolver_lock:
+        if _resolver_instance is None:
+            _resolver_instance = ProxyResolver()
+        return _resolver_instance
@@ -1,24 +1,323 @@
+"""
+Request Rate Limiter — Token Bucket with Priority Lanes
+For OCEAN HUNTER V10.8.2 (ARCHITECTURE 11.3)
+Priority: Orders > Balance > Market Data. Thread-safe, sync + async acquire.
+"""
+
+import asyncio
+import threading
 import time
 import logging
-from collections import deque
+from email.utils import parsedate_to_datetime
 
 logger = logging.getLogger("RateLimiter")
 
+LANE_ORDERS = "orders"
+LANE_BALANCE = "balance"
+LANE_MARKET_DATA = "market_data"
+
+# Lower value = served first
+LANE_PRIORITY = {LANE_ORDERS: 0, LANE_BALANCE: 1, LANE_MARKET_DATA: 2}
+
+# Nobitex private API allows 30/min; architecture runs at 25/min with 2.5s spacing.
+# `reserve` = global tokens a lane must leave untouched for higher-priority lanes.
+NOBITEX_LIMITS = {
+    "per_minute": 25,
+    "burst": 5,
+    "min_spacing": 2.5,
+    "lanes": {
+        LANE_ORDERS: {"per_minute": 25, "burst": 5, "reserve": 0},
+        LANE_BALANCE: {"per_minute": 12, "burst": 3, "reserve": 1},
+        LANE_MARKET_DATA: {"per_minute": 20, "burst": 4, "reserve": 2},
+    },
+}
+
+# MEXC spot allows far more; keep a polite budget that still permits fan-out.
+MEXC_LIMITS = {
+    "per_minute": 600,
+    "burst": 20,
+    "min_spacing": 0.0,
+    "lanes": {
+        LANE_ORDERS: {"per_minute": 300, "burst": 10, "reserve": 0},
+        LANE_BALANCE: {"per_minute": 120, "burst": 5, "reserve": 2},
+        LANE_MARKET_DATA: {"per_minute": 480, "burst": 16, "reserve": 4},
+    },
+}
+
+
+class RateLimitRejected(Exception):
+    """Request could not get a slot in time (queue overflow → REJECT and ALERT)"""
+
+
+class TokenBucket:
+    """Classic token bucket; callers provide locking"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, per_minute: float, burst: float):
+        self.capacity = float(max(burst, 1))
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def time_until(self, tokens: float) -> float:
+        """Seconds until `tokens` are available (0 if already there)"""
+        missing = tokens - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return missing / self.rate
+
+
+class PriorityRateLimiter:
+    """
+    One global token bucket plus one bucket per lane.
+    A lane only takes a token when no higher-priority lane is waiting and
+    enough global tokens stay in reserve, so orders never queue behind polling.
+    """
+
+    def __init__(self, per_minute: float = 25, burst: float = 5, min_spacing: float = 2.5,
+                 lanes: dict = None, max_wait: float = 30.0, max_queue: int = 20, name: str = "default"):
+        self.name = name
+        self.min_spacing = min_spacing
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._global = TokenBucket(per_minute, burst)
+        lanes = lanes or NOBITEX_LIMITS["lanes"]
+        self._lanes = {
+            lane: TokenBucket(cfg.get("per_minute", per_minute), cfg.get("burst", burst))
+            for lane, cfg in lanes.items()
+        }
+        self._reserve = {lane: cfg.get("reserve", 0) for lane, cfg in lanes.items()}
+        self._cond = threading.Condition(threading.Lock())
+        self._last_grant = 0.0
+        self._blocked_until = 0.0
+        self._waiting = {lane: 0 for lane in self._lanes}
+        self._metrics = {
+            lane: {"granted": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for lane in self._lanes
+        }
+        self._penalties = 0
+
+    @classmethod
+    def from_preset(cls, preset: dict, **overrides) -> "PriorityRateLimiter":
+        kwargs = dict(preset)
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    # ── core ──
+
+    def _try_acquire(self, lane: str, now: float) -> float:
+        """Take a token if allowed. Returns 0 when granted, else seconds to wait. Lock held."""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        priority = LANE_PRIORITY.get(lane, len(LANE_PRIORITY))
+        for other, count in self._waiting.items():
+            if count and LANE_PRIORITY.get(other, len(LANE_PRIORITY)) < priority:
+                # A higher lane that is only waiting on shared capacity goes first
+                other_bucket = self._lanes[other]
+                other_bucket.refill(now)
+                if other_bucket.tokens >= 1:
+                    return max(self.min_spacing / 4, 0.01)
+
+        if self.min_spacing and now - self._last_grant < self.min_spacing:
+            return self.min_spacing - (now - self._last_grant)
+
+        self._global.refill(now)
+        bucket = self._lanes[lane]
+        bucket.refill(now)
+
+        wait = max(self._global.time_until(1 + self._reserve[lane]), bucket.time_until(1))
+        if wait > 0:
+            return wait
+
+        self._global.tokens -= 1
+        bucket.tokens -= 1
+        self._last_grant = now
+        return 0.0
+
+    def _enter(self, lane: str):
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown rate-limit lane: {lane}")
+        if self._waiting[lane] >= self.max_queue:
+            self._metrics[lane]["rejected"] += 1
+            logger.warning(f"[{self.name}] {lane} queue full ({self.max_queue}) — request rejected")
+            raise RateLimitRejected(f"{lane} queue full")
+        self._waiting[lane] += 1
+
+    def _leave(self, lane: str, waited: float, granted: bool):
+        self._waiting[lane] -= 1
+        m = self._metrics[lane]
+        if granted:
+            m["granted"] += 1
+            m["wait_total"] += waited
+            m["wait_max"] = max(m["wait_max"], waited)
+        else:
+            m["rejected"] += 1
+            logger.warning(f"[{self.name}] {lane} request rejected after {waited:.2f}s wait")
+
+    def acquire(self, lane: str = LANE_MARKET_DATA, timeout: float = None) -> float:
+        """Block until a token is granted. Returns seconds spent waiting."""
+        timeout = self.max_wait if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            self._enter(lane)
+            granted = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._try_acquire(lane, now)
+                    if wait == 0:
+                        granted = True
+                        return now - start
+                    if now - start + wait > timeout:
+                        raise RateLimitRejected(f"{lane} wait {wait:.2f}s exceeds {timeout}s")
+                    self._cond.wait(wait)
+            finally:
+                self._leave(lane, time.monotonic() - start, granted)
+                self._cond.notify_all()
+
+    async def acquire_async(self, lane: str = LANE_MARKET_DATA, timeout: float = None) -> float:
+        """asyncio version of acquire(); never blocks the event loop"""
+        timeout = self.max_wait if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            self._enter(lane)
+        granted = False
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    wait = self._try_acquire(lane, now)
+                if wait == 0:
+                    granted = True
+                    return now - start
+                if now - start + wait > timeout:
+                    raise RateLimitRejected(f"{lane} wait {wait:.2f}s exceeds {timeout}s")
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._leave(lane, time.monotonic() - start, granted)
+                self._cond.notify_all()
+
+    # ── feedback from the exchange ──
+
+    def penalize(self, retry_after: float):
+        """Pause every lane (HTTP 429 / 418)"""
+        with self._cond:
+            until = time.monotonic() + max(retry_after, 0)
+            if until > self._blocked_until:
+                self._blocked_until = until
+            self._global.tokens = 0
+            self._penalties += 1
+            self._cond.notify_all()
+        logger.warning(f"[{self.name}] rate limited by exchange — pausing {retry_after:.1f}s")
+
+    def observe(self, status: int, headers: dict):
+        """Adapt to response status and rate-limit headers (lower-case names)"""
+        if not headers:
+            headers = {}
+        if status in (418, 429):
+            self.penalize(_parse_retry_after(headers.get("retry-after")) or 60.0)
+            return
+
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        with self._cond:
+            now = time.monotonic()
+            self._global.refill(now)
+            self._global.tokens = min(self._global.tokens, remaining)
+            if remaining <= 0:
+                reset = _parse_retry_after(headers.get("x-ratelimit-reset")) or 1.0
+                self._blocked_until = max(self._blocked_until, now + reset)
+            self._cond.notify_all()
+
+    # ── reporting ──
+
+    def metrics(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self._global.refill(now)
+            lanes = {}
+            for lane, m in self._metrics.items():
+                granted = m["granted"]
+                lanes[lane] = {
+                    "granted": granted,
+                    "rejected": m["rejected"],
+                    "waiting": self._waiting[lane],
+                    "wait_avg": round(m["wait_total"] / granted, 4) if granted else 0.0,
+                    "wait_max": round(m["wait_max"], 4),
+                }
+            return {
+                "name": self.name,
+                "tokens": round(self._global.tokens, 2),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 2),
+                "penalties": self._penalties,
+                "lanes": lanes,
+            }
+
+
+def _parse_retry_after(value) -> float:
+    """Retry-After is either delta-seconds or an HTTP date"""
+    if value is None:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def lane_for(method: str, path: str) -> str:
+    """Classify an exchange endpoint into a lane"""
+    path = path.lower()
+    if "order" in path and method != "GET":
+        return LANE_ORDERS
+    if "account" in path or "wallet" in path or "openorders" in path:
+        return LANE_BALANCE
+    return LANE_MARKET_DATA
+
+
 class RateLimiter:
+    """Legacy single-lane limiter (25 calls / 60s), now backed by the token bucket"""
+
     def __init__(self, max_calls=25, period=60):
         self.max_calls = max_calls
         self.period = period
-        self.timestamps = deque()
+        per_minute = max_calls * 60.0 / period
+        self._limiter = PriorityRateLimiter(
+            per_minute=per_minute, burst=max_calls, min_spacing=0.0,
+            lanes={LANE_MARKET_DATA: {"per_minute": per_minute, "burst": max_calls}},
+            max_wait=float("inf"), max_queue=1 << 30, name="legacy",
+        )
 
     def wait_if_needed(self):
-        now = time.time()
-        while self.timestamps and self.timestamps[0] <= now - self.period:
-            self.timestamps.popleft()
-
-        if len(self.timestamps) >= self.max_calls:
-            sleep_time = self.timestamps[0] + self.period - now + 0.1
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            self.wait_if_needed()
-        
-        self.timestamps.append(time.time())
\ No newline at end of file
+        self._limiter.acquire(LANE_MARKET_DATA)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(exchange: str = "mexc") -> PriorityRateLimiter:
+    """Process-wide limiter per exchange, shared by sync and async clients"""
+    exchange = exchange.lower()
+    with _limiters_lock:
+        if exchange not in _limiters:
+            preset = MEXC_LIMITS if exchange == "mexc" else NOBITEX_LIMITS
+            _limiters[exchange] = PriorityRateLimiter.from_preset(preset, name=exchange)
+        return _limiters[exchange]
@@ -0,0 +1,233 @@
+"""
+Response Cache — TTL + LRU + single-flight for public market endpoints
+For OCEAN HUNTER V10.8.2
+main.py, run_bot.py, the dashboard, BTC health and the watchdog ping all
+read the same public data within seconds of each other. Replies are kept
+for a per-endpoint TTL, and concurrent callers asking for the same key
+share one in-flight request instead of each spending rate-limit budget.
+Only successful replies are cached. Cached objects are shared: treat them
+as read-only.
+"""
+
+import asyncio
+import time
+import threading
+from collections import OrderedDict
+
+# Seconds a reply stays fresh, per endpoint path
+DEFAULT_TTLS = {
+    "/ping": 5.0,
+    "/time": 1.0,
+    "/ticker/price": 1.0,
+    "/ticker/bookTicker": 1.0,
+    "/ticker/24hr": 10.0,
+    "/depth": 1.0,
+    "/klines": 5.0,
+    "/exchangeInfo": 3600.0,
+    "udf/history": 30.0,      # Nobitex (25 req/min budget)
+}
+MAX_ENTRIES = 512
+
+
+def _cacheable(data) -> bool:
+    """Errors (transport, MEXC {code, msg}, Nobitex s=error) are never cached"""
+    if data is None:
+        return False
+    if isinstance(data, dict):
+        return not ({"error", "code", "raw"} & data.keys()) and data.get("s") != "error"
+    return True
+
+
+class _Flight:
+    """One in-flight fetch that other threads wait on"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Counters:
+    __slots__ = ("hits", "misses", "coalesced", "evictions")
+
+    def __init__(self):
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def to_dict(self) -> dict:
+        served = self.hits + self.coalesced
+        total = served + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round(served / total, 3) if total else 0.0,
+        }
+
+
+class ResponseCache:
+    """
+    Thread-safe {key: (expires, reply)} with LRU eviction. fetch() serves
+    threads, fetch_async() serves coroutines; both share the stored replies.
+    Keys are hashable tuples, e.g. (host, path, sorted params).
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = MAX_ENTRIES):
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(host: str, path: str, params: dict = None) -> tuple:
+        return (host, path, tuple(sorted((params or {}).items())))
+
+    def cacheable(self, path: str) -> bool:
+        return self.ttls.get(path, 0) > 0
+
+    def set_ttl(self, path: str, ttl: float):
+        with self._lock:
+            self.ttls[path] = ttl
+
+    # ── internals (caller holds the lock) ──
+
+    def _counter(self, path: str) -> _Counters:
+        counter = self._counters.get(path)
+        if counter is None:
+            counter = self._counters[path] = _Counters()
+        return counter
+
+    def _lookup(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: tuple, path: str, data):
+        if not _cacheable(data):
+            return
+        self._entries[key] = (time.monotonic() + self.ttls.get(path, 0), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._counter(old_key[1]).evictions += 1
+
+    # ── public ──
+
+    def fetch(self, key: tuple, fetcher):
+        """Fresh cached reply, the reply of a fetch already in flight, or fetcher()"""
+        path = key[1]
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._counter(path).hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._counter(path).misses += 1
+            else:
+                self._counter(path).coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetcher()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, path, flight.result)
+                self._inflight.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+    async def fetch_async(self, key: tuple, fetcher):
+        """fetch() for coroutines: fetcher is a zero-argument coroutine function"""
+        path = key[1]
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._counter(path).hits += 1
+                return entry[1]
+            future = self._async_inflight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._async_inflight[flight_key] = loop.create_future()
+                self._counter(path).misses += 1
+            else:
+                self._counter(path).coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fetcher()
+        except BaseException as e:
+            with self._lock:
+                self._async_inflight.pop(flight_key, None)
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        with self._lock:
+            self._store(key, path, result)
+            self._async_inflight.pop(flight_key, None)
+        future.set_result(result)
+        return result
+
+    def invalidate(self, path: str = None):
+        """Drop every entry (or only those of one endpoint)"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == path]:
+                del self._entries[key]
+
+    def metrics(self) -> dict:
+        """Per-endpoint hits / misses / coalesced; misses are the requests actually sent"""
+        totals = _Counters()
+        with self._lock:
+            endpoints = {path: c.to_dict() for path, c in self._counters.items()}
+            entries = len(self._entries)
+            for c in self._counters.values():
+                totals.hits += c.hits
+                totals.misses += c.misses
+                totals.coalesced += c.coalesced
+                totals.evictions += c.evictions
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "endpoints": endpoints,
+            "total": totals.to_dict(),
+            "requests_saved": totals.hits + totals.coalesced,
+        }
+
+
+_response_cache_instance = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache_instance
+    with _response_cache_lock:
+        if _response_cache_instance is None:
+            _response_cache_instance = ResponseCache()
+        return _response_cache_instance
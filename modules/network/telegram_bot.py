@@ -1,109 +1,92 @@
 """
-Telegram Bot — SOCKS5 Proxy Support
+Telegram Bot — Proxy Support (HTTP CONNECT / SOCKS5)
 For OCEAN HUNTER V10.8.2
+Keeps a TLS tunnel open through the proxy; JSON POST; pipelined bursts
 """
 
 import socket
-import ssl
 import json
 import os
 import logging
-from urllib.parse import quote
 from dotenv import load_dotenv
+from .http_parser import parse_json_body
+from .http_pool import ConnectionPool
+from .proxy_resolver import get_proxy_resolver
 
 load_dotenv()
 logger = logging.getLogger("TELEGRAM")
 
+# Bot API calls that change nothing server-side; only these are re-sent after a
+# dead pooled connection (a sendMessage may already have gone out)
+IDEMPOTENT_METHODS = {"getMe", "getChat", "getUpdates", "getWebhookInfo"}
+
 
 class TelegramBot:
-    """Telegram Bot via SOCKS5 proxy (Raw Socket)"""
+    """Telegram Bot via the shared proxy resolver (Raw Socket, persistent tunnel)"""
 
     def __init__(self):
         self.token = os.getenv("TELEGRAM_BOT_TOKEN", "")
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID", "")
-        self.proxy_host = os.getenv("PROXY_HOST", "127.0.0.1")
-        self.proxy_port = int(os.getenv("PROXY_PORT", "1080"))
-        self.use_proxy = os.getenv("USE_PROXY", "true").lower() == "true"
+        self.proxy = get_proxy_resolver()
         self.api_host = "api.telegram.org"
-
-    def _socks5_connect(self, target_host: str, target_port: int) -> socket.socket:
-        """Connect via SOCKS5 proxy"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(15)
-        sock.connect((self.proxy_host, self.proxy_port))
-
-        sock.sendall(b"\x05\x01\x00")
-        resp = sock.recv(2)
-        if resp != b"\x05\x00":
-            raise Exception(f"SOCKS5 handshake failed: {resp.hex()}")
-
-        req = b"\x05\x01\x00\x03"
-        req += bytes([len(target_host)]) + target_host.encode()
-        req += target_port.to_bytes(2, "big")
-        sock.sendall(req)
-
-        resp = sock.recv(10)
-        if resp[1] != 0:
-            raise Exception(f"SOCKS5 connect failed: code {resp[1]}")
-
-        return sock
-
-    def _direct_connect(self, target_host: str, target_port: int) -> socket.socket:
-        """Direct connection without proxy"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(15)
-        sock.connect((target_host, target_port))
-        return sock
+        # TLS connections through the tunnel stay open between messages
+        self.pool = ConnectionPool(self.api_host, 443, max_idle=2, idle_timeout=55.0,
+                                   timeout=15, connect=self._tunnel_connect)
+
+    def _tunnel_connect(self, target_host: str, target_port: int) -> socket.socket:
+        """TCP socket through the shared, already-probed proxy (or direct)"""
+        return self.proxy.connect(target_host, target_port, timeout=15)
+
+    def _build_request(self, method: str, params: dict = None) -> bytes:
+        """JSON POST — no URL-encoding of the text and no URL length limit"""
+        body = json.dumps(params or {}, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"POST /bot{self.token}/{method} HTTP/1.1\r\n"
+            f"Host: {self.api_host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        return head.encode("ascii") + body
+
+    @staticmethod
+    def _decode(response) -> dict:
+        data = parse_json_body(response)
+        if data is not None:
+            return data
+        return {"ok": False, "raw": response.text()[:200]}
 
     def _request(self, method: str, params: dict = None) -> dict:
         """Send request to Telegram API"""
-        params = params or {}
-        path = f"/bot{self.token}/{method}"
-
-        if params:
-            query = "&".join(f"{k}={quote(str(v))}" for k, v in params.items())
-            path = f"{path}?{query}"
-
-        request = f"GET {path} HTTP/1.1\r\n"
-        request += f"Host: {self.api_host}\r\n"
-        request += "Connection: close\r\n\r\n"
-
         try:
-            if self.use_proxy:
-                sock = self._socks5_connect(self.api_host, 443)
-            else:
-                sock = self._direct_connect(self.api_host, 443)
-
-            context = ssl.create_default_context()
-            with context.wrap_socket(sock, server_hostname=self.api_host) as ssock:
-                ssock.sendall(request.encode())
-                response = b""
-                while True:
-                    chunk = ssock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-
-            text = response.decode("utf-8", errors="ignore")
-            if "\r\n\r\n" in text:
-                _, body = text.split("\r\n\r\n", 1)
-            else:
-                body = text
-
-            for line in body.split("\r\n"):
-                line = line.strip()
-                if line.startswith("{"):
-                    return json.loads(line)
-
-            if body.strip().startswith("{"):
-                return json.loads(body.strip())
-
-            return {"ok": False, "raw": body[:200]}
+            response = self.pool.request(self._build_request(method, params), "POST",
+                                         retry=method in IDEMPOTENT_METHODS)
+            return self._decode(response)
 
         except Exception as e:
             logger.error(f"Telegram request failed: {e}")
             return {"ok": False, "error": str(e)}
 
+    def _pipeline(self, method: str, params_list: list) -> list:
+        """Several calls on one connection without waiting for each reply"""
+        try:
+            payloads = [self._build_request(method, params) for params in params_list]
+            responses = self.pool.pipeline(payloads, "POST", retry=method in IDEMPOTENT_METHODS)
+            results = [self._decode(r) for r in responses]
+            # Cut off mid-batch: the rest may or may not have been delivered
+            lost = {"ok": False, "error": "connection lost before the reply"}
+            return results + [dict(lost) for _ in payloads[len(results):]]
+
+        except Exception as e:
+            logger.error(f"Telegram pipeline failed: {e}")
+            return [{"ok": False, "error": str(e)} for _ in params_list]
+
+    def close(self):
+        self.pool.close()
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
     def send_message(self, text: str, chat_id: str = None) -> dict:
         """Send a text message"""
         return self._request("sendMessage", {
@@ -112,6 +95,16 @@ class TelegramBot:
             "parse_mode": "HTML"
         })
 
+    def send_messages(self, texts: list, chat_id: str = None, parse_mode: str = "HTML") -> list:
+        """Send a burst of messages pipelined over one tunnel connection"""
+        params_list = []
+        for text in texts:
+            params = {"chat_id": chat_id or self.chat_id, "text": text}
+            if parse_mode:
+                params["parse_mode"] = parse_mode
+            params_list.append(params)
+        return self._pipeline("sendMessage", params_list)
+
     def send_alert(self, level: str, message: str) -> dict:
         """Send formatted alert"""
         emojis = {"INFO": "ℹ️", "WARNING": "⚠️", "CRITICAL": "🚨", "SUCCESS": "✅"}
@@ -0,0 +1,345 @@
+"""
+Telegram Outbox — non-blocking alert delivery
+For OCEAN HUNTER V10.8.2
+Callers enqueue and return immediately; a background worker delivers with
+priorities (CRITICAL first), digests bursts of low-priority messages,
+respects Telegram flood limits and spills to disk while offline.
+"""
+
+import os
+import json
+import time
+import heapq
+import atexit
+import itertools
+import threading
+import logging
+from .rate_limiter import TokenBucket
+
+logger = logging.getLogger("TG_OUTBOX")
+
+LEVEL_PRIORITY = {"CRITICAL": 0, "WARNING": 1, "SUCCESS": 2, "INFO": 3}
+LEVEL_EMOJI = {"INFO": "ℹ️", "WARNING": "⚠️", "CRITICAL": "🚨", "SUCCESS": "✅"}
+
+# Levels that may be merged into a digest
+DIGEST_LEVELS = {"INFO", "SUCCESS"}
+TELEGRAM_MAX_TEXT = 4096
+
+_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SPILL_PATH = os.path.join(_root, "data", "telegram_outbox.jsonl")
+
+
+class OutboxMessage:
+    __slots__ = ("priority", "seq", "created", "level", "text", "chat_id", "parse_mode")
+
+    def __init__(self, priority, seq, created, level, text, chat_id, parse_mode):
+        self.priority = priority
+        self.seq = seq
+        self.created = created
+        self.level = level
+        self.text = text
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def to_dict(self) -> dict:
+        return {"level": self.level, "text": self.text, "chat_id": self.chat_id,
+                "parse_mode": self.parse_mode, "created": self.created}
+
+
+class TelegramOutbox:
+    """Bounded priority queue + background sender for a TelegramBot-like object"""
+
+    def __init__(self, bot=None, max_size: int = 500, digest_window: float = 3.0,
+                 batch_size: int = 5, spill_path: str = DEFAULT_SPILL_PATH,
+                 retry_interval: float = 30.0):
+        self._bot = bot
+        self.max_size = max_size
+        self.digest_window = digest_window
+        self.batch_size = batch_size
+        self.spill_path = spill_path
+        self.retry_interval = retry_interval
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._chat_buckets = {}
+        self._paused_until = 0.0
+        self._offline = False
+        self._inflight = 0
+        self._thread = None
+        self._stopping = False
+        self._atexit_registered = False
+        self._stats = {"queued": 0, "sent": 0, "digested": 0, "dropped": 0,
+                       "spilled": 0, "replayed": 0, "failed": 0, "flood_waits": 0}
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            from .telegram_bot import get_bot
+            self._bot = get_bot()
+        return self._bot
+
+    # ── producer side (hot loop) ──
+
+    def send(self, text: str, level: str = "INFO", chat_id: str = None, parse_mode: str = "HTML") -> bool:
+        """Queue a message and return immediately. False if it had to be dropped."""
+        level = level.upper()
+        msg = OutboxMessage(LEVEL_PRIORITY.get(level, 3), next(self._seq), time.time(),
+                            level, text, chat_id, parse_mode)
+        self._ensure_worker()
+        evicted = None
+        with self._cond:
+            if len(self._heap) >= self.max_size:
+                # Evict the least important, newest message; never a CRITICAL one for an INFO
+                worst = max(self._heap)
+                self._stats["dropped"] += 1
+                if worst.priority < msg.priority or (worst.priority == msg.priority and msg.priority == 0):
+                    evicted = msg
+                else:
+                    self._heap.remove(worst)
+                    heapq.heapify(self._heap)
+                    evicted = worst
+            if evicted is not msg:
+                heapq.heappush(self._heap, msg)
+                self._stats["queued"] += 1
+                self._cond.notify()
+        # File I/O outside the lock, so producers and the worker never wait on the disk
+        if evicted is not None:
+            self._spill([evicted])
+        return evicted is not msg
+
+    def send_alert(self, level: str, message: str) -> bool:
+        """Same format as TelegramBot.send_alert, but queued"""
+        level = level.upper()
+        emoji = LEVEL_EMOJI.get(level, "📌")
+        return self.send(f"{emoji} <b>{level}</b>\n{message}", level=level)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until the queue is drained (or timeout). True if empty."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._heap or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._offline:
+                    return False
+                self._cond.wait(min(remaining, 0.2))
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """Flush, stop the worker and spill whatever is left"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            leftovers, self._heap = self._heap, []
+            self._cond.notify_all()
+        if leftovers:
+            self._spill(sorted(leftovers))
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._heap)
+            stats["offline"] = self._offline
+        return stats
+
+    # ── worker ──
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="telegram-outbox", daemon=True)
+            self._thread.start()
+            register, self._atexit_registered = not self._atexit_registered, True
+        if register:
+            atexit.register(self.stop, 10.0)
+
+    def _run(self):
+        self._replay_spill()
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                batch, wait = self._take_batch()
+                if not batch:
+                    self._cond.wait(wait)
+                    continue
+                self._inflight = len(batch)
+
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()
+
+    def _bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Telegram: ~1 msg/s per chat, 20 msg/min in groups (negative ids)
+            is_group = str(chat_id or "").startswith("-")
+            bucket = TokenBucket(per_minute=20 if is_group else 60, burst=3)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _take_batch(self) -> tuple:
+        """Pop the next deliverable messages (lock held). Returns (batch, wait)."""
+        head = self._heap[0]
+        now = time.monotonic()
+
+        # Let a low-priority burst accumulate so it can go out as one digest
+        if head.level in DIGEST_LEVELS and not self._stopping:
+            age = time.time() - head.created
+            if age < self.digest_window:
+                return [], self.digest_window - age
+
+        bucket = self._bucket(head.chat_id)
+        bucket.refill(now)
+        if bucket.tokens < 1:
+            self._stats["flood_waits"] += 1
+            return [], bucket.time_until(1)
+
+        same_chat = sorted(m for m in self._heap
+                           if m.chat_id == head.chat_id and m.parse_mode == head.parse_mode)
+        if head.level in DIGEST_LEVELS:
+            # Every pending low-priority message for this chat becomes one digest
+            chosen = [m for m in same_chat if m.level in DIGEST_LEVELS][:50]
+        else:
+            limit = max(1, min(self.batch_size, int(bucket.tokens)))
+            chosen = [m for m in same_chat if m.level not in DIGEST_LEVELS][:limit]
+
+        for msg in chosen:
+            self._heap.remove(msg)
+        heapq.heapify(self._heap)
+
+        if len(chosen) > 1 and head.level in DIGEST_LEVELS:
+            merged = self._merge(chosen)
+            self._stats["digested"] += len(chosen) - len(merged)
+            chosen = merged
+        for _ in chosen:
+            bucket.tokens -= 1
+        return chosen, 0.0
+
+    @staticmethod
+    def _merge(messages: list) -> list:
+        """Join low-priority messages into as few digests as fit Telegram's limit"""
+        header = f"📦 Digest ({len(messages)} updates)\n"
+        separator = "\n" + "─" * 12 + "\n"
+        digests = []
+        current = header
+        for msg in messages:
+            piece = msg.text if current == header else separator + msg.text
+            if len(current) + len(piece) > TELEGRAM_MAX_TEXT and current != header:
+                digests.append(current)
+                current = header + msg.text
+            else:
+                current += piece
+        digests.append(current)
+        first = messages[0]
+        return [OutboxMessage(first.priority, first.seq, first.created, first.level,
+                              text[:TELEGRAM_MAX_TEXT], first.chat_id, first.parse_mode)
+                for text in digests]
+
+    def _deliver(self, batch: list):
+        first = batch[0]
+        # One message or several, they go out pipelined on the bot's kept-alive tunnel
+        results = self.bot.send_messages([m.text for m in batch], first.chat_id, first.parse_mode)
+
+        requeue = []
+        spill = []
+        for msg, result in zip(batch, results):
+            if result.get("ok"):
+                self._stats["sent"] += 1
+                continue
+            retry_after = (result.get("parameters") or {}).get("retry_after")
+            if result.get("error_code") == 429 or retry_after:
+                with self._cond:
+                    self._paused_until = time.monotonic() + float(retry_after or 5)
+                    self._stats["flood_waits"] += 1
+                requeue.append(msg)
+            elif "error" in result:
+                # Transport failure (proxy down / offline)
+                spill.append(msg)
+            else:
+                # Telegram rejected the message itself (bad markup, chat not found...)
+                self._stats["failed"] += 1
+                logger.error(f"Telegram rejected message: {result.get('description', result)}")
+
+        was_offline = self._offline
+        if spill:
+            self._spill(spill)
+            with self._cond:
+                self._offline = True
+                self._paused_until = time.monotonic() + self.retry_interval
+            logger.warning(f"Telegram unreachable — spilled {len(spill)} message(s) to disk")
+        elif was_offline:
+            with self._cond:
+                self._offline = False
+            self._replay_spill()
+
+        if requeue:
+            with self._cond:
+                for msg in requeue:
+                    heapq.heappush(self._heap, msg)
+
+    # ── disk spill ──
+
+    def _spill(self, messages: list):
+        if not self.spill_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for msg in messages:
+                    f.write(json.dumps(msg.to_dict(), ensure_ascii=False) + "\n")
+            self._stats["spilled"] += len(messages)
+        except OSError as e:
+            logger.error(f"Outbox spill failed: {e}")
+
+    def _replay_spill(self):
+        """Re-queue messages saved while offline (oldest first)"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        try:
+            tmp = self.spill_path + ".replay"
+            os.replace(self.spill_path, tmp)
+            with open(tmp, "r", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            os.remove(tmp)
+        except (OSError, ValueError) as e:
+            logger.error(f"Outbox replay failed: {e}")
+            return
+        with self._cond:
+            for row in rows:
+                level = row.get("level", "INFO")
+                heapq.heappush(self._heap, OutboxMessage(
+                    LEVEL_PRIORITY.get(level, 3), next(self._seq), row.get("created", time.time()),
+                    level, row["text"], row.get("chat_id"), row.get("parse_mode")))
+            self._stats["replayed"] += len(rows)
+            self._cond.notify()
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_outbox() -> TelegramOutbox:
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = TelegramOutbox()
+        return _outbox
@@ -0,0 +1,124 @@
+"""
+Shared TLS Context — one SSLContext per process with per-host session reuse
+For OCEAN HUNTER V10.8.2
+Loads the CA bundle once and resumes TLS sessions (tickets) instead of
+doing a full handshake on every new connection.
+"""
+
+import ssl
+import time
+import threading
+import logging
+
+logger = logging.getLogger("TLS")
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    SSLContext that remembers the last session per server_hostname and offers
+    it automatically on the next wrap_socket()/wrap_bio(). This covers raw
+    sockets, asyncio streams (wrap_bio) and urllib3/requests alike. With
+    TLS 1.3 the ticket only arrives after the handshake, so clients call
+    remember_session() once a response has been read (pools after each
+    reply, requests via nobitex_api.SharedTLSAdapter.build_response).
+    """
+
+    def __init__(self, *args, **kwargs):
+        # SSLContext.__new__ consumes the protocol argument
+        self._sessions = {}
+        self._cache_lock = threading.Lock()
+        self._counters = {"handshakes": 0, "resumed": 0, "full": 0}
+        self._per_host = {}
+
+    def cached_session(self, host: str):
+        if not host:
+            return None
+        with self._cache_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                return None
+            if session.time + session.timeout <= time.time():
+                del self._sessions[host]
+                return None
+            return session
+
+    def remember_session(self, host: str, ssl_obj):
+        """Store the connection's session; call after a response so TLS 1.3 tickets have arrived"""
+        if not host or ssl_obj is None:
+            return
+        try:
+            session = ssl_obj.session
+        except (AttributeError, ValueError):
+            return
+        if session is None or (ssl_obj.version() == "TLSv1.3" and not session.has_ticket):
+            return
+        with self._cache_lock:
+            self._sessions[host] = session
+
+    def note_handshake(self, host: str, ssl_obj):
+        """Count a completed handshake as resumed or full"""
+        if ssl_obj is None:
+            return
+        reused = bool(getattr(ssl_obj, "session_reused", False))
+        key = "resumed" if reused else "full"
+        with self._cache_lock:
+            self._counters["handshakes"] += 1
+            self._counters[key] += 1
+            host_counters = self._per_host.setdefault(host, {"resumed": 0, "full": 0})
+            host_counters[key] += 1
+        self.remember_session(host, ssl_obj)
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True,
+                    suppress_ragged_eofs=True, server_hostname=None, session=None):
+        if session is None and not server_side:
+            session = self.cached_session(server_hostname)
+        ssock = super().wrap_socket(
+            sock, server_side=server_side, do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs, server_hostname=server_hostname,
+            session=session,
+        )
+        if do_handshake_on_connect and not server_side:
+            self.note_handshake(server_hostname, ssock)
+        return ssock
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        # asyncio calls this; the handshake completes later, see note_handshake()
+        if session is None and not server_side:
+            session = self.cached_session(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side=server_side,
+                                server_hostname=server_hostname, session=session)
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            stats = dict(self._counters)
+            stats["sessions_cached"] = len(self._sessions)
+            stats["per_host"] = {h: dict(c) for h, c in self._per_host.items()}
+        return stats
+
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+def get_ssl_context(verify: bool = True) -> ResumingSSLContext:
+    """
+    Process-wide client context. verify=False is only for clients that
+    connect to pinned IPs whose certificate cannot match (Nobitex DoH bypass).
+    """
+    with _contexts_lock:
+        context = _contexts.get(verify)
+        if context is None:
+            context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            if verify:
+                context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+            else:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            _contexts[verify] = context
+        return context
+
+
+def tls_stats() -> dict:
+    """Handshake vs resumption counters for every shared context"""
+    with _contexts_lock:
+        contexts = dict(_contexts)
+    return {("verified" if verify else "unverified"): ctx.stats() for verify, ctx in contexts.items()}
@@ -3,8 +3,15 @@ import os
 import time
 import requests
 import statistics
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
+from modules.network.telegram_outbox import get_outbox
+from modules.network.proxy_resolver import get_proxy_resolver
+from modules.network.mexc_stream import MEXCStream
+from modules.data.resampler import Resampler
+from modules.data.order_book import get_order_books, MAX_SPREAD_PERCENT
+from modules.analysis.memo import memo_rsi, get_analysis_memo
 
 # Load Environment
 load_dotenv()
@@ -27,8 +34,8 @@ DCA_LAYERS = [
 # API CONFIG
 TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TG_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-PROXY_URL = os.getenv("HTTPS_PROXY", "http://127.0.0.1:10809")
-PROXIES = {"http": PROXY_URL, "https": PROXY_URL}
+# Proxy comes from the shared resolver (HTTPS_PROXY in .env is tried first)
+PROXY = get_proxy_resolver()
 
 # ════════════════ VIRTUAL WALLET (Advanced) ════════════════
 class PaperWallet:
@@ -101,35 +108,90 @@ class PaperWallet:
 wallet = PaperWallet()
 
 # ════════════════ TELEGRAM ════════════════
-def send_telegram(msg):
+def send_telegram(msg, level="INFO"):
     if not TG_TOKEN: return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    payload = {"chat_id": TG_CHAT_ID, "text": msg, "parse_mode": "HTML"}
-    try:
-        requests.post(url, json=payload, proxies=PROXIES, timeout=5)
-    except: pass
+    # Never blocks the trading loop; CRITICAL/WARNING jump the queue
+    get_outbox().send(msg, level=level, parse_mode="HTML")
 
 # ════════════════ MARKET DATA ════════════════
 def get_market_data():
     base_url = "https://api.mexc.com/api/v3/klines"
     params = {"symbol": SYMBOL, "interval": TIMEFRAME, "limit": 50}
     try:
-        resp = requests.get(base_url, params=params, proxies=PROXIES, timeout=5)
+        proxies = PROXY.requests_proxies()
+        resp = requests.get(base_url, params=params, proxies=proxies, timeout=5)
         return resp.json()
+    except requests.exceptions.ProxyError:
+        PROXY.report_failure(proxies["https"])
+        return None
     except: return None
 
+# Live candles: seeded once over REST, then kept current by the WebSocket stream
+CANDLES = {}
+CANDLES_LOCK = threading.Lock()
+WINDOW = 50
+
+def store_candles(rows):
+    with CANDLES_LOCK:
+        for row in rows:
+            CANDLES[int(row[0])] = row
+        for old in sorted(CANDLES)[:-WINDOW]:
+            del CANDLES[old]
+
+def on_stream_kline(candle):
+    store_candles([[candle["open_time"], candle["open"], candle["high"],
+                    candle["low"], candle["close"], candle["volume"]]])
+
+def candle_window():
+    with CANDLES_LOCK:
+        return [CANDLES[t] for t in sorted(CANDLES)]
+
+# Higher timeframes are built locally from the same 1m stream (no extra polling)
+HIGHER_TIMEFRAMES = ("15m", "60m")
+RESAMPLER = Resampler(HIGHER_TIMEFRAMES)
+
+def on_bar_closed(bar):
+    print(f"\n🕯️ {bar['interval']} closed | O {bar['open']} H {bar['high']} L {bar['low']} C {bar['close']}")
+    rsi_memo = get_analysis_memo().metrics()["analyses"].get("run_bot.rsi")
+    if rsi_memo:
+        print(f"   🧠 RSI memo: {rsi_memo['hit_ratio']:.0%} hits | {rsi_memo['saved_ms']} ms saved")
+
+def seed_resampler(rows):
+    # Closed candles only: the open one keeps coming from the stream
+    now_ms = time.time() * 1000
+    rows = [r for r in rows if int(r[6]) < now_ms]
+    RESAMPLER.seed(SYMBOL, {
+        "timestamp": [int(r[0]) for r in rows], "open": [float(r[1]) for r in rows],
+        "high": [float(r[2]) for r in rows], "low": [float(r[3]) for r in rows],
+        "close": [float(r[4]) for r in rows], "volume": [float(r[5]) for r in rows],
+    })
+
+def start_stream():
+    stream = MEXCStream()
+    stream.on("kline", on_stream_kline)
+    stream.on("kline_closed", on_stream_kline)
+    stream.subscribe_kline(SYMBOL, TIMEFRAME)
+    RESAMPLER.on("bar_closed", on_bar_closed)
+    RESAMPLER.attach(stream, [SYMBOL])
+    # Local L2 book from the same connection: spread filter / OBI without a REST call per loop
+    get_order_books().attach(stream, [SYMBOL])
+    stream.start()
+    return stream
+
 # ════════════════ INDICATORS ════════════════
 def calculate_indicators(klines):
     closes = [float(k[4]) for k in klines]
     current_price = closes[-1]
     
-    # RSI
+    # RSI (closed candles memoized per candle close, only the open one recomputed)
     period = 14
-    deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-    gains = [d if d > 0 else 0 for d in deltas]
-    losses = [abs(d) if d < 0 else 0 for d in deltas]
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
+    averages = memo_rsi("run_bot.rsi", SYMBOL, klines, closes, period, "sma", TIMEFRAME)
+    if averages is None:
+        deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
+        gains = [d if d > 0 else 0 for d in deltas]
+        losses = [abs(d) if d < 0 else 0 for d in deltas]
+        averages = sum(gains[-period:]) / period, sum(losses[-period:]) / period
+    avg_gain, avg_loss = averages
     rs = avg_gain / avg_loss if avg_loss != 0 else 0
     rsi = 100 - (100 / (1 + rs))
     
@@ -148,10 +210,21 @@ def main():
     print(f"💰 Wallet: ${wallet.balance}")
     send_telegram(f"🧪 <b>TEST MODE STARTED</b>\nEntry Threshold: {ENTRY_THRESHOLD}")
 
+    seed = get_market_data()
+    if isinstance(seed, list):
+        store_candles(seed)
+        seed_resampler(seed)
+    stream = start_stream()
+
     while True:
         try:
-            data = get_market_data()
-            if not data:
+            # Wake on the next pushed kline; fall back to one REST poll if the stream is silent
+            if not stream.wait(timeout=10):
+                fresh = get_market_data()
+                if isinstance(fresh, list):
+                    store_candles(fresh)
+            data = candle_window()
+            if len(data) < 15:
                 time.sleep(2)
                 continue
                 
@@ -176,13 +249,13 @@ def main():
                         type_str, amt = wallet.buy(price, score)
                         if type_str:
                             print(f"\n📉 DCA TRIGGERED! Bought ${amt} @ {price}")
-                            send_telegram(f"📉 <b>DCA LEVEL {layer+1}</b>\nNew Avg: {wallet.position['avg_price']:.2f}")
+                            send_telegram(f"📉 <b>DCA LEVEL {layer+1}</b>\nNew Avg: {wallet.position['avg_price']:.2f}", "WARNING")
 
                 # Check Profit
                 if pnl_pct >= TAKE_PROFIT_PCT:
                     pos, pnl, pct = wallet.sell(price, "TP")
                     print(f"\n🎉 TAKE PROFIT! ${pnl:.2f} ({pct:.2f}%)")
-                    send_telegram(f"✅ <b>PROFIT SECURED</b>\nAmount: ${pnl:.2f}\nBal: ${wallet.balance:.2f}")
+                    send_telegram(f"✅ <b>PROFIT SECURED</b>\nAmount: ${pnl:.2f}\nBal: ${wallet.balance:.2f}", "SUCCESS")
 
                 # Status Line
                 color = "\033[92m" if pnl_pct > 0 else "\033[91m"
@@ -191,14 +264,21 @@ def main():
             # 2. SEARCH FOR ENTRY
             else:
                 s_color = "\033[92m" if score >= ENTRY_THRESHOLD else "\033[90m"
-                print(f"[{t}] 🔎 {price} | Score: {s_color}{score}\033[0m | RSI: {rsi}")
+                book = get_order_books().get(SYMBOL)
+                book_info = f" | OBI: {book.imbalance():+.2f}" if book else ""
+                spread = book.spread() if book else None
+                print(f"[{t}] 🔎 {price} | Score: {s_color}{score}\033[0m | RSI: {rsi}{book_info}")
                 
-                if score >= ENTRY_THRESHOLD:
+                if score >= ENTRY_THRESHOLD and spread is not None and spread > MAX_SPREAD_PERCENT:
+                    # ARCHITECTURE 11.8.1: no entries into a wide spread
+                    print(f"   ⏸️ Spread {spread*100:.3f}% too wide — entry skipped")
+                elif score >= ENTRY_THRESHOLD:
                     type_str, amt = wallet.buy(price, score)
                     print(f"\n🚀 ENTERING TRADE! Bought ${amt} @ {price}")
-                    send_telegram(f"🚀 <b>BUY SIGNAL</b>\nPrice: {price}\nScore: {score}")
+                    send_telegram(f"🚀 <b>BUY SIGNAL</b>\nPrice: {price}\nScore: {score}", "WARNING")
 
-            time.sleep(3)
+            # At most one evaluation per second however fast updates arrive
+            time.sleep(1)
             
         except KeyboardInterrupt:
             break
@@ -2,10 +2,10 @@
 import os
 import sys
 import time
-import requests
 import csv
 from datetime import datetime
 from dotenv import load_dotenv
+from modules.network.telegram_outbox import get_outbox
 
 # Load Environment
 load_dotenv()
@@ -18,29 +18,11 @@ def send_telegram(message):
         print("   ❌ Telegram credentials missing in .env")
         return
     
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    payload = {"chat_id": CHAT_ID, "text": message, "parse_mode": "Markdown"}
-    
-    try:
-        # Smart Proxy Check (from Phase 14)
-        proxies = None
-        possible_ports = [10809, 2081, 1080, 7890]
-        for port in possible_ports:
-            try:
-                p_url = f"http://127.0.0.1:{port}"
-                requests.get("https://api.telegram.org", proxies={"https": p_url}, timeout=2)
-                proxies = {"https": p_url, "http": p_url}
-                break
-            except:
-                continue
-
-        resp = requests.post(url, json=payload, proxies=proxies, timeout=10)
-        if resp.status_code == 200:
-            print("   ✅ Telegram Notification Sent!")
-        else:
-            print(f"   ❌ Telegram Error: {resp.text}")
-    except Exception as e:
-        print(f"   ❌ Network Error: {e}")
+    # Delivered by the outbox worker while the menu stays responsive
+    if get_outbox().send(message, level="SUCCESS", parse_mode="Markdown"):
+        print("   📨 Telegram Notification Queued")
+    else:
+        print("   ❌ Telegram outbox full — message spilled to disk")
 
 # ════════════════ OPTION 4: SIMULATION ENGINE ════════════════
 def run_fast_simulation():
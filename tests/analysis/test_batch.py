@@ -0,0 +1,53 @@
+"""
+One vectorized pass over a symbols x candles matrix must give every symbol
+the same answer as analysing it on its own.
+Run: python -m pytest tests/analysis -q
+"""
+
+import numpy as np
+
+from modules.analysis import batch
+from modules.analysis import indicators as ind
+from modules.data.candles import CandleSeries
+from modules.m_analysis import analyze_market
+from tests.analysis.test_indicators import random_walk
+
+
+def series(n, seed):
+    close, high, low, volume = random_walk(n, seed=seed, start=50 + seed)
+    return CandleSeries({"timestamp": np.arange(n) * 60_000.0, "open": close, "high": high,
+                         "low": low, "close": close, "volume": volume})
+
+
+def test_matrix_rows_match_single_symbol():
+    close = np.stack([random_walk(120, seed=s)[0] for s in range(6)])
+    high, low, volume = close * 1.01, close * 0.99, np.abs(close) * 10
+    table = batch.analyze_matrix([f"S{s}" for s in range(6)], close, high, low, volume)
+    for i, symbol in enumerate(table.symbols):
+        row = table.row(symbol)
+        assert np.isclose(row["rsi_sma"], ind.rsi(close[i], method="sma")[-1])
+        assert np.isclose(row["atr"], ind.atr(high[i], low[i], close[i])[-1])
+        assert np.isclose(row["ema50"], ind.ema(close[i], 50)[-1])
+
+
+def test_batch_matches_analyze_market_and_keeps_order():
+    candles = {f"S{s}": series(50 if s % 3 else 35, s) for s in range(9)}
+    candles["SHORT"] = series(10, 99)
+    symbols = ["SHORT"] + sorted(candles)[::-1]
+    table = batch.analyze_batch(candles, symbols)
+    assert table.symbols == [s for s in symbols if s != "SHORT"]
+    for symbol in table.symbols:
+        row, ref = table.row(symbol), analyze_market(symbol, candles[symbol])
+        assert (row["price"], row["signal"]) == (ref["price"], ref["signal"])
+        assert abs(row["rsi"] - ref["rsi"]) < 1e-9
+    assert table.row("SHORT")["signal"] == "WAIT"
+    assert table.skipped == {"SHORT": "Only 10 candles"}
+
+
+def test_sniper_score():
+    score = batch.sniper_score(close=np.array([95.0, 100.4, 110.0, 100.0]),
+                               rsi_sma=np.array([25.0, 35.0, 60.0, np.nan]),
+                               bb_lower=np.array([96.0, 100.0, 100.0, np.nan]),
+                               macd_line=np.array([1.0, 0.0, -1.0, 0.0]),
+                               macd_signal=np.array([0.0, 1.0, 0.0, np.nan]))
+    assert score.tolist() == [80, 30, 0, 0]
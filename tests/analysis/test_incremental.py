@@ -0,0 +1,72 @@
+"""
+Incremental indicators must reproduce the vectorized library candle by candle,
+peek() must equal the following update() without mutating state, and state
+must survive a JSON round-trip.
+Run: python -m pytest tests/analysis -q
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from modules.analysis import incremental as inc
+from modules.analysis import indicators as ind
+from tests.analysis.test_indicators import random_walk
+
+
+def feed(indicator, *series):
+    values = [indicator.update(*point) for point in zip(*series)]
+    return np.array(values, dtype=np.float64)
+
+
+@pytest.mark.parametrize("method", ["wilder", "sma"])
+def test_rsi_matches_vectorized(method):
+    close, *_ = random_walk(2000)
+    np.testing.assert_allclose(feed(inc.RSI(14, method), close), ind.rsi(close, 14, method),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_ema_sma_atr_match_vectorized():
+    close, high, low, volume = random_walk(2000, seed=4)
+    np.testing.assert_allclose(feed(inc.EMA(50), close), ind.ema(close, 50), rtol=1e-10)
+    np.testing.assert_allclose(feed(inc.volume_sma(20), volume), ind.volume_sma(volume, 20),
+                               rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(feed(inc.ATR(14), high, low, close), ind.atr(high, low, close, 14),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_macd_and_bollinger_match_vectorized():
+    close, *_ = random_walk(1500, seed=8)
+    macd, bands = inc.MACD(), inc.Bollinger(20, 2.0)
+    streamed_macd = np.array([macd.update(c) for c in close])
+    streamed_bands = np.array([bands.update(c) for c in close])
+    np.testing.assert_allclose(streamed_macd.T, np.vstack(ind.macd(close)), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(streamed_bands.T, np.vstack(ind.bollinger(close, 20, 2.0)),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_peek_does_not_commit():
+    close, high, low, _ = random_walk(300, seed=2)
+    rsi, bands, atr = inc.RSI(14, "sma"), inc.Bollinger(), inc.ATR()
+    for h, l, c in zip(high, low, close):
+        before = json.dumps([rsi.to_dict(), bands.to_dict(), atr.to_dict()])
+        open_candle = (rsi.peek(c * 1.01), bands.peek(c * 1.01), atr.peek(h, l, c * 1.01))
+        assert json.dumps([rsi.to_dict(), bands.to_dict(), atr.to_dict()]) == before
+        peeked = (rsi.peek(c), bands.peek(c), atr.peek(h, l, c))
+        committed = (rsi.update(c), bands.update(c), atr.update(h, l, c))
+        np.testing.assert_allclose(np.hstack(peeked), np.hstack(committed), equal_nan=True)
+        assert open_candle is not None
+
+
+def test_state_round_trip():
+    close, *_ = random_walk(200, seed=6)
+    original = [inc.RSI(14), inc.RSI(14, "sma"), inc.MACD(), inc.Bollinger(), inc.SMA(20)]
+    for indicator in original:
+        for c in close:
+            indicator.update(c)
+    restored = [inc.Incremental.from_dict(json.loads(json.dumps(i.to_dict()))) for i in original]
+    for a, b in zip(original, restored):
+        assert type(a) is type(b)
+        for c in (101.0, 99.5, 100.2):
+            assert a.update(c) == b.update(c)
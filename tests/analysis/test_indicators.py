@@ -0,0 +1,165 @@
+"""
+Parity tests: modules/analysis/indicators.py against the scalar implementations
+it replaces (m_analysis / analysis.technical RSI, the Smart Sniper pandas block)
+and plain-loop references.
+Run: python -m pytest tests/analysis -q
+"""
+
+import numpy as np
+import pytest
+
+from modules.analysis import indicators as ind
+from modules.analysis.technical import calculate_rsi as technical_rsi
+from modules.m_analysis import calculate_rsi as wilder_rsi
+
+
+def random_walk(n, seed=7, start=100.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.004, n)) * close
+    high = close + spread
+    low = close - spread
+    volume = rng.uniform(10, 1000, n)
+    return close, high, low, volume
+
+
+def loop_ema(values, period):
+    alpha = 2 / (period + 1)
+    out, prev = [], values[0]
+    for v in values:
+        prev = alpha * v + (1 - alpha) * prev
+        out.append(prev)
+    return np.array(out)
+
+
+def loop_atr(high, low, close, period):
+    tr = [high[0] - low[0]]
+    for i in range(1, len(close)):
+        tr.append(max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+    out = [np.nan] * (period - 1)
+    avg = sum(tr[:period]) / period
+    out.append(avg)
+    for value in tr[period:]:
+        avg = (avg * (period - 1) + value) / period
+        out.append(avg)
+    return np.array(out)
+
+
+# ── RSI ──
+
+@pytest.mark.parametrize("n", [15, 16, 30, 100, 500])
+def test_wilder_rsi_matches_m_analysis(n):
+    close, *_ = random_walk(n)
+    assert round(ind.last(ind.rsi(close, 14)), 2) == wilder_rsi(close.tolist(), 14)
+
+
+def test_wilder_rsi_matches_every_prefix():
+    close, *_ = random_walk(120, seed=3)
+    series = ind.rsi(close, 14)
+    for end in range(15, len(close) + 1):
+        assert round(series[end - 1], 2) == wilder_rsi(close[:end].tolist(), 14)
+
+
+@pytest.mark.parametrize("n", [15, 40, 300])
+def test_sma_rsi_matches_technical(n):
+    close, *_ = random_walk(n, seed=11)
+    assert round(ind.last(ind.rsi(close, 14, method="sma")), 2) == technical_rsi(close.tolist(), 14)
+
+
+def test_rsi_warmup_and_flat_series():
+    close, *_ = random_walk(50)
+    series = ind.rsi(close, 14)
+    assert np.isnan(series[:14]).all() and not np.isnan(series[14:]).any()
+    assert np.isnan(ind.rsi(close[:14], 14)).all()
+    rising = np.arange(1.0, 40.0)
+    assert (ind.rsi(rising, 14)[14:] == 100).all()
+    with pytest.raises(ValueError):
+        ind.rsi(close, 14, method="ema")
+
+
+# ── moving averages, bands, MACD, ATR ──
+
+def test_sma_and_volume_sma():
+    _, _, _, volume = random_walk(200)
+    expected = np.convolve(volume, np.ones(20) / 20, mode="valid")
+    result = ind.volume_sma(volume, 20)
+    assert np.isnan(result[:19]).all()
+    np.testing.assert_allclose(result[19:], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("period", [9, 50, 200])
+def test_ema_matches_loop_across_blocks(period):
+    close, *_ = random_walk(20_000, seed=5)
+    np.testing.assert_allclose(ind.ema(close, period), loop_ema(close, period), rtol=1e-10)
+
+
+def test_bollinger_bands():
+    close, *_ = random_walk(100)
+    mid, upper, lower = ind.bollinger(close, 20, 2.0)
+    window = close[-20:]
+    assert mid[-1] == pytest.approx(window.mean())
+    assert upper[-1] == pytest.approx(window.mean() + 2 * window.std(ddof=1))
+    assert lower[-1] == pytest.approx(window.mean() - 2 * window.std(ddof=1))
+    assert np.isnan(mid[:19]).all()
+
+
+def test_macd_is_difference_of_emas():
+    close, *_ = random_walk(300)
+    line, signal, hist = ind.macd(close)
+    np.testing.assert_allclose(line, loop_ema(close, 12) - loop_ema(close, 26), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(signal, loop_ema(line, 9), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(hist, line - signal)
+
+
+def test_atr_matches_loop():
+    close, high, low, _ = random_walk(500, seed=9)
+    np.testing.assert_allclose(ind.atr(high, low, close, 14), loop_atr(high, low, close, 14),
+                               rtol=1e-10, equal_nan=True)
+
+
+def test_matrix_rows_equal_single_series():
+    rows = [random_walk(250, seed=s) for s in range(4)]
+    close = np.vstack([r[0] for r in rows])
+    high = np.vstack([r[1] for r in rows])
+    low = np.vstack([r[2] for r in rows])
+    for fn, args in ((ind.rsi, (close,)), (ind.ema, (close, 50)), (ind.sma, (close, 20)),
+                     (ind.atr, (high, low, close))):
+        matrix = fn(*args)
+        for i in range(len(rows)):
+            single = fn(*(a[i] if isinstance(a, np.ndarray) else a for a in args))
+            np.testing.assert_allclose(matrix[i], single, equal_nan=True)
+
+
+# ── Smart Sniper pandas block (the formulas the strategy used before going incremental) ──
+
+def pandas_smart_sniper(df):
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+    df['bb_mid'] = df['close'].rolling(window=20).mean()
+    df['bb_std'] = df['close'].rolling(window=20).std()
+    df['bb_upper'] = df['bb_mid'] + (df['bb_std'] * 2)
+    df['bb_lower'] = df['bb_mid'] - (df['bb_std'] * 2)
+    exp12 = df['close'].ewm(span=12, adjust=False).mean()
+    exp26 = df['close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = exp12 - exp26
+    df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    return df.iloc[-1]
+
+
+def test_parity_with_smart_sniper_pandas():
+    pd = pytest.importorskip("pandas")
+
+    close, high, low, volume = random_walk(100, seed=21)
+    df = pd.DataFrame({"open": close, "high": high, "low": low, "close": close, "volume": volume})
+    latest = pandas_smart_sniper(df)
+
+    mid, upper, lower = ind.bollinger(close, 20, 2.0)
+    line, signal, _ = ind.macd(close)
+    assert ind.last(ind.rsi(close, 14, method="sma")) == pytest.approx(latest["rsi"])
+    assert mid[-1] == pytest.approx(latest["bb_mid"])
+    assert upper[-1] == pytest.approx(latest["bb_upper"])
+    assert lower[-1] == pytest.approx(latest["bb_lower"])
+    assert line[-1] == pytest.approx(latest["macd"])
+    assert signal[-1] == pytest.approx(latest["signal"])
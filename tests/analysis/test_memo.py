@@ -0,0 +1,90 @@
+"""
+Memoized analysis must return exactly what a full recompute returns, reuse
+the closed-candle state while only the open candle moves, and stay bounded.
+Run: python -m pytest tests/analysis -q
+"""
+
+import numpy as np
+
+from modules import m_analysis
+from modules.analysis import batch, technical
+from modules.analysis.memo import AnalysisMemo, get_analysis_memo
+from modules.data.candles import CandleSeries
+from tests.analysis.test_indicators import random_walk
+
+
+def candles(n, seed=0):
+    close = random_walk(n, seed=seed)[0].round(2)
+    return [{"timestamp": 60_000 * i, "open": c, "high": c, "low": c, "close": c, "volume": 1.0}
+            for i, c in enumerate(close.tolist())]
+
+
+def analyses(name):
+    return get_analysis_memo().metrics()["analyses"].get(name, {"hits": 0, "misses": 0})
+
+
+def test_open_candle_polls_match_full_recompute():
+    rows = candles(60, seed=3)
+    before = analyses("m_analysis.rsi")
+    for poll in range(5):
+        rows[-1]["close"] *= 1.002
+        closes = [r["close"] for r in rows]
+        for data in (rows, CandleSeries.from_rows(rows)):
+            assert m_analysis.analyze_market("MEMO", data)["rsi"] == m_analysis.calculate_rsi(closes)
+            assert technical.analyze_market("MEMO", data)["rsi"] == technical.calculate_rsi(closes)
+    after = analyses("m_analysis.rsi")
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 9
+
+
+def test_candle_close_moves_the_key():
+    rows = candles(61, seed=5)
+    before = analyses("technical.rsi")
+    technical.analyze_market("ROLL", rows[:60])
+    technical.analyze_market("ROLL", rows[1:])
+    assert analyses("technical.rsi")["misses"] - before["misses"] == 2
+
+
+def test_lru_bound_and_metrics():
+    memo = AnalysisMemo(max_entries=2)
+    for ts in (1, 2, 3):
+        memo.state("rsi", memo.key("BTCUSDT", "1m", ts, (14,)), lambda: ts)
+    assert memo.state("rsi", memo.key("BTCUSDT", "1m", 3, (14,)), lambda: None) == 3
+    metrics = memo.metrics()
+    assert metrics["entries"] == 2
+    assert metrics["analyses"]["rsi"]["evictions"] == 1
+    assert metrics["analyses"]["rsi"]["hit_ratio"] == 0.25
+
+
+def test_params_with_equal_hashes_get_their_own_entries():
+    memo = AnalysisMemo()
+    assert hash((-1,)) == hash((-2,))                   # CPython: hash(-1) == hash(-2)
+    memo.state("ema", memo.key("BTCUSDT", "1m", 1, (-1,)), lambda: "minus one")
+    assert memo.state("ema", memo.key("BTCUSDT", "1m", 1, (-2,)), lambda: "minus two") == "minus two"
+
+
+def test_rewritten_closed_candle_is_recomputed():
+    rows = candles(60, seed=7)
+    first = m_analysis.analyze_market("REWRITE", rows)["rsi"]
+    rows[-2]["close"] *= 0.97          # REST row replaces the stream-pushed snapshot
+    closes = [r["close"] for r in rows]
+    second = m_analysis.analyze_market("REWRITE", rows)["rsi"]
+    assert second == m_analysis.calculate_rsi(closes) != first
+
+
+def test_batch_reuses_closed_state_within_a_candle():
+    memo = AnalysisMemo()
+    data = {f"S{s}": candles(50, seed=s) for s in range(4)}
+    batch.analyze_batch(data, memo=memo)
+    for rows in data.values():
+        rows[-1]["close"] *= 1.003
+        rows[-1]["volume"] = 5.0
+    cached = batch.analyze_batch(data, memo=memo)
+    fresh = batch.analyze_batch(data, memo=AnalysisMemo())
+    for name in batch.COLUMNS:
+        np.testing.assert_array_equal(cached.columns[name], fresh.columns[name])
+    assert memo.metrics()["analyses"]["batch"]["hits"] == 1
+
+    data["S0"][-2]["close"] *= 1.01    # a closed candle changed: recompute
+    batch.analyze_batch(data, memo=memo)
+    assert memo.metrics()["analyses"]["batch"]["misses"] == 2
@@ -1,20 +1,63 @@
 
 import pandas as pd
 import logging
+from modules.data.candles import Candle, CandleSeries, FIELDS
 from .interfaces import IDataProvider
 
 logger = logging.getLogger("DataEngine")
 
+
+def _scalar(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+class ReplayCandle(Candle):
+    """Candle view that also answers the CSV's extra columns (scenario_tag, ...)"""
+
+    __slots__ = ("_meta",)
+
+    def __init__(self, columns: dict, i: int, meta: dict):
+        super().__init__(columns, i)
+        self._meta = meta
+
+    @property
+    def meta(self) -> dict:
+        """Non-OHLCV columns of this row"""
+        return {name: _scalar(column[self._i]) for name, column in self._meta.items()}
+
+    def __getitem__(self, key: str):
+        if key in self._meta:
+            return _scalar(self._meta[key][self._i])
+        return super().__getitem__(key)
+
+    def get(self, key: str, default=None):
+        if key in self._meta:
+            return _scalar(self._meta[key][self._i])
+        return super().get(key, default)
+
+    def keys(self):
+        return dict.fromkeys(FIELDS + tuple(self._meta)).keys()
+
+    def to_dict(self) -> dict:
+        row = super().to_dict()
+        row.update(self.meta)
+        return row
+
+
 class CsvCandlePlayer(IDataProvider):
     """
     Reads historical data from CSV and serves it candle by candle.
     Compatible with:
     1. Generated Test Data (timestamp, open, high...)
     2. Binance/MEXC Export (Open time, Open, High...)
+    Candles are row views; columns beyond OHLCV (scenario_tag...) are served
+    by key and in candle.meta. Date-string timestamps become epoch seconds.
     """
     def __init__(self, csv_path):
         self.csv_path = csv_path
         self.data = pd.DataFrame()
+        self.series = CandleSeries()
+        self.meta = {}
         self.current_index = 0
         self._load_data()
 
@@ -43,8 +86,15 @@ class CsvCandlePlayer(IDataProvider):
             # 4. Sort by time
             df.sort_values('timestamp', inplace=True)
             df.reset_index(drop=True, inplace=True)
+            if not pd.api.types.is_numeric_dtype(df['timestamp']):
+                # Date strings → epoch seconds
+                df['timestamp'] = (pd.to_datetime(df['timestamp']) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
             
             self.data = df
+            # Candles are served as row views over these columns (no per-row dicts)
+            self.series = CandleSeries({name: df[name].to_numpy() for name in FIELDS})
+            self.meta = {name: df[name].to_numpy() for name in df.columns if name not in FIELDS}
+            self._columns = self.series.columns()
             logger.info(f"Loaded {len(df)} candles from {self.csv_path}")
             
         except Exception as e:
@@ -52,9 +102,8 @@ class CsvCandlePlayer(IDataProvider):
             raise
 
     def get_next_candle(self):
-        if self.current_index < len(self.data):
-            # Convert row to dict
-            candle = self.data.iloc[self.current_index].to_dict()
+        if self.current_index < len(self.series):
+            candle = ReplayCandle(self._columns, self.current_index, self.meta)
             self.current_index += 1
             return candle
         return None
@@ -62,5 +111,5 @@ class CsvCandlePlayer(IDataProvider):
     def get_server_time(self):
         # Return time of current candle (Simulation Time)
         if self.current_index > 0:
-            return self.data.iloc[self.current_index - 1]['timestamp']
+            return self.series[self.current_index - 1].timestamp
         return 0
@@ -0,0 +1,99 @@
+"""
+Backfiller tests: checkpoint resume, short pages and closed-candle clipping on a temp store.
+Run: python -m pytest tests/data -q
+"""
+
+import numpy as np
+import pytest
+
+from modules.data import backfill
+from modules.data.backfill import Backfiller, Checkpoint
+from modules.data.storage import DataStorage
+
+MINUTE = 60_000
+T0 = 1_704_067_200_000          # 2024-01-01 00:00 UTC
+PAGE = 10
+
+
+class FakeKlines:
+    """get_klines() over a fixed set of open times, honouring start/end/limit like MEXC"""
+
+    def __init__(self, open_times, fail_on_call=None):
+        self.open_times = sorted(open_times)
+        self.fail_on_call = fail_on_call
+        self.calls = []
+
+    async def get_klines(self, symbol, interval="1m", limit=100, start_time=None, end_time=None):
+        self.calls.append((start_time, end_time))
+        if len(self.calls) == self.fail_on_call:
+            return {"error": "timed out"}
+        rows = [t for t in self.open_times if start_time <= t <= end_time][:limit]
+        return [[t, "1", "2", "0.5", "1.5", "10", t + MINUTE - 1, "15"] for t in rows]
+
+
+@pytest.fixture
+def make_backfiller(tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill, "MEXC_PAGE", PAGE)
+    storage = DataStorage(str(tmp_path / "ohlcv"))
+
+    def make(klines):
+        monkeypatch.setattr(backfill, "get_async_client", lambda: klines)
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        return Backfiller("mexc", storage=storage, checkpoint=checkpoint, retries=0)
+
+    return make
+
+
+def minutes(*ranges):
+    return [T0 + m * MINUTE for r in ranges for m in r]
+
+
+def stored(backfiller, symbol="BTCUSDT", interval="1m"):
+    """Stored open times in ms (DataStorage keeps seconds)"""
+    return (np.asarray(backfiller.storage.load(symbol, interval)["timestamp"]) * 1000).tolist()
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(make_backfiller):
+    klines = FakeKlines(minutes(range(35)), fail_on_call=3)
+    first = make_backfiller(klines)
+    [job] = first.run(["BTCUSDT"], ["1m"], T0, T0 + 35 * MINUTE)
+    assert job.status == "failed" and job.cursor == T0 + 2 * PAGE * MINUTE
+    assert first.checkpoint.get(job.key)["cursor"] == job.cursor
+
+    klines.calls.clear()
+    klines.fail_on_call = None
+    second = make_backfiller(klines)                         # re-reads the checkpoint file
+    [job] = second.run(["BTCUSDT"], ["1m"], T0, T0 + 35 * MINUTE)
+    assert job.status == "done" and job.rows == 35
+    assert klines.calls[0][0] == T0 + 2 * PAGE * MINUTE      # nothing fetched twice
+    assert stored(second) == minutes(range(35))
+    assert second.checkpoint.get(job.key)["status"] == "done"
+
+
+def test_changed_start_ignores_the_checkpoint(make_backfiller):
+    klines = FakeKlines(minutes(range(20)), fail_on_call=2)
+    make_backfiller(klines).run(["BTCUSDT"], ["1m"], T0, T0 + 20 * MINUTE)
+    [job] = make_backfiller(klines).plan(["BTCUSDT"], ["1m"], T0 + 5 * MINUTE, T0 + 20 * MINUTE)
+    assert job.cursor == job.start == T0 + 5 * MINUTE
+
+
+def test_short_and_empty_pages_advance_to_the_window_end(make_backfiller):
+    # Listed at minute 12, halted for minutes 25..34
+    klines = FakeKlines(minutes(range(12, 25), range(35, 40)))
+    backfiller = make_backfiller(klines)
+    [job] = backfiller.run(["BTCUSDT"], ["1m"], T0, T0 + 40 * MINUTE)
+    assert [start for start, _ in klines.calls] == minutes(range(0, 40, PAGE))
+    assert [end for _, end in klines.calls] == [t - 1 for t in minutes(range(PAGE, 41, PAGE))]
+    assert job.status == "done" and job.rows == 18
+    assert stored(backfiller) == minutes(range(12, 25), range(35, 40))
+
+
+def test_end_is_clipped_to_the_last_closed_candle(make_backfiller, monkeypatch):
+    now_ms = T0 + 23 * MINUTE + 30_000                       # minute 23 still open
+    monkeypatch.setattr(backfill.time, "time", lambda: now_ms / 1000)
+    klines = FakeKlines(minutes(range(30)))
+    backfiller = make_backfiller(klines)
+    [job] = backfiller.run(["BTCUSDT"], ["1m"], T0 + 20_000, T0 + 60 * MINUTE)
+    assert (job.start, job.end) == (T0, T0 + 23 * MINUTE)
+    assert stored(backfiller) == minutes(range(23))
+    assert max(end for _, end in klines.calls) == T0 + 23 * MINUTE - 1
@@ -0,0 +1,170 @@
+"""
+CandleStore tests: appends, upserts, late inserts and crash recovery on a temp directory.
+Run: python -m pytest tests/data -q
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from modules.data.candle_store import (
+    CandleStore, CandleStoreError, COLUMNS, DTYPES, HEADER_FILE, INDEX_FILE,
+)
+
+
+def candles(timestamps, close_offset=0.0):
+    """Columns for the given timestamps; close = timestamp + close_offset"""
+    ts = np.asarray(timestamps, dtype=np.int64)
+    close = ts.astype(np.float64) + close_offset
+    return {"timestamp": ts, "open": close - 1, "high": close + 2, "low": close - 2,
+            "close": close, "volume": np.full(len(ts), 10.0)}
+
+
+def closes(columns):
+    return np.asarray(columns["close"]).tolist()
+
+
+def stamps(columns):
+    return np.asarray(columns["timestamp"]).tolist()
+
+
+def test_append_survives_reopen(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert store.append(candles([60, 120, 180])) == 3
+    assert store.append(candles([240])) == 1
+    reopened = CandleStore(str(tmp_path))
+    assert reopened.header() == {"rows": 4, "first_ts": 60, "last_ts": 240, "ordered": True}
+    assert stamps(reopened.load()) == [60, 120, 180, 240]
+    assert reopened.size_bytes() == 4 * sum(d.itemsize for d in DTYPES.values())
+
+
+def test_append_rejects_old_or_unsorted_timestamps(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 120]))
+    with pytest.raises(CandleStoreError):
+        store.append(candles([120]))
+    with pytest.raises(CandleStoreError):
+        store.append(candles([300, 240]))
+    with pytest.raises(CandleStoreError):
+        store.append({**candles([300]), "close": np.array([1.0, 2.0])})
+    assert len(store) == 2
+
+
+def test_upsert_updates_overlap_in_place_and_appends_the_rest(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 120, 180]))
+    assert store.upsert(candles([180, 240, 300], close_offset=0.5)) == (2, 1)
+    loaded = store.load()
+    assert stamps(loaded) == [60, 120, 180, 240, 300]
+    assert closes(loaded) == [60.0, 120.0, 180.5, 240.5, 300.5]
+    assert store.ordered
+
+
+def test_upsert_duplicates_in_one_batch_last_wins(tmp_path):
+    store = CandleStore(str(tmp_path))
+    batch = candles([120, 60, 120])
+    batch["close"] = np.array([1.0, 2.0, 3.0])
+    assert store.upsert(batch) == (2, 0)
+    assert stamps(store.load()) == [60, 120]
+    assert closes(store.load()) == [2.0, 3.0]
+
+
+def test_late_insert_is_indexed_not_rewritten(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 180, 300]))
+    size_before = os.path.getsize(os.path.join(str(tmp_path), "close.f64"))
+    assert store.upsert(candles([120, 240, 360])) == (3, 0)
+    # Appended physically, ordered through the index
+    assert os.path.getsize(os.path.join(str(tmp_path), "close.f64")) == size_before + 3 * 8
+    assert not store.ordered
+    assert stamps(store.load()) == [60, 120, 180, 240, 300, 360]
+    assert stamps(store.range(100, 250)) == [120, 180, 240]
+    assert stamps(store.tail(2)) == [300, 360]
+    assert store.search(240) == 3
+
+    reopened = CandleStore(str(tmp_path))
+    assert not reopened.ordered
+    assert stamps(reopened.load()) == [60, 120, 180, 240, 300, 360]
+    # Tail append on an unordered store extends the persisted positions
+    reopened.append(candles([420]))
+    assert stamps(CandleStore(str(tmp_path)).load())[-2:] == [360, 420]
+
+
+def test_tail_upsert_after_late_insert_extends_the_index_in_place(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 180]))
+    store.upsert(candles([120]))                        # late: index is no longer identity
+    index_path = os.path.join(str(tmp_path), INDEX_FILE)
+    inode, size = os.stat(index_path).st_ino, os.path.getsize(index_path)
+    # Re-save of the open candle plus a new one, as DataStorage.save_batch does
+    assert store.upsert(candles([180, 240], close_offset=0.5)) == (1, 1)
+    assert store.upsert(candles([300])) == (1, 0)
+    assert os.stat(index_path).st_ino == inode           # not replaced by _write_index()
+    assert os.path.getsize(index_path) == size + 2 * 8
+    reopened = CandleStore(str(tmp_path))
+    assert stamps(reopened.load()) == [60, 120, 180, 240, 300]
+    assert closes(reopened.load()) == [60.0, 120.0, 180.5, 240.5, 300.0]
+
+
+def test_compact_restores_physical_order(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 180]))
+    store.upsert(candles([120]))
+    store.compact()
+    assert store.ordered
+    assert stamps({"timestamp": store.column("timestamp")}) == [60, 120, 180]
+    assert CandleStore(str(tmp_path)).ordered
+
+
+def test_missing_index_is_rebuilt_from_the_timestamp_column(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 180]))
+    store.upsert(candles([120]))
+    os.remove(os.path.join(str(tmp_path), INDEX_FILE))
+    reopened = CandleStore(str(tmp_path))
+    assert stamps(reopened.load()) == [60, 120, 180]
+    assert os.path.exists(os.path.join(str(tmp_path), INDEX_FILE))
+
+
+def test_interrupted_append_is_cut_back_to_the_header(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 120]))
+    # Crash after some column bytes were written, before the header commit
+    extra = candles([180])
+    for name in COLUMNS[:3]:
+        with open(store._column_path(name), "ab") as f:
+            f.write(extra[name].astype(DTYPES[name]).tobytes())
+    with open(store._column_path("close"), "ab") as f:
+        f.write(b"\x00\x01\x02")                        # torn write
+
+    recovered = CandleStore(str(tmp_path))
+    assert len(recovered) == 2
+    for name in COLUMNS:
+        assert os.path.getsize(recovered._column_path(name)) == 2 * DTYPES[name].itemsize
+    assert recovered.append(candles([180])) == 1
+    assert stamps(CandleStore(str(tmp_path)).load()) == [60, 120, 180]
+
+
+def test_header_ahead_of_the_data_trusts_the_columns(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append(candles([60, 120, 180]))
+    with open(store._column_path("volume"), "r+b") as f:
+        f.truncate(2 * DTYPES["volume"].itemsize)
+    recovered = CandleStore(str(tmp_path))
+    assert recovered.header()["rows"] == 2
+    assert (recovered.first_ts, recovered.last_ts) == (60, 120)
+    assert stamps(recovered.load()) == [60, 120]
+
+
+def test_corrupt_header_is_rejected(tmp_path):
+    CandleStore(str(tmp_path)).append(candles([60]))
+    path = os.path.join(str(tmp_path), HEADER_FILE)
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(CandleStoreError):
+        CandleStore(str(tmp_path))
+    with open(path, "r+b") as f:
+        f.truncate(5)
+    with pytest.raises(CandleStoreError):
+        CandleStore(str(tmp_path))
@@ -0,0 +1,118 @@
+"""
+DataCollector tests: kline normalisation and one batched save per pass (no network access).
+Run: python -m pytest tests/data -q
+"""
+
+import numpy as np
+import pytest
+
+from modules.data import collector
+from modules.data.collector import DataCollector, normalize_mexc, normalize_nobitex
+
+HOUR = 3_600_000
+NOW = 1_704_100_000.0                           # 2024-01-01 09:06:40 UTC
+OPEN = int(NOW * 1000) // HOUR * HOUR           # the 60m candle still forming
+
+
+def kline(ts, close=1.5, high=2.0, low=0.5, volume=10.0, open_=1.0):
+    return [ts, str(open_), str(high), str(low), str(close), str(volume), ts + HOUR - 1, "15"]
+
+
+class FakeAsyncClient:
+    """get_klines() serving canned rows (or an error reply) per symbol"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+
+    async def get_klines(self, symbol, interval="60m", limit=100, start_time=None, end_time=None):
+        self.calls.append((symbol, interval, limit))
+        return self.replies[symbol]
+
+
+class FakeStorage:
+    def __init__(self):
+        self.batches = []
+
+    def save_batch(self, batches, interval):
+        self.batches.append((batches, interval))
+        return {symbol: len(columns["timestamp"]) for symbol, columns in batches.items()}
+
+
+@pytest.fixture
+def make_collector(monkeypatch):
+    monkeypatch.setattr(collector.time, "time", lambda: NOW)
+    monkeypatch.setattr(collector, "get_client", lambda: None)
+
+    def make(replies):
+        client = FakeAsyncClient(replies)
+        monkeypatch.setattr(collector, "get_async_client", lambda: client)
+        return DataCollector(storage=FakeStorage()), client
+
+    return make
+
+
+def test_normalize_mexc_drops_malformed_rows_and_keeps_the_last_duplicate():
+    rows = [
+        kline(3 * HOUR),
+        kline(HOUR, close=1.2),
+        kline(2 * HOUR, close="nan"),
+        kline(4 * HOUR, high=1.4),                  # high below close
+        kline(5 * HOUR, low=0.0, open_=0.5),        # non-positive low
+        kline(6 * HOUR, volume=-1.0),
+        kline(HOUR, close=1.8),                     # re-sent: this copy wins
+    ]
+    series = normalize_mexc(rows)
+    assert series.timestamp.tolist() == [HOUR, 3 * HOUR]
+    assert series.timestamp.dtype == np.int64
+    assert series.close.tolist() == [1.8, 1.5]
+    assert len(normalize_mexc([])) == 0
+
+
+def test_normalize_nobitex_converts_seconds_to_ms():
+    result = {"s": "ok", "t": [7200, 3600], "o": [1, 1], "h": [2, 2], "l": [0.5, 0.5],
+              "c": [1.5, 1.25], "v": [3, 4]}
+    series = normalize_nobitex(result)
+    assert series.timestamp.tolist() == [HOUR, 2 * HOUR]
+    assert series.close.tolist() == [1.25, 1.5]
+
+
+def test_normalize_nobitex_rejects_mismatched_columns():
+    with pytest.raises(ValueError):
+        normalize_nobitex({"t": [3600, 7200], "o": [1], "h": [2, 2], "l": [0.5, 0.5],
+                           "c": [1.5, 1.5], "v": [3, 4]})
+
+
+def test_collect_stores_closed_candles_in_one_batch(make_collector):
+    history = [kline(OPEN - 2 * HOUR), kline(OPEN - HOUR), kline(OPEN)]
+    dc, client = make_collector({
+        "BTCUSDT": history,
+        "ETHUSDT": history[1:],
+        "SOLUSDT": [kline(OPEN)],                   # only the open candle: nothing to store
+        "XRPUSDT": {"error": "timed out"},
+    })
+    result = dc.collect(["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"])
+
+    assert sorted(symbol for symbol, *_ in client.calls) == ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"]
+    assert len(dc.storage.batches) == 1
+    batches, interval = dc.storage.batches[0]
+    assert interval == "60m" and sorted(batches) == ["BTCUSDT", "ETHUSDT"]
+    assert batches["BTCUSDT"]["timestamp"].tolist() == [OPEN - 2 * HOUR, OPEN - HOUR]
+    assert batches["ETHUSDT"]["timestamp"].tolist() == [OPEN - HOUR]
+    assert result["stored"] == {"BTCUSDT": 2, "ETHUSDT": 1}
+    assert result["errors"] == {"XRPUSDT": "timed out"}
+    assert len(result["candles"]["SOLUSDT"]) == 0
+
+
+def test_collect_keeps_the_open_candle_when_asked(make_collector):
+    dc, _ = make_collector({"BTCUSDT": [kline(OPEN - HOUR), kline(OPEN)]})
+    result = dc.collect(["BTCUSDT"], closed_only=False)
+    assert result["candles"]["BTCUSDT"].timestamp.tolist() == [OPEN - HOUR, OPEN]
+    assert len(dc.storage.batches) == 1
+
+
+def test_collect_with_nothing_to_store_skips_the_save(make_collector):
+    dc, _ = make_collector({"BTCUSDT": {"msg": "Invalid symbol."}})
+    result = dc.collect(["BTCUSDT"])
+    assert dc.storage.batches == []
+    assert result["stored"] == {} and result["errors"] == {"BTCUSDT": "Invalid symbol."}
@@ -0,0 +1,91 @@
+"""
+Local L2 book: level merging, sequence gaps and rate-limited REST re-seeds.
+Run: python -m pytest tests/data -q
+"""
+
+import numpy as np
+
+from modules.data.order_book import OrderBook, OrderBookManager, _merge
+
+
+class FakeRest:
+    """Serves order book snapshots, or an error reply while `error` is set"""
+
+    def __init__(self, version=100):
+        self.version = version
+        self.error = None
+        self.calls = 0
+
+    def get_orderbook(self, symbol, limit=20, fresh=False):
+        self.calls += 1
+        if self.error is not None:
+            return self.error
+        return {"lastUpdateId": self.version, "bids": [["99", "1"], ["98", "2"]], "asks": [["101", "3"]]}
+
+
+def diff(version, bids=(), asks=()):
+    return {"symbol": "BTCUSDT", "version": version, "bids": list(bids), "asks": list(asks)}
+
+
+def test_merge_updates_inserts_and_deletes():
+    prices, qtys = np.array([98.0, 99.0, 100.0]), np.array([1.0, 2.0, 3.0])
+    p, q = _merge(prices, qtys, [(99.0, 0.0), (97.0, 4.0), (100.0, 5.0), (120.0, 0.0)])
+    assert p.tolist() == [97.0, 98.0, 100.0]
+    assert q.tolist() == [4.0, 1.0, 5.0]
+
+
+def test_merge_last_duplicate_price_wins():
+    prices, qtys = np.array([99.0]), np.array([1.0])
+    p, q = _merge(prices, qtys, [(99.0, 0.0), (100.0, 2.0), (99.0, 7.0), (100.0, 0.0)])
+    assert p.tolist() == [99.0]
+    assert q.tolist() == [7.0]
+
+
+def test_book_reads_and_gap_invalidates():
+    book = OrderBook("BTCUSDT")
+    assert not book.apply_diff(1, [(99.0, 1.0)], [])          # not seeded yet
+    book.apply_snapshot(10, [(99.0, 1.0), (98.0, 2.0)], [(101.0, 3.0), (102.0, 1.0)])
+    assert book.apply_diff(9, [(99.0, 50.0)], [])              # covered by the snapshot: skipped
+    assert book.apply_diff(11, [(100.0, 1.0)], [(101.0, 0.0)])
+    assert book.best_bid() == (100.0, 1.0) and book.best_ask() == (102.0, 1.0)
+    assert book.spread() == (102.0 - 100.0) / 100.0
+    assert book.imbalance(levels=2) == (2.0 - 1.0) / 3.0        # bids 100+99 vs ask 102
+    assert not book.apply_diff(13, [], [])                     # 12 missing
+    assert not book.synced
+
+
+def test_gap_reseeds_and_replays_buffered_diffs():
+    rest = FakeRest(version=100)
+    books = OrderBookManager(rest, reseed_min=0.0)
+    books.seed("BTCUSDT")
+    books.on_diff(diff(101, bids=[(99.5, 1.0)]))
+    rest.version = 105
+    books.on_diff(diff(104, bids=[(97.0, 1.0)]))               # gap → re-seed at 105
+    books.on_diff(diff(106, asks=[(100.5, 2.0)]))
+    book = books.get("BTCUSDT")
+    assert book is not None and book.version == 106
+    assert book.best_ask() == (100.5, 2.0)
+    stats = books.stats()
+    assert (stats["gaps"], stats["resyncs"], rest.calls) == (1, 1, 2)
+
+
+def test_failing_snapshot_backs_off_instead_of_one_request_per_diff():
+    rest = FakeRest()
+    rest.error = {"error": "timeout"}
+    books = OrderBookManager(rest, reseed_min=60.0)
+    for version in range(1, 51):
+        books.on_diff(diff(version))
+    assert rest.calls == 1
+    assert books.get("BTCUSDT") is None
+    assert books.stats()["resyncs_deferred"] == 49
+
+
+def test_stream_snapshot_replays_pending_diffs():
+    books = OrderBookManager(FakeRest(), reseed_min=60.0)
+    books._retry_at["BTCUSDT"] = float("inf")                  # no REST: wait for the stream
+    books.on_diff(diff(201, bids=[(99.0, 5.0)]))
+    books.on_diff(diff(202, asks=[(101.0, 0.0), (103.0, 1.0)]))
+    books.on_snapshot({"symbol": "BTCUSDT", "version": 200, "bids": [(99.0, 1.0)], "asks": [(101.0, 1.0)]})
+    book = books.get("BTCUSDT")
+    assert book.version == 202
+    assert book.best_bid() == (99.0, 5.0) and book.best_ask() == (103.0, 1.0)
@@ -0,0 +1,168 @@
+"""
+Resampler tests: streamed bars checked against resample_columns on the same candles.
+Run: python -m pytest tests/data -q
+"""
+
+import numpy as np
+import pytest
+
+from modules.data.resampler import Resampler, bucket, resample_columns
+
+MINUTE = 60_000
+T0 = 1_704_067_200_000          # 2024-01-01 00:00 UTC, a Monday
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def base_columns(count, start=T0, step=MINUTE, seed=7):
+    """`count` sorted random-walk base candles as {column: array}"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    open_ = np.r_[100.0, close[:-1]]
+    return {
+        "timestamp": start + step * np.arange(count, dtype=np.int64),
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 1, count),
+        "low": np.minimum(open_, close) - rng.uniform(0, 1, count),
+        "close": close,
+        "volume": rng.uniform(1, 10, count),
+    }
+
+
+def candle(columns, i, symbol="BTCUSDT"):
+    return {"symbol": symbol, "interval": "1m", "open_time": int(columns["timestamp"][i]),
+            **{k: float(columns[k][i]) for k in FIELDS}}
+
+
+def partial(c):
+    """An earlier push of the same open candle: only its first trade so far"""
+    return dict(c, high=c["open"], low=c["open"], close=c["open"], volume=c["volume"] / 3)
+
+
+def collect(resampler):
+    closed = {}
+    resampler.on("bar_closed", lambda bar: closed.setdefault(bar["interval"], []).append(bar))
+    return closed
+
+
+def assert_bars_match(bars, expected, count=None):
+    """Streamed bar dicts equal the first `count` rows of resample_columns output"""
+    count = len(bars) if count is None else count
+    assert len(bars) == count
+    assert [b["open_time"] for b in bars] == expected["timestamp"][:count].tolist()
+    for field in FIELDS:
+        assert [b[field] for b in bars] == pytest.approx(expected[field][:count].tolist())
+
+
+def test_repeated_open_pushes_are_not_double_counted():
+    columns = base_columns(127)                     # 2h7m: last 60m bar still forming
+    resampler = Resampler(("5m", "15m", "60m"))
+    closed = collect(resampler)
+    for i in range(127):
+        c = candle(columns, i)
+        resampler.update(partial(c))
+        resampler.update(c)
+        resampler.update(c)
+        resampler.update(c, closed=True)
+        resampler.update(c)                         # late duplicate of a folded candle
+    for tf in ("5m", "15m", "60m"):
+        expected = resample_columns(columns, tf)
+        complete = int(expected["complete"].sum())
+        assert_bars_match(closed[tf], expected, complete)
+        assert resampler.closed_bars("BTCUSDT", tf) == closed[tf]
+    current = resampler.current("BTCUSDT", "60m")
+    expected = resample_columns(columns, "60m")
+    assert not expected["complete"][-1]
+    assert current["open_time"] == expected["timestamp"][-1]
+    assert [current[f] for f in FIELDS] == pytest.approx([expected[f][-1] for f in FIELDS])
+
+
+def test_open_candle_shows_in_the_bar_without_being_folded():
+    columns = base_columns(2)
+    resampler = Resampler(("5m",))
+    first, second = candle(columns, 0), candle(columns, 1)
+    resampler.update(first, closed=True)
+    resampler.update(partial(second))
+    resampler.update(second)
+    bar = resampler.current("BTCUSDT", "5m")
+    assert bar["volume"] == pytest.approx(first["volume"] + second["volume"])
+    assert bar["close"] == second["close"] and not bar["closed"]
+
+
+def test_bar_closes_on_its_last_base_candle():
+    columns = base_columns(5)
+    resampler = Resampler(("5m",))
+    closed = collect(resampler)
+    for i in range(4):
+        resampler.update(candle(columns, i), closed=True)
+    assert "5m" not in closed
+    resampler.update(candle(columns, 4), closed=True)
+    # Closed right away, not when the next bar's first candle shows up
+    assert_bars_match(closed["5m"], resample_columns(columns, "5m"))
+    assert resampler.current("BTCUSDT", "5m") is None
+
+
+def test_skipped_close_events_are_finished_by_the_next_candle():
+    columns = base_columns(11)
+    resampler = Resampler(("5m",))
+    closed = collect(resampler)
+    for i in range(11):                             # open pushes only, never closed=True
+        c = candle(columns, i)
+        resampler.update(partial(c))
+        resampler.update(c)
+    assert_bars_match(closed["5m"], resample_columns(columns, "5m"), 2)
+    assert resampler.current("BTCUSDT", "5m")["open_time"] == T0 + 10 * MINUTE
+
+
+def test_stale_push_and_late_trade_are_dropped():
+    columns = base_columns(2)
+    resampler = Resampler(("5m",))
+    resampler.update(candle(columns, 0))
+    resampler.update(candle(columns, 1))
+    before = resampler.current("BTCUSDT", "5m")
+    resampler.update(dict(candle(columns, 0), high=1e9, volume=1e9))     # replaced already
+    assert resampler.current("BTCUSDT", "5m") == before
+
+    trades = Resampler(("5m",))
+    trades.update_trade("ETHUSDT", 10.0, 1.0, T0 + MINUTE + 5_000)
+    trades.update_trade("ETHUSDT", 12.0, 2.0, T0 + MINUTE + 30_000)
+    trades.update_trade("ETHUSDT", 50.0, 9.0, T0 + 59_000)              # previous minute
+    bar = trades.current("ETHUSDT", "5m")
+    assert (bar["open"], bar["high"], bar["low"], bar["close"]) == (10.0, 12.0, 10.0, 12.0)
+    assert bar["volume"] == 3.0 and bar["quote_volume"] == pytest.approx(34.0)
+    assert trades.stats()["trades"] == 3
+
+
+def test_weekly_bars_start_on_monday():
+    wednesday = T0 + 2 * 86_400_000 + 12 * 3_600_000
+    assert bucket(wednesday, "1W") == T0
+    assert bucket(T0 - 1, "1W") == T0 - 7 * 86_400_000
+    columns = base_columns(15, start=T0 - 3 * 86_400_000, step=86_400_000)    # Fri .. Fri
+    expected = resample_columns(columns, "1W", base="1d")
+    assert expected["timestamp"].tolist() == [T0 - 7 * 86_400_000, T0, T0 + 7 * 86_400_000]
+    assert expected["complete"].tolist() == [True, True, False]    # first week ends on its Sunday
+
+    resampler = Resampler(("1W",), base="1d")
+    closed = collect(resampler)
+    for i in range(15):
+        resampler.update(dict(candle(columns, i), interval="1d"), closed=True)
+    assert_bars_match(closed["1W"], expected, 2)
+    assert resampler.current("BTCUSDT", "1W")["open_time"] == T0 + 7 * 86_400_000
+
+
+def test_seed_from_seconds_continues_the_trailing_partial_bar():
+    columns = base_columns(10)
+    seconds = dict({k: v[:8] for k, v in columns.items()}, timestamp=columns["timestamp"][:8] // 1000)
+    resampler = Resampler(("5m",))
+    closed = collect(resampler)
+    resampler.seed("BTCUSDT", seconds)
+    expected = resample_columns(columns, "5m")
+    assert_bars_match(resampler.closed_bars("BTCUSDT", "5m"), expected, 1)
+    assert closed == {}                             # seeding emits nothing
+    assert resampler.current("BTCUSDT", "5m")["open_time"] == T0 + 5 * MINUTE
+
+    resampler.update(candle(columns, 7))            # already in the seed: ignored
+    for i in (8, 9):
+        resampler.update(candle(columns, i), closed=True)
+    assert_bars_match(closed["5m"], {k: v[1:] for k, v in expected.items()})
+    assert_bars_match(resampler.closed_bars("BTCUSDT", "5m"), expected)
+    assert resampler.stats()["seeded"] == 8
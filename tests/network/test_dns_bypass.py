@@ -0,0 +1,108 @@
+"""
+DNS cache tests: getaddrinfo shape and connect-failure reporting (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from modules.network import dns_bypass
+from modules.network.dns_bypass import DNSCache, DNSEntry, patched_getaddrinfo, create_connection
+from modules.network.http_pool import AsyncConnectionPool
+
+HOST = "api.mexc.com"
+DEAD_IP, LIVE_IP = "127.0.0.2", "127.0.0.1"
+
+
+@pytest.fixture
+def listener():
+    """Accepts on 127.0.0.1 only, so the same port on 127.0.0.2 refuses"""
+    sock = socket.socket()
+    sock.bind((LIVE_IP, 0))
+    sock.listen()
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Patched resolver answering HOST from a pre-seeded cache (dead address ranked first)"""
+    cache = DNSCache(hosts=[HOST])
+    cache._entries[HOST] = DNSEntry([DEAD_IP, LIVE_IP], 300, "test")
+    cache.refreshes = []
+    cache._refresh_async = cache.refreshes.append       # no DoH traffic from tests
+    monkeypatch.setattr(dns_bypass, "_cache", cache)
+    monkeypatch.setattr(socket, "getaddrinfo", patched_getaddrinfo)
+    return cache
+
+
+def test_getaddrinfo_returns_only_the_requested_socket_kind(cache):
+    stream = socket.getaddrinfo(HOST, 443, type=socket.SOCK_STREAM)
+    assert [(t, p, addr) for _, t, p, _, addr in stream] == [
+        (socket.SOCK_STREAM, socket.IPPROTO_TCP, (DEAD_IP, 443)),
+        (socket.SOCK_STREAM, socket.IPPROTO_TCP, (LIVE_IP, 443)),
+    ]
+    udp = socket.getaddrinfo(HOST, "443", proto=socket.IPPROTO_UDP)
+    assert {(t, p) for _, t, p, _, _ in udp} == {(socket.SOCK_DGRAM, socket.IPPROTO_UDP)}
+    assert {addr[1] for *_, addr in udp} == {443}
+    both = socket.getaddrinfo(HOST, "https")
+    assert len(both) == 4 and {addr[1] for *_, addr in both} == {443}
+
+
+def test_getaddrinfo_falls_through_for_other_hosts_and_families(cache):
+    assert socket.getaddrinfo("localhost", 80, type=socket.SOCK_STREAM)[0][4][1] == 80
+    with pytest.raises(socket.gaierror):
+        socket.getaddrinfo(HOST, 443, socket.AF_INET, socket.SOCK_RAW, 255, socket.AI_NUMERICHOST)
+
+
+def test_create_connection_reports_refused_address(cache, listener):
+    port = listener.getsockname()[1]
+    sock = create_connection((HOST, port), timeout=2)
+    try:
+        assert sock.getpeername() == (LIVE_IP, port)
+    finally:
+        sock.close()
+    assert cache._scores[DEAD_IP].failures == 1
+    # The refused address is now ranked after the working one
+    assert cache.resolve(HOST) == [LIVE_IP, DEAD_IP]
+    assert cache.refreshes == []
+
+
+def test_create_connection_without_patch_uses_the_system_resolver(listener):
+    port = listener.getsockname()[1]
+    sock = create_connection((LIVE_IP, port), timeout=2)
+    sock.close()
+
+
+def test_async_pool_reports_refused_address(cache, listener):
+    port = listener.getsockname()[1]
+    pool = AsyncConnectionPool(HOST, port, timeout=0.5)
+
+    async def attempt():
+        # The live listener never speaks TLS, so its handshake times out and counts too
+        with pytest.raises((OSError, asyncio.TimeoutError)):
+            await pool._new_connection()
+
+    asyncio.run(attempt())
+    assert cache._scores[DEAD_IP].failures == 1
+    assert cache._scores[LIVE_IP].failures == 1
+    assert cache.refreshes == [HOST]        # nothing healthy left: re-resolve
+
+
+def test_refreshes_with_doh_down_do_not_pile_up_static_addresses(monkeypatch):
+    host = "api.nobitex.ir"
+    cache = DNSCache(hosts=[host])
+    answers = [(["203.0.113.7"], 60), ([], None), ([], None)]
+    monkeypatch.setattr(cache, "_race_doh", lambda h: answers.pop(0))
+    probed = []
+    monkeypatch.setattr(dns_bypass, "probe_ip", lambda ip, port=443: probed.append(ip) or 0.01)
+
+    expected = ["203.0.113.7"] + dns_bypass.STATIC_NOBITEX_IPS
+    for source in ("doh", "stale", "stale"):
+        probed.clear()
+        cache._refresh(host)
+        entry = cache._entries[host]
+        assert (entry.source, entry.ips) == (source, expected)
+        assert sorted(probed) == sorted(expected)        # each address probed once per refresh
@@ -0,0 +1,184 @@
+"""
+ResponseParser / HTTPReader tests over canned bytes (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import pytest
+
+from modules.network.http_parser import (
+    ResponseParser, HTTPReader, HTTPParseError, StaleConnectionError, MAX_LINE_SIZE, read_response,
+)
+
+
+def feed_all(raw: bytes, step: int, method: str = "GET"):
+    """Parse one response fed `step` bytes at a time → (parser, leftover bytes)"""
+    parser = ResponseParser(method)
+    pos = 0
+    while not parser.done and pos < len(raw):
+        pos += parser.feed(raw[pos:pos + step])
+    return parser, raw[pos:]
+
+
+CHUNKED_HEAD = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+NEXT = b"HTTP/1.1 204 No Content\r\n\r\n"
+
+
+@pytest.mark.parametrize("step", [1, 7, 1000, 1 << 20])
+def test_long_chunk_extension_and_trailer_keep_the_pipelined_response(step):
+    # Lines longer than one search window, yet within MAX_LINE_SIZE
+    raw = (CHUNKED_HEAD + b"5;ext=" + b"x" * 2000 + b"\r\nhello\r\n"
+           + b"0\r\nX-Trailer: " + b"y" * 1500 + b"\r\n\r\n" + NEXT)
+    parser, rest = feed_all(raw, step)
+    assert parser.done and bytes(parser.result().body) == b"hello"
+    assert rest == NEXT
+
+
+@pytest.mark.parametrize("step", [1, 1000, 1 << 20])
+def test_chunk_line_over_the_limit_is_rejected(step):
+    raw = CHUNKED_HEAD + b"5;" + b"x" * MAX_LINE_SIZE + b"\r\nhello\r\n0\r\n\r\n"
+    with pytest.raises(HTTPParseError):
+        feed_all(raw, step)
+
+
+def test_line_of_exactly_the_limit_is_accepted():
+    line = b"5;" + b"x" * (MAX_LINE_SIZE - 4) + b"\r\n"
+    assert len(line) == MAX_LINE_SIZE
+    parser, _ = feed_all(CHUNKED_HEAD + line + b"hello\r\n0\r\n\r\n", 1 << 20)
+    assert bytes(parser.result().body) == b"hello"
+
+
+# ── state machine ──
+
+class ScriptedSocket:
+    """recv_into() from a list of byte strings; b"" (or running out) means EOF"""
+
+    def __init__(self, *pieces):
+        self.pieces = list(pieces)
+
+    def recv_into(self, buffer):
+        if not self.pieces:
+            return 0
+        piece = self.pieces.pop(0)
+        n = min(len(piece), len(buffer))
+        buffer[:n] = piece[:n]
+        if n < len(piece):
+            self.pieces.insert(0, piece[n:])
+        return n
+
+
+@pytest.mark.parametrize("step", [1, 3, 1 << 20])
+def test_content_length_body(step):
+    raw = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nX-A: 1\r\nX-A: 2\r\n\r\nhello" + NEXT
+    parser, rest = feed_all(raw, step)
+    response = parser.result()
+    assert (response.status, response.reason, bytes(response.body)) == (200, "OK", b"hello")
+    assert response.headers["x-a"] == "1, 2" and response.keep_alive
+    assert rest == NEXT
+
+
+@pytest.mark.parametrize("step", [1, 4, 1 << 20])
+def test_chunked_body_with_extensions_and_trailers(step):
+    raw = CHUNKED_HEAD + b"4;name=v\r\nwiki\r\n5\r\npedia\r\nD\r\n in\r\n\r\nchunks\r\n0\r\nX-T: 1\r\n\r\n" + NEXT
+    parser, rest = feed_all(raw, step)
+    assert bytes(parser.result().body) == b"wikipedia in\r\n\r\nchunks"
+    assert rest == NEXT
+
+
+def test_missing_crlf_after_chunk_is_an_error():
+    with pytest.raises(HTTPParseError):
+        feed_all(CHUNKED_HEAD + b"3\r\nabcX\r\n0\r\n\r\n", 1 << 20)
+
+
+def test_bad_chunk_size_is_an_error():
+    with pytest.raises(HTTPParseError):
+        feed_all(CHUNKED_HEAD + b"zz\r\n", 1 << 20)
+
+
+def test_body_until_eof_closes_the_connection():
+    parser, _ = feed_all(b"HTTP/1.1 200 OK\r\n\r\npart one ", 1 << 20)
+    assert not parser.done
+    parser.feed(b"part two")
+    parser.feed_eof()
+    response = parser.result()
+    assert parser.done and bytes(response.body) == b"part one part two"
+    assert not response.keep_alive
+
+
+@pytest.mark.parametrize("raw,method", [
+    (b"HTTP/1.1 204 No Content\r\n\r\n", "GET"),
+    (b"HTTP/1.1 304 Not Modified\r\nContent-Length: 10\r\n\r\n", "GET"),
+    (b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n", "HEAD"),
+    (b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n", "GET"),
+])
+def test_bodyless_responses_finish_at_the_head(raw, method):
+    parser, rest = feed_all(raw + NEXT, 1 << 20, method)
+    assert parser.done and bytes(parser.result().body) == b""
+    assert rest == NEXT
+
+
+def test_interim_100_continue_is_skipped():
+    raw = b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201 Created\r\nContent-Length: 2\r\n\r\nok"
+    parser, _ = feed_all(raw, 5)
+    assert parser.result().status == 201 and bytes(parser.result().body) == b"ok"
+
+
+@pytest.mark.parametrize("version,connection,keep_alive", [
+    ("HTTP/1.1", "", True),
+    ("HTTP/1.1", "close", False),
+    ("HTTP/1.0", "", False),
+    ("HTTP/1.0", "keep-alive", True),
+])
+def test_keep_alive_follows_version_and_connection_header(version, connection, keep_alive):
+    head = f"{version} 200 OK\r\nContent-Length: 0\r\n"
+    if connection:
+        head += f"Connection: {connection}\r\n"
+    parser, _ = feed_all((head + "\r\n").encode(), 1 << 20)
+    assert parser.result().keep_alive is keep_alive
+
+
+@pytest.mark.parametrize("raw", [
+    b"SSH-2.0-OpenSSH\r\n\r\n",
+    b"HTTP/1.1 OK\r\n\r\n",
+    b"HTTP/1.1 200 OK\r\nContent-Length: ten\r\n\r\n",
+])
+def test_malformed_heads_are_rejected(raw):
+    with pytest.raises(HTTPParseError):
+        feed_all(raw, 1 << 20)
+
+
+def test_oversized_head_is_rejected():
+    with pytest.raises(HTTPParseError):
+        feed_all(b"HTTP/1.1 200 OK\r\nX-Big: " + b"a" * (64 * 1024 + 10), 1 << 20)
+
+
+def test_eof_before_any_byte_is_stale_and_mid_response_is_not():
+    parser = ResponseParser()
+    with pytest.raises(StaleConnectionError):
+        parser.feed_eof()
+    parser = ResponseParser()
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhe")
+    with pytest.raises(ConnectionError) as error:
+        parser.feed_eof()
+    assert not isinstance(error.value, StaleConnectionError)
+
+
+def test_reader_splits_pipelined_responses_across_recv_boundaries():
+    first = b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\none"
+    second = CHUNKED_HEAD + b"3\r\ntwo\r\n0\r\n\r\n"
+    third = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nthree"
+    stream = first + second + third
+    reader = HTTPReader(ScriptedSocket(stream[:50], stream[50:90], stream[90:]))
+    bodies = [bytes(reader.read_response().body) for _ in range(3)]
+    assert bodies == [b"one", b"two", b"three"]
+
+
+def test_reader_receives_large_body_straight_into_place():
+    body = bytes(range(256)) * 1000
+    head = f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+    sock = ScriptedSocket(head + body[:100], body[100:70000], body[70000:])
+    assert bytes(read_response(sock).body) == body
+
+
+def test_reader_on_closed_connection_raises_stale():
+    with pytest.raises(StaleConnectionError):
+        HTTPReader(ScriptedSocket()).read_response()
@@ -0,0 +1,119 @@
+"""
+ConnectionPool request/pipeline retry tests over scripted connections (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import json
+
+import pytest
+
+from modules.network.http_parser import HTTPResponse, StaleConnectionError
+from modules.network.http_pool import ConnectionPool
+from modules.network.telegram_bot import TelegramBot
+
+
+class ScriptedSocket:
+    def __init__(self):
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+    def close(self):
+        pass
+
+
+class ScriptedConnection:
+    """Answers read_response() from a script: HTTPResponse objects, or an exception to raise"""
+
+    def __init__(self, script):
+        self.sock = ScriptedSocket()
+        self.script = list(script)
+        self.reader = self
+        self.requests = 0
+        self.last_used = 0.0
+
+    def read_response(self, method):
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def is_stale(self, idle_timeout):
+        return False            # dies only when the script says so
+
+    def close(self):
+        pass
+
+
+def ok(payload=None, keep_alive=True):
+    body = bytearray(json.dumps({"ok": True, "result": payload}).encode())
+    return HTTPResponse(200, "OK", {}, body, keep_alive)
+
+
+def scripted_pool(*scripts):
+    """Pool whose every new connection plays the next script"""
+    pool = ConnectionPool("example.invalid")
+    connections = [ScriptedConnection(s) for s in scripts]
+    queue = list(connections)
+    pool._new_connection = lambda: queue.pop(0)
+    return pool, connections
+
+
+def test_pipeline_resends_unanswered_requests_when_retry_allowed():
+    pool, conns = scripted_pool([ok(1), StaleConnectionError("cut")], [ok(2), ok(3)])
+    responses = pool.pipeline([b"a", b"b", b"c"])
+    assert len(responses) == 3
+    assert conns[1].sock.sent == [b"bc"]
+    assert pool.stats()["retries"] == 1
+
+
+def test_pipeline_without_retry_returns_partial_responses():
+    pool, conns = scripted_pool([ok(1), StaleConnectionError("cut")])
+    responses = pool.pipeline([b"a", b"b", b"c"], retry=False)
+    assert len(responses) == 1
+    assert pool.stats()["errors"] == 1
+
+
+def test_pipeline_without_retry_raises_when_nothing_answered():
+    pool, _ = scripted_pool([StaleConnectionError("cut")])
+    with pytest.raises(StaleConnectionError):
+        pool.pipeline([b"a", b"b"], retry=False)
+
+
+def test_pipeline_without_retry_still_follows_connection_close():
+    pool, conns = scripted_pool([ok(1, keep_alive=False)], [ok(2)])
+    assert len(pool.pipeline([b"a", b"b"], retry=False)) == 2
+    assert conns[1].sock.sent == [b"b"]
+
+
+def test_send_messages_is_never_resent_and_pads_lost_replies():
+    bot = TelegramBot()
+    pool, conns = scripted_pool([ok(1), StaleConnectionError("cut")], [ok(2), ok(3)])
+    bot.pool = pool
+    results = bot.send_messages(["one", "two", "three"])
+    assert [r["ok"] for r in results] == [True, False, False]
+    assert "error" in results[1]
+    assert len(conns[0].sock.sent) == 1 and conns[1].sock.sent == []
+
+
+def test_read_only_call_is_retried_on_a_dead_connection():
+    bot = TelegramBot()
+    pool, conns = scripted_pool([ok(), StaleConnectionError("idle close")], [ok()])
+    bot.pool = pool
+    assert bot.send_message("hello")["ok"]
+    assert bot.test_connection()           # reused connection died: getMe goes out again
+    assert len(conns[1].sock.sent) == 1
+
+
+def test_send_message_is_not_retried_on_a_dead_connection():
+    bot = TelegramBot()
+    pool, conns = scripted_pool([ok(), StaleConnectionError("idle close")], [ok()])
+    bot.pool = pool
+    assert bot.test_connection()
+    result = bot.send_message("hello")
+    assert not result["ok"] and "error" in result
+    assert conns[1].sock.sent == []
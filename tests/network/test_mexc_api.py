@@ -0,0 +1,90 @@
+"""
+MEXC client price paths: refresh_prices freshness and PriceCache feeding (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import asyncio
+
+import pytest
+
+from modules.network.mexc_api import MEXCClient
+from modules.network.mexc_async import AsyncMEXCClient
+from modules.network.price_cache import PriceCache
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+REPLIES = {
+    "/ticker/price": [{"symbol": "BTCUSDT", "price": "50000"}, {"symbol": "ETHUSDT", "price": "3000"}],
+    "/ticker/bookTicker": [
+        {"symbol": "BTCUSDT", "bidPrice": "49999", "bidQty": "1", "askPrice": "50001", "askQty": "2"},
+        {"symbol": "ETHUSDT", "bidPrice": "2999", "bidQty": "1", "askPrice": "3001", "askQty": "2"},
+    ],
+}
+
+
+def reply(path, params):
+    if params and "symbol" in params:
+        return {"symbol": params["symbol"], "price": "51000"}
+    return REPLIES[path]
+
+
+@pytest.fixture
+def client():
+    client = MEXCClient()
+    client.price_cache = PriceCache()
+    client.requests = []
+
+    def raw_request(method, path, params=None, signed=False):
+        client.requests.append(path)
+        return reply(path, params)
+
+    client._raw_request = raw_request
+    return client
+
+
+@pytest.fixture
+def async_client():
+    client = AsyncMEXCClient()
+    client.price_cache = PriceCache()
+    client.requests = []
+
+    async def raw_request(method, path, params=None, signed=False):
+        client.requests.append(path)
+        return reply(path, params)
+
+    client._raw_request = raw_request
+    return client
+
+
+def test_refresh_prices_with_book_skips_fresh_caches(client):
+    assert client.refresh_prices(SYMBOLS, book=True) == {"BTCUSDT": 50000.0, "ETHUSDT": 3000.0}
+    assert client.requests == ["/ticker/price", "/ticker/bookTicker"]
+    client.refresh_prices(SYMBOLS, book=True)
+    assert client.requests == ["/ticker/price", "/ticker/bookTicker"]     # both still fresh
+    assert client.price_cache.spread("BTCUSDT") == pytest.approx(2 / 49999)
+
+
+def test_refresh_prices_refetches_only_the_stale_book(client):
+    client.refresh_prices(SYMBOLS)
+    client.refresh_prices(SYMBOLS, book=True)
+    assert client.requests == ["/ticker/price", "/ticker/bookTicker"]
+    client.price_cache._quotes["ETHUSDT"].book_updated -= 60
+    client.refresh_prices(SYMBOLS, book=True)
+    assert client.requests[2:] == ["/ticker/bookTicker"]
+
+
+def test_single_ticker_price_feeds_the_cache(client):
+    assert client.get_ticker_price("BTCUSDT") == {"symbol": "BTCUSDT", "price": "51000"}
+    assert client.price_cache.price("BTCUSDT") == 51000.0
+    client.refresh_prices(["BTCUSDT"])
+    assert client.requests == ["/ticker/price"]                            # served from the cache
+
+
+def test_async_client_respects_freshness_and_feeds_the_cache(async_client):
+    async def scenario():
+        await async_client.refresh_prices(SYMBOLS, book=True)
+        await async_client.refresh_prices(SYMBOLS, book=True)
+        return await async_client.get_ticker_price("ETHUSDT")
+
+    assert asyncio.run(scenario()) == {"symbol": "ETHUSDT", "price": "51000"}
+    assert async_client.requests == ["/ticker/price", "/ticker/bookTicker", "/ticker/price"]
+    assert async_client.price_cache.price("ETHUSDT") == 51000.0
@@ -0,0 +1,435 @@
+"""
+MEXCStream tests against a local stand-in WebSocket server (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from modules.network.mexc_stream import (
+    MEXCStream, FrameParser, encode_frame, kline_channel, depth_channel,
+    WS_GUID, OP_TEXT, OP_PING, OP_PONG, OP_CLOSE, OP_BINARY,
+)
+from modules.network.price_cache import PriceCache
+
+
+class StandInServer:
+    """Minimal MEXC-like WebSocket server: acks SUBSCRIPTION, answers PING, pushes on demand"""
+
+    def __init__(self):
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.url = f"ws://127.0.0.1:{self.port}/ws"
+        self.clients = []
+        self.subscriptions = []   # one list of channels per SUBSCRIPTION message
+        self.pings = 0
+        self.pongs = []
+        self.mute = False         # stop answering and pushing (dead-link simulation)
+        self.lock = threading.Lock()
+        self.connected = threading.Condition(self.lock)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = client.recv(1024)
+            if not chunk:
+                return
+            head += chunk
+        key = [l.split(":", 1)[1].strip() for l in head.decode().split("\r\n")
+               if l.lower().startswith("sec-websocket-key")][0]
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        client.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        with self.connected:
+            self.clients.append(client)
+            self.connected.notify_all()
+
+        parser = FrameParser()
+        while True:
+            try:
+                data = client.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            for opcode, payload in parser.feed(data):
+                if opcode == OP_PONG:
+                    self.pongs.append(payload)
+                if opcode != OP_TEXT or self.mute:
+                    continue
+                message = json.loads(payload)
+                if message["method"] == "SUBSCRIPTION":
+                    with self.lock:
+                        self.subscriptions.append(message["params"])
+                    for channel in message["params"]:
+                        self._send(client, {"id": 0, "code": 0, "msg": channel})
+                elif message["method"] == "PING":
+                    self.pings += 1
+                    self._send(client, {"id": 0, "code": 0, "msg": "PONG"})
+
+    @staticmethod
+    def _send(client, message):
+        client.sendall(encode_frame(OP_TEXT, json.dumps(message).encode(), mask=False))
+
+    def push(self, message):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                self._send(client, message)
+            except OSError:
+                pass
+
+    def send_raw(self, frame: bytes):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.sendall(frame)
+
+    def drop_all(self):
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+    def wait_for_clients(self, n, timeout=5):
+        with self.connected:
+            return self.connected.wait_for(lambda: len(self.clients) >= n, timeout)
+
+    def wait_for_subscriptions(self, n, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.subscriptions) >= n:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self):
+        self.drop_all()
+        self.listener.close()
+
+
+class FakeRest:
+    """Records backfill calls and serves deterministic klines / order books"""
+
+    def __init__(self):
+        self.kline_calls = []
+        self.book_calls = []
+        self.book_version = 100
+        self.book_error = None
+
+    def get_klines(self, symbol, interval="60m", limit=100, start_time=None, end_time=None):
+        self.kline_calls.append((symbol, interval, start_time, end_time))
+        step = 60_000
+        end = end_time if end_time is not None else start_time + 2 * step
+        rows = []
+        t = start_time
+        while t <= end:
+            rows.append([t, "1", "2", "0.5", "1.5", "10", t + step - 1, "15"])
+            t += step
+        return rows
+
+    def get_orderbook(self, symbol, limit=20, fresh=False):
+        self.book_calls.append(symbol)
+        if self.book_error is not None:
+            return self.book_error
+        return {"lastUpdateId": self.book_version, "bids": [["99", "1"]], "asks": [["101", "2"]]}
+
+
+def kline_message(symbol, open_s, close="100.5", interval="Min1"):
+    return {
+        "c": f"spot@public.kline.v3.api@{symbol}@{interval}",
+        "d": {"k": {"t": open_s, "o": "100", "c": close, "h": "101", "l": "99", "v": "3",
+                    "a": "300", "T": open_s + 60, "i": interval}, "e": "spot@public.kline.v3.api"},
+        "s": symbol, "t": open_s * 1000,
+    }
+
+
+def depth_message(symbol, version):
+    return {
+        "c": f"spot@public.increase.depth.v3.api@{symbol}",
+        "d": {"asks": [{"p": "101", "v": "0"}], "bids": [{"p": "99.5", "v": "4"}],
+              "e": "spot@public.increase.depth.v3.api", "r": str(version)},
+        "s": symbol, "t": 0,
+    }
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def server():
+    srv = StandInServer()
+    yield srv
+    srv.close()
+
+
+@pytest.fixture
+def rest():
+    return FakeRest()
+
+
+def make_stream(server, rest, **kwargs):
+    kwargs.setdefault("heartbeat", 0.2)
+    kwargs.setdefault("idle_timeout", 5.0)
+    kwargs.setdefault("resync_min", 0.0)         # snapshots on demand unless a test checks the backoff
+    stream = MEXCStream(url=server.url, rest=rest, price_cache=PriceCache(), max_backoff=0.2, **kwargs)
+    events = {}
+    for name in ("kline", "kline_closed", "deal", "depth", "depth_snapshot", "book_ticker", "gap", "status"):
+        stream.on(name, lambda payload, name=name: events.setdefault(name, []).append(payload))
+    return stream, events
+
+
+# ── framing ──
+
+@pytest.mark.parametrize("size", [0, 5, 125, 126, 65535, 65536, 200_000])
+def test_frame_roundtrip_all_length_encodings(size):
+    payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    parser = FrameParser()
+    frame = encode_frame(OP_BINARY, payload, mask=True)
+    # Byte-by-byte for small frames exercises every partial-header path
+    chunks = [frame[i:i + 1] for i in range(len(frame))] if size < 300 else [frame[:3], frame[3:]]
+    messages = []
+    for chunk in chunks:
+        messages.extend(parser.feed(chunk))
+    assert messages == [(OP_BINARY, payload)]
+
+
+def test_fragmented_message_with_interleaved_ping():
+    parser = FrameParser()
+    first = bytes([0x01, 3]) + b"abc"          # TEXT, FIN=0
+    ping = bytes([0x80 | OP_PING, 2]) + b"hi"
+    last = bytes([0x80, 3]) + b"def"           # CONT, FIN=1
+    assert parser.feed(first + ping + last) == [(OP_PING, b"hi"), (OP_TEXT, b"abcdef")]
+
+
+# ── stream behaviour ──
+
+def test_subscribe_heartbeat_and_kline_updates(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_kline("BTCUSDT", "1m")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        assert server.subscriptions[0] == [kline_channel("BTCUSDT", "1m")]
+
+        server.push(kline_message("BTCUSDT", 1_700_000_040, close="100.5"))
+        server.push(kline_message("BTCUSDT", 1_700_000_040, close="100.7"))
+        server.push(kline_message("BTCUSDT", 1_700_000_100, close="100.9"))
+        assert wait_until(lambda: len(events.get("kline", [])) == 3)
+
+        closed = events["kline_closed"]
+        assert len(closed) == 1
+        assert closed[0]["open_time"] == 1_700_000_040_000
+        assert closed[0]["close"] == 100.7
+        assert stream.latest_kline("BTCUSDT", "1m")["close"] == 100.9
+        assert stream.price_cache.price("BTCUSDT") == 100.9
+        assert not rest.kline_calls
+
+        assert wait_until(lambda: server.pings >= 1 and stream.stats()["pongs"] >= 1)
+    finally:
+        stream.stop()
+
+
+def test_kline_gap_is_backfilled_over_rest(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_kline("ETHUSDT", "1m")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        server.push(kline_message("ETHUSDT", 1_700_000_040))
+        # Three whole minutes missing
+        server.push(kline_message("ETHUSDT", 1_700_000_280))
+        assert wait_until(lambda: len(events.get("kline", [])) == 2)
+
+        assert rest.kline_calls == [("ETHUSDT", "1m", 1_700_000_040_000, 1_700_000_280_000 - 1)]
+        opens = [c["open_time"] for c in events["kline_closed"]]
+        assert opens == [1_700_000_040_000 + i * 60_000 for i in range(4)]
+        assert all(c["backfill"] for c in events["kline_closed"])
+        assert events["gap"][0]["reason"] == "gap"
+    finally:
+        stream.stop()
+
+
+def test_depth_sequence_gap_triggers_snapshot_resync(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_depth("SOLUSDT")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        assert server.subscriptions[0] == [depth_channel("SOLUSDT")]
+        server.push(depth_message("SOLUSDT", 101))   # first diff: initial snapshot
+        server.push(depth_message("SOLUSDT", 102))
+        assert wait_until(lambda: len(events.get("depth", [])) == 2)
+        rest.book_version = 159
+        server.push(depth_message("SOLUSDT", 160))   # 103..159 missing, covered by the snapshot
+        assert wait_until(lambda: len(events.get("depth", [])) == 3)
+
+        assert rest.book_calls == ["SOLUSDT", "SOLUSDT"]
+        assert [s["version"] for s in events["depth_snapshot"]] == [100, 159]
+        assert [d["version"] for d in events["depth"]] == [101, 102, 160]
+        assert events["gap"][0] == {"channel": "depth", "symbol": "SOLUSDT", "expected": 103, "got": 160}
+    finally:
+        stream.stop()
+
+
+def test_failed_depth_resync_is_retried_on_next_diff(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_depth("SOLUSDT")
+    rest.book_error = {"error": "timeout"}
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        server.push(depth_message("SOLUSDT", 101))   # snapshot fails: nothing to apply it to
+        assert wait_until(lambda: len(rest.book_calls) == 1)
+        rest.book_error = None
+        rest.book_version = 101
+        server.push(depth_message("SOLUSDT", 102))   # retried, continues the snapshot
+        assert wait_until(lambda: len(events.get("depth", [])) == 1)
+
+        assert rest.book_calls == ["SOLUSDT", "SOLUSDT"]
+        assert [s["version"] for s in events["depth_snapshot"]] == [101]
+        assert [d["version"] for d in events["depth"]] == [102]
+    finally:
+        stream.stop()
+
+
+def test_failed_depth_resync_backs_off_instead_of_a_call_per_diff(server, rest):
+    stream, events = make_stream(server, rest, resync_min=0.3, resync_max=0.6)
+    stream.subscribe_depth("SOLUSDT")
+    rest.book_error = {"error": "timeout"}
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        for version in range(101, 106):
+            server.push(depth_message("SOLUSDT", version))
+        assert wait_until(lambda: stream.stats()["resyncs_deferred"] == 4)
+        assert rest.book_calls == ["SOLUSDT"]               # one REST call, the rest deferred
+        time.sleep(0.35)
+        server.push(depth_message("SOLUSDT", 106))          # window over: retried, fails again
+        assert wait_until(lambda: len(rest.book_calls) == 2)
+        server.push(depth_message("SOLUSDT", 107))          # second failure doubles the wait
+        assert wait_until(lambda: stream.stats()["resyncs_deferred"] == 5)
+        rest.book_error = None
+        rest.book_version = 107
+        time.sleep(0.65)
+        server.push(depth_message("SOLUSDT", 108))
+        assert wait_until(lambda: len(events.get("depth", [])) == 1)
+
+        assert len(rest.book_calls) == 3
+        assert stream.stats()["resync_failures"] == 2
+        assert [d["version"] for d in events["depth"]] == [108]
+    finally:
+        stream.stop()
+
+
+def test_depth_snapshot_older_than_diff_is_a_gap(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_depth("SOLUSDT")
+    rest.book_version = 150
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        server.push(depth_message("SOLUSDT", 160))   # 151..159 missing from the snapshot
+        assert wait_until(lambda: len(events.get("gap", [])) == 1)
+        assert events["gap"][0] == {"channel": "depth", "symbol": "SOLUSDT", "expected": 151, "got": 160}
+        rest.book_version = 160
+        server.push(depth_message("SOLUSDT", 161))   # re-snapshot now covers the hole
+        assert wait_until(lambda: len(events.get("depth", [])) == 1)
+
+        assert [s["version"] for s in events["depth_snapshot"]] == [150, 160]
+        assert [d["version"] for d in events["depth"]] == [161]
+    finally:
+        stream.stop()
+
+
+def test_reconnects_resubscribes_and_backfills_after_drop(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_kline("BTCUSDT", "1m")
+    stream.subscribe_depth("BTCUSDT")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        server.push(kline_message("BTCUSDT", 1_700_000_040))
+        assert wait_until(lambda: len(events.get("kline", [])) == 1)
+
+        server.drop_all()
+        assert server.wait_for_subscriptions(2)
+        assert sorted(server.subscriptions[1]) == sorted(server.subscriptions[0])
+        assert wait_until(lambda: stream.stats()["reconnects"] == 1)
+        assert ("BTCUSDT", "1m", 1_700_000_040_000, None) in rest.kline_calls
+        assert any(g["reason"] == "reconnect" for g in events["gap"])
+        assert [s["state"] for s in events["status"]][:3] == ["connected", "reconnecting", "connected"]
+    finally:
+        stream.stop()
+
+
+def test_silent_server_is_detected_by_heartbeat(server, rest):
+    stream, events = make_stream(server, rest, heartbeat=0.1, idle_timeout=0.5)
+    stream.subscribe_kline("BTCUSDT", "1m")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        server.mute = True
+        assert wait_until(lambda: stream.stats()["reconnects"] >= 1, timeout=5)
+    finally:
+        stream.stop()
+
+
+def test_server_ping_frame_gets_pong_and_close_frame_reconnects(server, rest):
+    stream, events = make_stream(server, rest)
+    stream.subscribe_kline("BTCUSDT", "1m")
+    stream.start()
+    try:
+        assert server.wait_for_clients(1)
+        assert server.wait_for_subscriptions(1)
+        server.send_raw(encode_frame(OP_PING, b"are-you-there", mask=False))
+        assert wait_until(lambda: server.pongs == [b"are-you-there"])
+        server.send_raw(encode_frame(OP_CLOSE, b"\x03\xe8", mask=False))
+        assert wait_until(lambda: stream.stats()["reconnects"] == 1)
+    finally:
+        stream.stop()
+
+
+def test_stream_wait_wakes_on_update(server, rest):
+    stream, _ = make_stream(server, rest)
+    stream.subscribe_kline("BTCUSDT", "1m")
+    stream.start()
+    try:
+        assert server.wait_for_subscriptions(1)
+        threading.Timer(0.05, server.push, args=(kline_message("BTCUSDT", 1_700_000_040),)).start()
+        assert stream.wait(timeout=5)
+        assert not stream.wait(timeout=0.1)
+    finally:
+        stream.stop()
@@ -0,0 +1,176 @@
+"""
+ProxyResolver tests: ranking, one probe per burst, failover vs refused tunnels (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from modules.network.proxy_resolver import Proxy, ProxyResolver, ProxyError, TunnelRefused
+
+
+class StandInProxy:
+    """
+    Local HTTP CONNECT / SOCKS5 proxy that answers the tunnel request with
+    `reply` ("ok" or "refused") and then keeps the connection open.
+    """
+
+    def __init__(self, scheme="http", reply="ok"):
+        self.scheme = scheme
+        self.reply = reply
+        self.requests = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.url = f"{scheme}://127.0.0.1:{self.port}"
+        self.conns = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.conns.append(conn)
+            try:
+                self._http(conn) if self.scheme == "http" else self._socks(conn)
+            except OSError:
+                conn.close()
+
+    def _http(self, conn):
+        head = b""
+        while not head.endswith(b"\r\n\r\n"):
+            head += conn.recv(1)
+        self.requests.append(head.split(b" ")[1].decode())
+        status = b"200 Connection established" if self.reply == "ok" else b"502 Bad Gateway"
+        conn.sendall(b"HTTP/1.1 " + status + b"\r\n\r\n")
+
+    def _socks(self, conn):
+        conn.recv(3)
+        conn.sendall(b"\x05\x00")
+        head = conn.recv(5)
+        rest = conn.recv(head[4] + 2)
+        self.requests.append(f"{rest[:-2].decode()}:{int.from_bytes(rest[-2:], 'big')}")
+        code = 0 if self.reply == "ok" else 5          # 5 = connection refused by the target
+        conn.sendall(bytes([5, code, 0, 1]) + b"\x00" * 6)
+
+    def close(self):
+        self.sock.close()
+        for conn in self.conns:
+            conn.close()
+
+
+def closed_port() -> int:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def proxies():
+    started = []
+
+    def start(scheme="http", reply="ok"):
+        started.append(StandInProxy(scheme, reply))
+        return started[-1]
+
+    yield start
+    for proxy in started:
+        proxy.close()
+
+
+def make_resolver(urls, latencies):
+    """Resolver whose probe results are `latencies` (None = down), without touching the network"""
+    resolver = ProxyResolver(candidates=urls, use_proxy=True)
+    resolver.probed = []
+    resolver.reprobes = 0
+
+    def probe_one(proxy):
+        resolver.probed.append(proxy.url)
+        latency = latencies[resolver._candidates.index(proxy)]
+        proxy.healthy, proxy.latency = latency is not None, latency
+
+    def reprobe():
+        resolver.reprobes += 1
+
+    resolver._probe_one = probe_one
+    resolver._reprobe_async = reprobe
+    return resolver
+
+
+def test_probe_ranks_healthy_proxies_by_latency():
+    urls = ["http://127.0.0.1:1", "socks5://127.0.0.1:2", "http://127.0.0.1:3"]
+    resolver = make_resolver(urls, [0.30, None, 0.05])
+    ranked = resolver.probe()
+    assert [p.port for p in ranked] == [3, 1]
+    assert resolver.get().port == 3
+    assert resolver.stats()["current"] == "http://127.0.0.1:3"
+    assert Proxy.from_url("socks5://127.0.0.1:2").url == "socks5h://127.0.0.1:2"
+
+
+def test_concurrent_first_get_runs_one_probe():
+    urls = ["http://127.0.0.1:1", "http://127.0.0.1:2"]
+    resolver = make_resolver(urls, [0.02, 0.01])
+    probe_one = resolver._probe_one
+
+    def slow_probe(proxy):
+        time.sleep(0.05)
+        probe_one(proxy)
+
+    resolver._probe_one = slow_probe
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+    assert resolver.stats()["probes"] == 1
+    assert sorted(resolver.probed) == sorted(Proxy.from_url(u).url for u in urls)
+    assert len(results) == 8 and all(p.port == 2 for p in results)
+
+
+@pytest.mark.parametrize("scheme", ["http", "socks5"])
+def test_unreachable_proxy_fails_over_to_the_next(proxies, scheme):
+    backup = proxies(scheme)
+    dead = f"http://127.0.0.1:{closed_port()}"
+    resolver = make_resolver([dead, backup.url], [0.01, 0.02])
+    resolver.probe()
+
+    sock = resolver.connect("api.mexc.com", 443, timeout=2)
+    sock.close()
+    assert backup.requests == ["api.mexc.com:443"]
+    assert resolver.get().port == backup.port
+    stats = resolver.stats()
+    assert (stats["failovers"], stats["failures_reported"]) == (1, 1)
+    assert resolver.reprobes == 1
+
+
+@pytest.mark.parametrize("scheme", ["http", "socks5"])
+def test_refused_tunnel_is_raised_without_failover(proxies, scheme):
+    proxy = proxies(scheme, reply="refused")
+    backup = proxies(scheme)
+    resolver = make_resolver([proxy.url, backup.url], [0.01, 0.02])
+    resolver.probe()
+
+    with pytest.raises(TunnelRefused) as error:
+        resolver.connect("blocked.example", 443, timeout=2)
+    assert isinstance(error.value, ProxyError)
+    assert resolver.get().port == proxy.port         # the proxy itself is fine: keep it
+    assert backup.requests == []
+    assert resolver.stats()["failures_reported"] == 0 and resolver.reprobes == 0
+
+
+def test_direct_failure_triggers_a_reprobe():
+    resolver = make_resolver(["http://127.0.0.1:1"], [None])
+    resolver.probe()
+    assert resolver.get() is None
+    with pytest.raises(OSError):
+        resolver.connect("127.0.0.1", closed_port(), timeout=2)
+    assert resolver.reprobes == 1
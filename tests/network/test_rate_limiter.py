@@ -0,0 +1,164 @@
+"""
+PriorityRateLimiter tests: buckets, lanes, exchange feedback (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from modules.network.rate_limiter import (
+    PriorityRateLimiter, RateLimitRejected, lane_for,
+    LANE_ORDERS, LANE_BALANCE, LANE_MARKET_DATA,
+)
+
+
+def make_limiter(per_minute=60, burst=3, min_spacing=0.0, reserves=None, **kwargs):
+    reserves = reserves or {}
+    lanes = {lane: {"per_minute": per_minute, "burst": burst, "reserve": reserves.get(lane, 0)}
+             for lane in (LANE_ORDERS, LANE_BALANCE, LANE_MARKET_DATA)}
+    return PriorityRateLimiter(per_minute, burst, min_spacing, lanes=lanes, **kwargs)
+
+
+def grants(limiter, lane, now):
+    """_try_acquire at a chosen instant (lock held, as the callers do)"""
+    with limiter._cond:
+        return limiter._try_acquire(lane, now)
+
+
+def test_burst_then_refill_at_the_configured_rate():
+    limiter = make_limiter(per_minute=60, burst=2)
+    now = time.monotonic()
+    assert grants(limiter, LANE_MARKET_DATA, now) == 0
+    assert grants(limiter, LANE_MARKET_DATA, now) == 0
+    assert grants(limiter, LANE_MARKET_DATA, now) == pytest.approx(1.0, abs=0.01)
+    assert grants(limiter, LANE_MARKET_DATA, now + 1.0) == 0
+
+
+def test_lane_reserve_leaves_global_tokens_for_higher_lanes():
+    limiter = make_limiter(burst=3, reserves={LANE_MARKET_DATA: 2})
+    now = time.monotonic()
+    assert grants(limiter, LANE_MARKET_DATA, now) == 0
+    # 2 global tokens left, both reserved: polling waits while orders still go through
+    assert grants(limiter, LANE_MARKET_DATA, now) > 0
+    assert grants(limiter, LANE_ORDERS, now) == 0
+    assert grants(limiter, LANE_ORDERS, now) == 0
+
+
+def test_waiting_higher_lane_goes_first():
+    limiter = make_limiter()
+    now = time.monotonic()
+    limiter._waiting[LANE_ORDERS] = 1
+    assert grants(limiter, LANE_MARKET_DATA, now) > 0
+    assert grants(limiter, LANE_BALANCE, now) > 0
+    limiter._waiting[LANE_ORDERS] = 0
+    assert grants(limiter, LANE_MARKET_DATA, now) == 0
+
+
+def test_min_spacing_between_grants():
+    limiter = make_limiter(min_spacing=2.5)
+    now = time.monotonic()
+    assert grants(limiter, LANE_ORDERS, now) == 0
+    assert grants(limiter, LANE_ORDERS, now + 1.0) == pytest.approx(1.5)
+    assert grants(limiter, LANE_ORDERS, now + 2.5) == 0
+
+
+def test_429_retry_after_seconds_pauses_every_lane():
+    limiter = make_limiter()
+    limiter.observe(429, {"retry-after": "7"})
+    metrics = limiter.metrics()
+    assert metrics["penalties"] == 1 and metrics["tokens"] == 0
+    assert 6.5 < metrics["blocked_for"] <= 7
+    now = time.monotonic()
+    for lane in (LANE_ORDERS, LANE_BALANCE, LANE_MARKET_DATA):
+        assert grants(limiter, lane, now) > 6
+
+
+def test_retry_after_http_date_and_418_default():
+    limiter = make_limiter()
+    limiter.observe(429, {"retry-after": formatdate(time.time() + 30, usegmt=True)})
+    assert 25 < limiter.metrics()["blocked_for"] <= 30
+    limiter = make_limiter()
+    limiter.observe(418, {})
+    assert limiter.metrics()["blocked_for"] == pytest.approx(60, abs=0.5)
+
+
+def test_remaining_header_caps_tokens_and_zero_waits_for_reset():
+    limiter = make_limiter(burst=10)
+    limiter.observe(200, {"x-ratelimit-remaining": "1"})
+    assert limiter.metrics()["tokens"] == 1
+    limiter.observe(200, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "3"})
+    assert 2.5 < limiter.metrics()["blocked_for"] <= 3
+    limiter.observe(200, {"x-ratelimit-remaining": "n/a"})       # ignored
+
+
+def test_acquire_waits_for_refill():
+    limiter = make_limiter(per_minute=600, burst=1)      # one token per 0.1s
+    assert limiter.acquire(LANE_MARKET_DATA) < 0.05
+    waited = limiter.acquire(LANE_MARKET_DATA)
+    assert 0.05 < waited < 0.5
+    assert limiter.metrics()["lanes"][LANE_MARKET_DATA]["granted"] == 2
+
+
+def test_acquire_rejects_when_the_wait_exceeds_the_timeout():
+    limiter = make_limiter(per_minute=1, burst=1)
+    limiter.acquire(LANE_BALANCE)
+    with pytest.raises(RateLimitRejected):
+        limiter.acquire(LANE_BALANCE, timeout=0.2)
+    lane = limiter.metrics()["lanes"][LANE_BALANCE]
+    assert lane["rejected"] == 1 and lane["waiting"] == 0
+
+
+def test_full_queue_rejects_immediately():
+    limiter = make_limiter(max_queue=1)
+    limiter._waiting[LANE_MARKET_DATA] = 1
+    with pytest.raises(RateLimitRejected):
+        limiter.acquire(LANE_MARKET_DATA)
+    with pytest.raises(ValueError):
+        limiter.acquire("nonexistent")
+
+
+def test_queued_order_is_served_before_queued_polling():
+    limiter = make_limiter(per_minute=600, burst=1)
+    limiter.acquire(LANE_MARKET_DATA)                    # bucket empty: both must queue
+    order = []
+
+    def take(lane):
+        limiter.acquire(lane)
+        order.append(lane)
+
+    poller = threading.Thread(target=take, args=(LANE_MARKET_DATA,))
+    poller.start()
+    time.sleep(0.02)
+    trader = threading.Thread(target=take, args=(LANE_ORDERS,))
+    trader.start()
+    poller.join(2)
+    trader.join(2)
+    assert order == [LANE_ORDERS, LANE_MARKET_DATA]
+
+
+def test_async_acquire_shares_the_buckets():
+    limiter = make_limiter(per_minute=600, burst=2)
+
+    async def burst():
+        return await asyncio.gather(*(limiter.acquire_async(LANE_MARKET_DATA) for _ in range(3)))
+
+    waits = sorted(asyncio.run(burst()))
+    assert waits[0] < 0.05 and waits[1] < 0.05 and 0.05 < waits[2] < 0.5
+    assert limiter.metrics()["lanes"][LANE_MARKET_DATA]["granted"] == 3
+
+
+@pytest.mark.parametrize("method,path,lane", [
+    ("POST", "/api/v3/order", LANE_ORDERS),
+    ("DELETE", "/api/v3/order", LANE_ORDERS),
+    ("GET", "/api/v3/order", LANE_MARKET_DATA),
+    ("GET", "/api/v3/account", LANE_BALANCE),
+    ("GET", "/api/v3/openOrders", LANE_BALANCE),
+    ("POST", "/users/wallets/list", LANE_BALANCE),
+    ("GET", "/api/v3/klines", LANE_MARKET_DATA),
+])
+def test_lane_for(method, path, lane):
+    assert lane_for(method, path) == lane
@@ -0,0 +1,201 @@
+"""
+ResponseCache tests: TTL, LRU, single-flight coalescing, errors never cached.
+Run: python -m pytest tests/network -q
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from modules.network.response_cache import ResponseCache
+
+KEY = ResponseCache.key("api.mexc.com", "/ticker/price", {"symbol": "BTCUSDT"})
+
+
+class CountingFetcher:
+    """fetcher() that returns `result` (or raises it) and counts calls, optionally gated"""
+
+    def __init__(self, result=None, gate: threading.Event = None):
+        self.result = {"price": "1"} if result is None else result
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
+
+def test_key_ignores_param_order():
+    assert ResponseCache.key("h", "/p", {"a": 1, "b": 2}) == ResponseCache.key("h", "/p", {"b": 2, "a": 1})
+
+
+def test_fresh_reply_is_served_until_the_ttl_runs_out():
+    cache = ResponseCache({"/ticker/price": 0.05})
+    fetcher = CountingFetcher()
+    assert cache.fetch(KEY, fetcher) is cache.fetch(KEY, fetcher)
+    assert fetcher.calls == 1
+    time.sleep(0.06)
+    cache.fetch(KEY, fetcher)
+    assert fetcher.calls == 2
+    assert cache.metrics()["endpoints"]["/ticker/price"] == {
+        "hits": 1, "misses": 2, "coalesced": 0, "evictions": 0, "hit_ratio": 0.333}
+
+
+@pytest.mark.parametrize("reply", [
+    None,
+    {"error": "timed out"},
+    {"code": 700003, "msg": "Timestamp for this request is outside of the recvWindow"},
+    {"raw": "<html>bad gateway</html>"},
+    {"s": "error", "errmsg": "bad symbol"},
+])
+def test_error_replies_are_never_cached(reply):
+    cache = ResponseCache()
+    fetcher = CountingFetcher()
+    fetcher.result = reply          # None included
+    cache.fetch(KEY, fetcher)
+    cache.fetch(KEY, fetcher)
+    assert fetcher.calls == 2
+    assert cache.metrics()["entries"] == 0
+
+
+def test_concurrent_callers_share_one_request():
+    cache = ResponseCache()
+    gate = threading.Event()
+    fetcher = CountingFetcher(gate=gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch(KEY, fetcher))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while cache.metrics()["total"]["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    gate.set()
+    for t in threads:
+        t.join(2)
+    assert fetcher.calls == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert cache.metrics()["requests_saved"] == 7
+
+
+def test_leader_failure_reaches_waiters_and_is_not_cached():
+    cache = ResponseCache()
+    gate = threading.Event()
+    fetcher = CountingFetcher(ConnectionError("proxy down"), gate=gate)
+    errors = []
+
+    def call():
+        try:
+            cache.fetch(KEY, fetcher)
+        except ConnectionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while cache.metrics()["total"]["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    gate.set()
+    for t in threads:
+        t.join(2)
+    assert fetcher.calls == 1 and len(errors) == 3
+    # Nothing stored and nothing left in flight: the next call fetches again
+    fetcher.result = {"price": "2"}
+    assert cache.fetch(KEY, fetcher) == {"price": "2"}
+    assert fetcher.calls == 2
+
+
+def test_lru_eviction_keeps_recently_used_entries():
+    cache = ResponseCache(max_entries=2)
+    keys = [ResponseCache.key("h", "/depth", {"symbol": s}) for s in ("A", "B", "C")]
+    cache.fetch(keys[0], lambda: {"n": 0})
+    cache.fetch(keys[1], lambda: {"n": 1})
+    cache.fetch(keys[0], lambda: {"n": -1})          # touch A
+    cache.fetch(keys[2], lambda: {"n": 2})           # evicts B
+    assert cache.fetch(keys[0], lambda: {"n": -1}) == {"n": 0}
+    assert cache.fetch(keys[1], lambda: {"n": 11}) == {"n": 11}
+    assert cache.metrics()["endpoints"]["/depth"]["evictions"] == 2
+
+
+def test_invalidate_by_endpoint():
+    cache = ResponseCache()
+    depth = ResponseCache.key("h", "/depth", {"symbol": "A"})
+    cache.fetch(KEY, CountingFetcher())
+    cache.fetch(depth, lambda: {"bids": []})
+    cache.invalidate("/depth")
+    assert cache.metrics()["entries"] == 1
+    cache.invalidate()
+    assert cache.metrics()["entries"] == 0
+
+
+def test_async_callers_share_one_request_and_the_sync_store():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetcher():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"price": "3"}
+
+    async def burst():
+        return await asyncio.gather(*(cache.fetch_async(KEY, fetcher) for _ in range(6)))
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1 and all(r is results[0] for r in results)
+    assert cache.fetch(KEY, CountingFetcher()) is results[0]        # served from the same entry
+    total = cache.metrics()["total"]
+    assert (total["misses"], total["coalesced"], total["hits"]) == (1, 5, 1)
+
+
+def test_async_leader_failure_reaches_waiters_and_is_not_cached():
+    cache = ResponseCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise TimeoutError("slow exchange")
+
+    async def burst():
+        return await asyncio.gather(*(cache.fetch_async(KEY, failing) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1 and all(isinstance(r, TimeoutError) for r in results)
+    assert cache.metrics()["entries"] == 0
+
+    async def ok():
+        return {"price": "4"}
+
+    assert asyncio.run(cache.fetch_async(KEY, ok)) == {"price": "4"}
+
+
+def test_cancelled_async_leader_does_not_wedge_the_key():
+    cache = ResponseCache()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def scenario():
+        leader = asyncio.create_task(cache.fetch_async(KEY, slow))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.fetch_async(KEY, slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        outcome = await asyncio.gather(leader, waiter, return_exceptions=True)
+
+        async def ok():
+            return {"price": "5"}
+
+        return outcome, await asyncio.wait_for(cache.fetch_async(KEY, ok), 1)
+
+    (leader, waiter), after = asyncio.run(scenario())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert isinstance(waiter, asyncio.CancelledError)
+    assert after == {"price": "5"}
@@ -0,0 +1,165 @@
+"""
+TelegramOutbox tests: priorities, digests, flood buckets and the disk spill (no network access).
+Run: python -m pytest tests/network -q
+"""
+
+import os
+import json
+import threading
+
+import pytest
+
+from modules.network import telegram_outbox
+from modules.network.telegram_outbox import TelegramOutbox, TELEGRAM_MAX_TEXT
+
+
+class FakeBot:
+    """send_messages() recording every batch; replies ok unless `reply` is set"""
+
+    def __init__(self):
+        self.batches = []
+        self.reply = None
+
+    def send_messages(self, texts, chat_id=None, parse_mode="HTML"):
+        self.batches.append((list(texts), chat_id))
+        return [self.reply or {"ok": True} for _ in texts]
+
+
+@pytest.fixture
+def bot():
+    return FakeBot()
+
+
+@pytest.fixture
+def make_outbox(bot, tmp_path, monkeypatch):
+    monkeypatch.setattr(telegram_outbox.atexit, "register", lambda *args: None)
+
+    def make(worker=False, **kwargs):
+        kwargs.setdefault("digest_window", 0.0)
+        outbox = TelegramOutbox(bot, spill_path=str(tmp_path / "outbox.jsonl"), **kwargs)
+        if not worker:
+            outbox._ensure_worker = lambda: None     # driven by hand through take()
+        return outbox
+    return make
+
+
+def take(outbox):
+    """_take_batch as the worker calls it (lock held) → (texts, wait)"""
+    with outbox._cond:
+        if not outbox._heap:
+            return [], None
+        batch, wait = outbox._take_batch()
+    return [m.text for m in batch], wait
+
+
+def spilled(outbox):
+    with open(outbox.spill_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_critical_goes_first_and_low_priority_is_digested(make_outbox):
+    outbox = make_outbox()
+    outbox.send("info", "INFO")
+    outbox.send("warn", "WARNING")
+    outbox.send("done", "SUCCESS")
+    outbox.send("fire", "CRITICAL")
+    assert take(outbox) == (["fire", "warn"], 0.0)
+    texts, _ = take(outbox)
+    assert len(texts) == 1
+    assert texts[0].startswith("📦 Digest (2 updates)\n")
+    assert texts[0].index("done") < texts[0].index("info")       # SUCCESS outranks INFO
+    assert outbox.stats()["digested"] == 1 and outbox.stats()["pending"] == 0
+
+
+def test_low_priority_waits_out_the_digest_window(make_outbox):
+    outbox = make_outbox(digest_window=30.0)
+    outbox.send("info", "INFO")
+    texts, wait = take(outbox)
+    assert texts == [] and 29 < wait <= 30
+    outbox.send("fire", "CRITICAL")                               # never held back
+    assert take(outbox)[0] == ["fire"]
+
+
+def test_digest_is_split_at_the_telegram_limit(make_outbox):
+    outbox = make_outbox()
+    for i in range(5):
+        outbox.send(str(i) * 1500, "INFO")
+    texts, _ = take(outbox)
+    assert len(texts) == 3 and all(len(t) <= TELEGRAM_MAX_TEXT for t in texts)
+    assert "".join(texts).count("1" * 1500) == 1
+    assert outbox.stats()["digested"] == 2
+
+
+@pytest.mark.parametrize("chat_id,refill", [("12345", 1.0), ("-100200", 3.0)])
+def test_flood_bucket_per_chat(make_outbox, chat_id, refill):
+    outbox = make_outbox()
+    for i in range(5):
+        outbox.send(f"alert {i}", "CRITICAL", chat_id=chat_id)
+    outbox.send("other chat", "CRITICAL", chat_id="777")
+    assert take(outbox)[0] == ["alert 0", "alert 1", "alert 2"]   # burst of 3
+    texts, wait = take(outbox)
+    assert texts == [] and wait == pytest.approx(refill, rel=0.05)
+    assert outbox.stats()["flood_waits"] == 1
+
+
+def test_full_queue_spills_outside_the_lock(make_outbox):
+    outbox = make_outbox(max_size=2)
+    free = []
+
+    def probe():
+        if outbox._cond.acquire(timeout=1):
+            outbox._cond.release()
+            free.append(True)
+        else:
+            free.append(False)
+
+    def spill(messages):
+        # Another thread must be able to take the lock while the file is written
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        original(messages)
+
+    original, outbox._spill = outbox._spill, spill
+    outbox.send("old info", "INFO")
+    outbox.send("fire", "CRITICAL")
+    assert outbox.send("more fire", "CRITICAL")                   # evicts the INFO
+    assert not outbox.send("late info", "INFO")                   # nothing worse to evict
+    assert free == [True, True]
+    assert [row["text"] for row in spilled(outbox)] == ["old info", "late info"]
+    assert outbox.stats()["dropped"] == 2 and outbox.stats()["pending"] == 2
+
+
+def test_offline_spill_is_replayed_after_a_restart(make_outbox, bot):
+    outbox = make_outbox()
+    outbox.send("first", "WARNING")
+    outbox.send("second", "WARNING", chat_id="-100")
+    bot.reply = {"error": "proxy down"}
+    for _ in range(2):
+        with outbox._cond:
+            batch, _ = outbox._take_batch()
+        outbox._deliver(batch)
+    assert outbox.stats()["offline"] and outbox.stats()["spilled"] == 2
+    assert [(r["text"], r["level"], r["chat_id"]) for r in spilled(outbox)] == [
+        ("first", "WARNING", None), ("second", "WARNING", "-100")]
+
+    bot.reply = None
+    restarted = make_outbox(worker=True)                          # same spill file
+    restarted.send("third", "CRITICAL")
+    assert restarted.flush(5)
+    restarted.stop(1)
+    sent = [text for texts, _ in bot.batches[2:] for text in texts]
+    assert sorted(sent) == ["first", "second", "third"]
+    assert restarted.stats()["replayed"] == 2
+    assert not os.path.exists(restarted.spill_path)
+
+
+def test_exit_hook_is_registered_once(make_outbox, monkeypatch):
+    registered = []
+    monkeypatch.setattr(telegram_outbox.atexit, "register", lambda *args: registered.append(args))
+    outbox = make_outbox(worker=True)
+    outbox.send("one", "CRITICAL")
+    outbox.stop(1)
+    outbox.send("two", "CRITICAL")                                # worker restarted
+    outbox.stop(1)
+    assert registered == [(outbox.stop, 10.0)]
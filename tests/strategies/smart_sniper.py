@@ -1,14 +1,13 @@
 
-import pandas as pd
-import numpy as np
 import logging
+from modules.analysis.incremental import RSI, Bollinger, MACD
 
 class SmartSniperStrategy:
     """
     🌊 Ocean Hunter Strategy: Smart Sniper V10.8.2
     
     Logic:
-    1. Indicators: RSI(14), MACD(12,26,9), Bollinger Bands(20, 2std)
+    1. Indicators: RSI(14), MACD(12,26,9), Bollinger Bands(20, 2std), updated incrementally
     2. Entry: Score-based system (RSI Dip + BB Touch + MACD Histogram)
     3. Exit: Fixed TP/SL or RSI Overbought
     """
@@ -17,8 +16,11 @@ class SmartSniperStrategy:
         self.symbol = symbol
         self.risk_per_trade = risk_per_trade # Use 98% of available balance
         
-        # History Buffer for Calculation
-        self.history = []
+        # Streaming indicator state: O(1) per candle, no history window
+        self.rsi = RSI(14, method="sma")
+        self.bb = Bollinger(20, 2.0)
+        self.macd = MACD(12, 26, 9)
+        self.candles_seen = 0
         self.warmup_period = 35 # Min candles needed for MACD/RSI
         
         # Position Management
@@ -29,61 +31,41 @@ class SmartSniperStrategy:
         self.tp_percent = 0.015  # 1.5% Target
         self.sl_percent = 0.010  # 1.0% Stop Loss
 
-    def _calculate_indicators(self, df):
-        """Calculates Technical Indicators on the DataFrame"""
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['bb_mid'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_mid'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_mid'] - (df['bb_std'] * 2)
-        
-        # MACD
-        exp12 = df['close'].ewm(span=12, adjust=False).mean()
-        exp26 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp12 - exp26
-        df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        
-        return df.iloc[-1] # Return only the latest row
+    @staticmethod
+    def _latest(close, rsi, bands, macd):
+        mid, upper, lower = bands
+        line, signal, _ = macd
+        return {'close': close, 'rsi': rsi, 'bb_mid': mid, 'bb_upper': upper,
+                'bb_lower': lower, 'macd': line, 'signal': signal}
+
+    def _update_indicators(self, close):
+        """Commit one closed candle; returns the latest indicator row"""
+        return self._latest(close, self.rsi.update(close), self.bb.update(close), self.macd.update(close))
+
+    def preview(self, candle):
+        """Indicator row as if the still-open candle closed now (state untouched)"""
+        close = candle['close']
+        return self._latest(close, self.rsi.peek(close), self.bb.peek(close), self.macd.peek(close))
 
     def on_candle(self, candle):
         """Main Logic Loop called on every new candle"""
-        # 1. Update History
-        self.history.append({
-            'open': candle['open'],
-            'high': candle['high'],
-            'low': candle['low'],
-            'close': candle['close'],
-            'volume': candle['volume']
-        })
-        
-        # Keep history manageable (last 100 candles is enough)
-        if len(self.history) > 100:
-            self.history.pop(0)
+        # 1. Update Indicators
+        latest = self._update_indicators(candle['close'])
+        self.candles_seen += 1
             
         # 2. Warmup Check
-        if len(self.history) < self.warmup_period:
+        if self.candles_seen < self.warmup_period:
             return
 
-        # 3. Calculate Indicators
-        df = pd.DataFrame(self.history)
-        latest = self._calculate_indicators(df)
-        
         current_price = latest['close']
         rsi = latest['rsi']
         
-        # 4. Check Exit Conditions (If we have a position)
+        # 3. Check Exit Conditions (If we have a position)
         if self.position_size > 0:
             self._check_exit(current_price, rsi)
             return
 
-        # 5. Check Entry Conditions (If we have NO position)
+        # 4. Check Entry Conditions (If we have NO position)
         self._check_entry(latest)
 
     def _check_entry(self, latest):
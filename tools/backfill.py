@@ -0,0 +1,49 @@
+import os
+import sys
+import argparse
+import logging
+
+# Add Root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TRADE_COINS, QUOTE_CURRENCY
+from modules.data.backfill import Backfiller, Checkpoint, DEFAULT_CHECKPOINT
+
+# Example:
+#   python tools/backfill.py --intervals 15m 60m --start 2022-01-01
+#   python tools/backfill.py --source nobitex --symbols BTCIRT --intervals 60m --start 2023-06-01
+# Re-running the same command resumes from data/backfill_checkpoint.json.
+
+def main():
+    default_symbols = [f"{coin}{QUOTE_CURRENCY}" for coin in TRADE_COINS] + ["PAXGUSDT"]
+
+    parser = argparse.ArgumentParser(description="Download historical candles into data/ohlcv")
+    parser.add_argument("--source", choices=["mexc", "nobitex"], default="mexc")
+    parser.add_argument("--symbols", nargs="+", default=default_symbols)
+    parser.add_argument("--intervals", nargs="+", default=["15m", "60m"])
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD, epoch seconds or ms")
+    parser.add_argument("--end", default=None, help="default: now")
+    parser.add_argument("--jobs", type=int, default=4, help="(symbol, interval) pairs in flight")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    print(f"📚 Backfill {args.source.upper()}: {len(args.symbols)} symbols × {args.intervals} from {args.start}")
+    backfiller = Backfiller(args.source, checkpoint=Checkpoint(args.checkpoint), max_jobs=args.jobs)
+    jobs = backfiller.run(args.symbols, args.intervals, args.start, args.end)
+
+    failed = 0
+    for job in jobs:
+        if job.status == "done":
+            print(f"   ✅ {job.symbol} ({job.interval}): {job.rows} candles")
+        else:
+            failed += 1
+            print(f"   ❌ {job.symbol} ({job.interval}): stopped at {job.progress:.0%} — {job.error}")
+    if failed:
+        print(f"\n⚠️ {failed} job(s) incomplete. Run the same command again to resume.")
+        sys.exit(1)
+    print("\n✅ Backfill complete.")
+
+if __name__ == "__main__":
+    main()